@@ -0,0 +1,310 @@
+"""
+Admission control for the AI service.
+
+Backfills, year-long scans and interactive dashboard calls share each worker's CPU.
+Every request (except probes and the SSE stream) passes two gates before it runs:
+
+1. Endpoint gate: at most N requests of one endpoint ("METHOD /path/template") run at
+   once, per ADMISSION_ENDPOINT_LIMITS. Up to ADMISSION_ENDPOINT_QUEUE more wait;
+   beyond that the caller gets 429.
+2. Worker gate: ADMISSION_MAX_CONCURRENT slots shared by all endpoints, granted to
+   waiting interactive requests before waiting batch ones, and batch requests never
+   hold more than ADMISSION_BATCH_MAX_CONCURRENT of them. When a class's queue is
+   full, or a request waited longer than its class timeout, the caller gets 503.
+
+Both rejections carry Retry-After, estimated from the queue depth and the recent mean
+service time. Endpoints listed in ADMISSION_BATCH_ENDPOINTS are batch; a caller can
+also mark any request as batch with `X-Request-Priority: batch` (but not upgrade one).
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Optional
+
+import orjson
+import structlog
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app import tracing
+from app.config import settings
+from app.endpoints import EndpointResolver
+
+logger = structlog.get_logger()
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITY_HEADER = b"x-request-priority"
+EXEMPT_PATHS = ("/health", "/ready", "/metrics", "/docs", "/redoc", "/openapi.json", "/api/ml/events/stream")
+
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+def _parse_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _parse_limits(value: str) -> dict[str, int]:
+    limits = {}
+    for item in _parse_list(value):
+        endpoint, _, limit = item.rpartition("=")
+        limits[endpoint.strip()] = int(limit)
+    return limits
+
+
+class ServiceTime:
+    """EWMA of how long admitted requests hold their slot."""
+
+    def __init__(self, alpha: float = 0.2, initial: float = 0.5) -> None:
+        self.alpha = alpha
+        self.seconds = initial
+
+    def observe(self, seconds: float) -> None:
+        self.seconds += self.alpha * (seconds - self.seconds)
+
+
+def retry_after(queued: int, slots: int, service: ServiceTime) -> int:
+    return max(1, min(60, math.ceil((queued + 1) * service.seconds / max(slots, 1))))
+
+
+def _abandon(future: asyncio.Future, waiters: deque, free) -> None:
+    """A waiter gave up (timeout or disconnect); hand back a slot granted in the meantime."""
+    if future.done() and not future.cancelled():
+        free()
+    elif future in waiters:
+        waiters.remove(future)
+
+
+class EndpointGate:
+    """FIFO concurrency limit for one endpoint with a bounded wait queue."""
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self.service = ServiceTime()
+        self.rejected = 0
+
+    async def acquire(self, timeout: float) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise Rejected(429, "Too many concurrent requests for this endpoint",
+                           retry_after(len(self._waiters), self.limit, self.service))
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException as exc:
+            _abandon(future, self._waiters, self.free)
+            if isinstance(exc, asyncio.TimeoutError):
+                self.rejected += 1
+                raise Rejected(503, "Timed out waiting for this endpoint",
+                               retry_after(len(self._waiters), self.limit, self.service)) from None
+            raise
+
+    def release(self, held: float) -> None:
+        self.service.observe(held)
+        self.free()
+
+    def free(self) -> None:
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                # The slot passes straight to the next waiter
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "queued": len(self._waiters), "rejected": self.rejected}
+
+
+class PriorityGate:
+    """Shared worker slots; interactive waiters are served before batch waiters."""
+
+    def __init__(self, capacity: int, batch_capacity: int, max_queue: dict[str, int]) -> None:
+        self.capacity = capacity
+        self.batch_capacity = min(batch_capacity, capacity)
+        self.max_queue = max_queue
+        self.active = {INTERACTIVE: 0, BATCH: 0}
+        self._waiters: dict[str, deque[asyncio.Future]] = {INTERACTIVE: deque(), BATCH: deque()}
+        self.service = {INTERACTIVE: ServiceTime(), BATCH: ServiceTime(initial=5.0)}
+        self.rejected = {INTERACTIVE: 0, BATCH: 0}
+
+    def _can_run(self, priority: str) -> bool:
+        if sum(self.active.values()) >= self.capacity:
+            return False
+        return priority == INTERACTIVE or self.active[BATCH] < self.batch_capacity
+
+    def _retry_after(self, priority: str) -> int:
+        slots = self.capacity if priority == INTERACTIVE else self.batch_capacity
+        return retry_after(len(self._waiters[priority]), slots, self.service[priority])
+
+    async def acquire(self, priority: str, timeout: float) -> None:
+        waiters = self._waiters[priority]
+        # Interactive requests don't queue behind anything; batch ones also yield to interactive waiters
+        ahead = waiters or (priority == BATCH and self._waiters[INTERACTIVE])
+        if not ahead and self._can_run(priority):
+            self.active[priority] += 1
+            return
+        if len(waiters) >= self.max_queue[priority]:
+            self.rejected[priority] += 1
+            raise Rejected(503, f"Service busy ({priority} queue full)", self._retry_after(priority))
+
+        future = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except BaseException as exc:
+            _abandon(future, waiters, lambda: self.free(priority))
+            if isinstance(exc, asyncio.TimeoutError):
+                self.rejected[priority] += 1
+                raise Rejected(503, f"Service busy ({priority} queue timeout)", self._retry_after(priority)) from None
+            raise
+
+    def release(self, priority: str, held: float) -> None:
+        self.service[priority].observe(held)
+        self.free(priority)
+
+    def free(self, priority: str) -> None:
+        self.active[priority] -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        for priority in (INTERACTIVE, BATCH):
+            waiters = self._waiters[priority]
+            while waiters and self._can_run(priority):
+                future = waiters.popleft()
+                if not future.done():
+                    self.active[priority] += 1
+                    future.set_result(None)
+
+    def stats(self) -> dict:
+        return {
+            priority: {
+                "active": self.active[priority],
+                "queued": len(self._waiters[priority]),
+                "rejected": self.rejected[priority],
+                "mean_service_ms": round(self.service[priority].seconds * 1000, 1),
+            }
+            for priority in (INTERACTIVE, BATCH)
+        } | {"capacity": self.capacity, "batch_capacity": self.batch_capacity}
+
+
+class AdmissionController:
+    """Both gates plus the endpoint classification, configured from Settings."""
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        batch_max_concurrent: int,
+        interactive_queue: int,
+        batch_queue: int,
+        interactive_timeout: float,
+        batch_timeout: float,
+        batch_endpoints: list[str],
+        endpoint_limits: dict[str, int],
+        endpoint_queue: int,
+    ) -> None:
+        self.gate = PriorityGate(max_concurrent, batch_max_concurrent, {INTERACTIVE: interactive_queue, BATCH: batch_queue})
+        self.timeouts = {INTERACTIVE: interactive_timeout, BATCH: batch_timeout}
+        self.batch_endpoints = set(batch_endpoints)
+        self.endpoints = {endpoint: EndpointGate(limit, endpoint_queue) for endpoint, limit in endpoint_limits.items()}
+
+    @classmethod
+    def from_settings(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=settings.admission_max_concurrent,
+            batch_max_concurrent=settings.admission_batch_max_concurrent,
+            interactive_queue=settings.admission_interactive_queue,
+            batch_queue=settings.admission_batch_queue,
+            interactive_timeout=settings.admission_interactive_timeout_seconds,
+            batch_timeout=settings.admission_batch_timeout_seconds,
+            batch_endpoints=_parse_list(settings.admission_batch_endpoints),
+            endpoint_limits=_parse_limits(settings.admission_endpoint_limits),
+            endpoint_queue=settings.admission_endpoint_queue,
+        )
+
+    def priority(self, endpoint: str, header: Optional[bytes]) -> str:
+        if endpoint in self.batch_endpoints or header == BATCH.encode():
+            return BATCH
+        return INTERACTIVE
+
+    async def admit(self, endpoint: str, priority: str) -> Optional[EndpointGate]:
+        """Pass both gates, or raise Rejected. Returns the endpoint gate to release."""
+        deadline = time.monotonic() + self.timeouts[priority]
+        endpoint_gate = self.endpoints.get(endpoint)
+        if endpoint_gate is not None:
+            await endpoint_gate.acquire(self.timeouts[priority])
+        try:
+            await self.gate.acquire(priority, max(0.0, deadline - time.monotonic()))
+        except BaseException:
+            if endpoint_gate is not None:
+                endpoint_gate.free()
+            raise
+        return endpoint_gate
+
+    def stats(self) -> dict:
+        return {"worker": self.gate.stats(), "endpoints": {e: g.stats() for e, g in self.endpoints.items()}}
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware so streaming responses hold their slot until fully sent."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+        self._endpoint = EndpointResolver()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        endpoint = self._endpoint(scope)
+        header = dict(scope["headers"]).get(PRIORITY_HEADER)
+        priority = self.controller.priority(endpoint, header.lower() if header else None)
+        try:
+            with tracing.span("admission.wait", priority=priority):
+                endpoint_gate = await self.controller.admit(endpoint, priority)
+        except Rejected as rejected:
+            logger.info("Request rejected by admission control", endpoint=endpoint, priority=priority,
+                        status=rejected.status_code, retry_after=rejected.retry_after)
+            await _reject(send, rejected)
+            return
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            held = time.monotonic() - started
+            self.controller.gate.release(priority, held)
+            if endpoint_gate is not None:
+                endpoint_gate.release(held)
+
+
+async def _reject(send: Send, rejected: Rejected) -> None:
+    body = orjson.dumps({"detail": rejected.detail})
+    await send(
+        {
+            "type": "http.response.start",
+            "status": rejected.status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(rejected.retry_after).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
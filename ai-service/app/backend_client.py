@@ -0,0 +1,163 @@
+"""
+Callbacks from the AI/ML service to the Laravel backend.
+
+One long-lived httpx.AsyncClient (HTTP/1.1 keep-alive, bounded connection pool) is
+created in the app lifespan and shared by everything that reports results back:
+conflict upserts, notifications, dashboard refresh hooks. Callbacks are queued with
+`enqueue()` and flushed in batches per path, so pushing thousands of results costs a
+handful of requests over already-open connections. `post()` sends immediately.
+Both retry connection errors, 429, 502, 503 and 504 with exponential backoff. A 502 or
+504 (or a dropped connection) can come after the backend applied the request, so every
+request carries an `Idempotency-Key` that stays the same across its retries; the
+backend replays the stored response for a key it has already processed instead of
+applying the batch (and sending its notifications) twice. A 500 is not retried.
+"""
+
+import asyncio
+import random
+import uuid
+from collections import defaultdict
+from typing import Any, Optional
+
+import httpx
+import structlog
+from fastapi import Request
+from opentelemetry.trace import SpanKind
+
+from app import tracing
+from app.config import settings
+
+logger = structlog.get_logger()
+
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Exponential backoff with up to 50% jitter; a numeric Retry-After is a lower bound."""
+    delay = settings.backend_backoff_seconds * (2 ** (attempt - 1))
+    if retry_after is not None and retry_after.isdigit():
+        delay = max(delay, float(retry_after))
+    return delay + random.uniform(0, delay / 2)
+
+
+class BackendClient:
+    """Pooled, retrying, batching HTTP client for backend callbacks."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        headers = {"Accept": "application/json"}
+        if settings.backend_service_token:
+            headers["Authorization"] = f"Bearer {settings.backend_service_token}"
+
+        self._client = httpx.AsyncClient(
+            base_url=settings.backend_url,
+            headers=headers,
+            timeout=httpx.Timeout(
+                settings.backend_timeout_seconds, connect=settings.backend_connect_timeout_seconds
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.backend_max_connections,
+                max_keepalive_connections=settings.backend_max_connections,
+                keepalive_expiry=30.0,
+            ),
+            transport=transport,
+        )
+        self._semaphore = asyncio.Semaphore(settings.backend_max_concurrency)
+        # None is the stop sentinel put by close()
+        self._queue: asyncio.Queue[Optional[tuple[str, Any]]] = asyncio.Queue(maxsize=settings.backend_queue_size)
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def post(self, path: str, payload: Any) -> httpx.Response:
+        """POST with bounded concurrency and retries; raises after the last attempt."""
+        idempotency_key = uuid.uuid4().hex
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with self._semaphore:
+                    with tracing.span(f"POST {path}", kind=SpanKind.CLIENT, attempt=attempt) as span:
+                        # Laravel logs the incoming traceparent, linking its [PERF] line to this trace
+                        headers = tracing.inject_headers({"Idempotency-Key": idempotency_key})
+                        response = await self._client.post(path, json=payload, headers=headers)
+                        span.set_attribute("http.status_code", response.status_code)
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response
+                retry_after = response.headers.get("Retry-After")
+                error: Exception = httpx.HTTPStatusError(
+                    f"{response.status_code} from backend", request=response.request, response=response
+                )
+            except httpx.TransportError as exc:
+                retry_after = None
+                error = exc
+
+            if attempt >= settings.backend_max_retries:
+                raise error
+
+            delay = backoff_delay(attempt, retry_after)
+            logger.warning("Backend callback retry", path=path, attempt=attempt, delay_s=round(delay, 2), error=str(error))
+            await asyncio.sleep(delay)
+
+    async def enqueue(self, path: str, item: Any) -> None:
+        """Queue one item; items for the same path are sent together as {"items": [...]}."""
+        await self._queue.put((path, item))
+
+    async def _flush_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            entry = await self._queue.get()
+            if entry is None:
+                break
+            path, item = entry
+            batches: dict[str, list] = defaultdict(list)
+            batches[path].append(item)
+
+            # Gather whatever else arrives within the flush window, up to the batch size
+            deadline = asyncio.get_running_loop().time() + settings.backend_flush_interval_seconds
+            pending = 1
+            while pending < settings.backend_batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if entry is None:
+                    stopping = True  # send what was gathered, then stop
+                    break
+                path, item = entry
+                batches[path].append(item)
+                pending += 1
+
+            await asyncio.gather(*(self._send_batch(p, items) for p, items in batches.items()))
+
+    async def _send_batch(self, path: str, items: list) -> None:
+        try:
+            await self.post(path, {"items": items})
+        except Exception as exc:
+            logger.error("Backend callback dropped", path=path, items=len(items), error=str(exc))
+
+    def start(self) -> None:
+        self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """Let the flusher send everything queued so far, send any stragglers, then close the connections."""
+        if self._flusher is not None:
+            await self._queue.put(None)
+            await self._flusher
+            self._flusher = None
+
+        remaining: dict[str, list] = defaultdict(list)
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not None:
+                remaining[entry[0]].append(entry[1])
+        for path, items in remaining.items():
+            await self._send_batch(path, items)
+
+        await self._client.aclose()
+
+
+def get_backend_client(request: Request) -> Optional[BackendClient]:
+    """FastAPI dependency returning the shared client (None when callbacks are disabled)."""
+    return getattr(request.app.state, "backend_client", None)
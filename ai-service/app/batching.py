@@ -0,0 +1,126 @@
+"""
+Micro-batching for per-request model calls.
+
+Endpoints that score or embed one item per HTTP request submit it to a MicroBatcher
+instead of calling the model directly. The batcher gathers concurrent submissions for
+up to `max_wait_ms` or `max_batch` items, runs one batched call and resolves each
+caller with its own result, so per-request APIs get close to batch-mode throughput
+from vectorized NumPy / scikit-learn / sentence-transformers code.
+
+The batch function receives a list of items and returns a sequence of results in the
+same order. An exception fails every caller of that batch. `max_concurrent` bounds
+how many batches run at once; batches are cut when flushed (never more than
+`max_batch` items), so under load further batches queue for a free slot rather than
+growing. For synchronous CPU-bound batch functions use `in_thread()` so the event
+loop is not blocked while the model runs.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Generic, Optional, Sequence, TypeVar
+
+import structlog
+
+logger = structlog.get_logger()
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def in_thread(fn: Callable[[list[T]], Sequence[R]]) -> Callable[[list[T]], Awaitable[Sequence[R]]]:
+    """Adapt a blocking batch function to run in a worker thread."""
+
+    async def run(items: list[T]) -> Sequence[R]:
+        return await asyncio.to_thread(fn, items)
+
+    return run
+
+
+class MicroBatcher(Generic[T, R]):
+    """Gathers concurrent submissions into batched calls of `batch_fn`."""
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[list[T]], Awaitable[Sequence[R]]],
+        max_batch: int = 64,
+        max_wait_ms: float = 2.0,
+        max_concurrent: int = 2,
+    ) -> None:
+        self.name = name
+        self._batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.last_batch_ms: Optional[float] = None
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch, self._pending = self._pending[: self.max_batch], self._pending[self.max_batch :]
+        task = asyncio.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        async with self._slots:
+            # Callers that went away (client disconnect) don't need a result
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                return
+            start = time.perf_counter()
+            try:
+                results = await self._batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"{self.name}: batch returned {len(results)} results for {len(batch)} items")
+            except Exception as exc:
+                self.failed_batches += 1
+                logger.warning("Micro-batch failed", batcher=self.name, size=len(batch), error=str(exc))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                return
+
+            self.batches += 1
+            self.items += len(batch)
+            self.last_batch_ms = round((time.perf_counter() - start) * 1000, 2)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def close(self) -> None:
+        """Flush what is pending and wait for running batches."""
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "failed_batches": self.failed_batches,
+            "last_batch_ms": self.last_batch_ms,
+            "pending": len(self._pending),
+        }
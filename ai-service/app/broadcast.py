@@ -0,0 +1,180 @@
+"""
+Server-sent event broadcasting.
+
+One producer, many subscribers: an event is published once, encoded once as an SSE
+frame and put on the queue of every subscribed stream in this worker. Across workers
+the event travels through the Redis pub/sub channel `ai:events`; each worker runs one
+relay task subscribed to it, so a browser connected to any worker sees events produced
+by any other. Without Redis, publishing only reaches this worker's subscribers.
+
+Events that every worker observes by itself (Postgres change-feed notifications) are
+published with `local_only=True` so they are not delivered once per worker.
+
+A subscriber that falls `SSE_QUEUE_SIZE` frames behind is disconnected instead of
+buffering without bound; browsers reconnect with Last-Event-ID and get the missed
+events from a small replay buffer.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Iterable, Optional
+
+import orjson
+import structlog
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = structlog.get_logger()
+
+CHANNEL = "ai:events"
+TOPICS = ("conflicts", "analytics")
+
+
+def sse_frame(event_id: int, event: str, data: Any) -> bytes:
+    payload = orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (event_id, event.encode(), payload)
+
+
+class Subscription:
+    """One connected stream: its topics and a bounded queue of encoded frames."""
+
+    def __init__(self, broadcaster: "Broadcaster", topics: frozenset[str], queue_size: int) -> None:
+        self._broadcaster = broadcaster
+        self.topics = topics
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(maxsize=queue_size)
+        self.replay: list[bytes] = []
+
+    def offer(self, frame: bytes) -> bool:
+        """Queue a frame; on overflow drop the backlog and end the stream."""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    def close(self) -> None:
+        """End the stream after whatever the client is currently being sent."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._broadcaster._subscribers.discard(self)
+
+
+class Broadcaster:
+    """In-process fan-out of SSE frames, relayed between workers through Redis."""
+
+    def __init__(
+        self,
+        redis: Optional[aioredis.Redis],
+        queue_size: int = 256,
+        replay_size: int = 256,
+        max_subscribers: int = 1000,
+    ) -> None:
+        self._redis = redis
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: set[Subscription] = set()
+        self._replay: deque[tuple[int, str, bytes]] = deque(maxlen=replay_size)
+        self._last_id = 0
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped_subscribers = 0
+
+    def _next_id(self) -> int:
+        # Wall-clock based so ids from different workers are roughly comparable
+        self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+        return self._last_id
+
+    async def publish(self, topic: str, event: str, data: Any, local_only: bool = False) -> None:
+        event_id = self._next_id()
+        self.published += 1
+        if self._redis is None or local_only:
+            self._deliver(event_id, topic, sse_frame(event_id, event, data))
+            return
+        message = orjson.dumps(
+            {"id": event_id, "topic": topic, "event": event, "data": data},
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+        try:
+            # Our own relay delivers it locally, like in every other worker
+            await self._redis.publish(CHANNEL, message)
+        except (OSError, RedisError) as exc:
+            logger.warning("Event publish via Redis failed, delivering locally", event=event, error=str(exc))
+            self._deliver(event_id, topic, sse_frame(event_id, event, data))
+
+    def _deliver(self, event_id: int, topic: str, frame: bytes) -> None:
+        self._replay.append((event_id, topic, frame))
+        for subscription in list(self._subscribers):
+            if topic not in subscription.topics:
+                continue
+            if subscription.offer(frame):
+                self.delivered += 1
+            else:
+                self._subscribers.discard(subscription)
+                self.dropped_subscribers += 1
+                logger.info("Slow event subscriber disconnected", backlog=self.queue_size)
+
+    def subscribe(self, topics: Iterable[str], last_event_id: Optional[int] = None) -> Subscription:
+        """Register a stream; raises OverflowError when SSE_MAX_SUBSCRIBERS are connected."""
+        if len(self._subscribers) >= self.max_subscribers:
+            raise OverflowError("Too many event subscribers")
+        subscription = Subscription(self, frozenset(topics), self.queue_size)
+        if last_event_id is not None:
+            subscription.replay = [
+                frame for event_id, topic, frame in self._replay if event_id > last_event_id and topic in subscription.topics
+            ]
+        self._subscribers.add(subscription)
+        return subscription
+
+    async def _relay(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(CHANNEL)
+                async for message in pubsub.listen():
+                    try:
+                        event = orjson.loads(message["data"])
+                        frame = sse_frame(event["id"], event["event"], event["data"])
+                    except (orjson.JSONDecodeError, KeyError, TypeError):
+                        continue
+                    self._deliver(event["id"], event["topic"], frame)
+            except asyncio.CancelledError:
+                raise
+            except (OSError, RedisError) as exc:
+                logger.warning("Event relay disconnected", error=str(exc))
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(1.0)
+
+    def start(self) -> None:
+        if self._redis is not None:
+            self._task = asyncio.create_task(self._relay())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for subscription in list(self._subscribers):
+            subscription.close()
+        self._subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped_subscribers": self.dropped_subscribers,
+            "relay": "redis" if self._redis is not None else "local",
+        }
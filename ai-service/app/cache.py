@@ -0,0 +1,75 @@
+"""
+Result cache for computed analytics.
+
+Values are JSON documents stored under `ai:cache:<namespace>:<key>` in Redis so every
+worker shares them; when Redis is unavailable an in-process dict with the same TTL
+semantics is used instead.
+"""
+
+import json
+import time
+from typing import Any, Iterable, Optional
+
+from redis import asyncio as aioredis
+
+from app import tracing
+
+
+class ResultCache:
+    """Namespaced JSON cache with per-entry TTL and explicit invalidation."""
+
+    def __init__(self, redis: Optional[aioredis.Redis], namespace: str, ttl_seconds: int) -> None:
+        self._redis = redis
+        self._namespace = namespace
+        self._prefix = f"ai:cache:{namespace}:"
+        self._ttl = ttl_seconds
+        self._local: dict[str, tuple[float, Any]] = {}
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, Any]:
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        if self._redis is not None:
+            with tracing.span("cache.get", namespace=self._namespace, keys=len(keys)) as span:
+                values = await self._redis.mget([self._prefix + key for key in keys])
+                found = {key: json.loads(value) for key, value in zip(keys, values) if value is not None}
+                span.set_attribute("hits", len(found))
+            return found
+
+        now = time.monotonic()
+        found = {}
+        for key in keys:
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > now:
+                found[key] = entry[1]
+        return found
+
+    async def set_many(self, values: dict[str, Any]) -> None:
+        if not values:
+            return
+
+        if self._redis is not None:
+            with tracing.span("cache.set", namespace=self._namespace, keys=len(values)):
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    for key, value in values.items():
+                        pipe.set(self._prefix + key, json.dumps(value), ex=self._ttl)
+                    await pipe.execute()
+            return
+
+        expires = time.monotonic() + self._ttl
+        for key, value in values.items():
+            self._local[key] = (expires, value)
+
+    async def invalidate(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+
+        if self._redis is not None:
+            with tracing.span("cache.invalidate", namespace=self._namespace, keys=len(keys)):
+                await self._redis.delete(*(self._prefix + key for key in keys))
+            return
+
+        for key in keys:
+            self._local.pop(key, None)
@@ -0,0 +1,44 @@
+"""
+Database access for the AI/ML service.
+A single asyncpg pool is created in the app lifespan and shared by all requests.
+"""
+
+from typing import Optional
+
+import asyncpg
+import structlog
+from fastapi import HTTPException, Request
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+def _asyncpg_dsn(url: str) -> str:
+    """asyncpg does not understand SQLAlchemy driver suffixes (postgresql+asyncpg://)."""
+    scheme, sep, rest = url.partition("://")
+    return f"{scheme.split('+', 1)[0]}{sep}{rest}"
+
+
+async def create_pool() -> Optional[asyncpg.Pool]:
+    """Create the shared connection pool, or return None if Postgres is unreachable."""
+    try:
+        pool = await asyncpg.create_pool(
+            _asyncpg_dsn(settings.database_url),
+            min_size=settings.db_pool_min_size,
+            max_size=settings.db_pool_max_size,
+        )
+    except (OSError, asyncpg.PostgresError) as exc:
+        logger.warning("Database unavailable, DB-backed endpoints disabled", error=str(exc))
+        return None
+
+    logger.info("Database pool ready", max_size=settings.db_pool_max_size)
+    return pool
+
+
+def get_pool(request: Request) -> asyncpg.Pool:
+    """FastAPI dependency returning the shared pool."""
+    pool = getattr(request.app.state, "db_pool", None)
+    if pool is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return pool
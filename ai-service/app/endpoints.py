@@ -0,0 +1,28 @@
+"""
+Endpoint keys for per-endpoint limits and statistics: "METHOD /path/{template}".
+"""
+
+from starlette.routing import Match
+from starlette.types import Scope
+
+
+class EndpointResolver:
+    """Resolves the matching route's path template, cached per concrete path."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._endpoints: dict[tuple[str, str], str] = {}
+
+    def __call__(self, scope: Scope) -> str:
+        key = (scope["method"], scope["path"])
+        endpoint = self._endpoints.get(key)
+        if endpoint is None:
+            endpoint = f"{scope['method']} {scope['path']}"
+            for route in scope["app"].router.routes:
+                match, _ = route.matches(scope)
+                if match == Match.FULL:
+                    endpoint = f"{scope['method']} {route.path}"
+                    break
+            if len(self._endpoints) < self.max_entries:
+                self._endpoints[key] = endpoint
+        return endpoint
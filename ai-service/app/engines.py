@@ -0,0 +1,125 @@
+"""
+Lazily loaded ML engines.
+
+The heavy stacks pinned in requirements.txt (pandas, scipy, scikit-learn, spacy,
+sentence-transformers) cost seconds of import time and hundreds of MB, so nothing
+imports them at module level. Code that needs one calls `engines.load("pandas")` (or
+`await engines.aload(...)` from async code) and gets the module or model, loaded on
+first use. The lifespan can pre-warm a configured set in the background (or the
+serving master preloads it before forking, see app/server.py); /ready reports which
+engines are warm.
+"""
+
+import asyncio
+import importlib
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import structlog
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+def _spacy_model():
+    spacy = importlib.import_module("spacy")
+    return spacy.load(settings.spacy_model)
+
+
+def _sentence_encoder():
+    sentence_transformers = importlib.import_module("sentence_transformers")
+    return sentence_transformers.SentenceTransformer(settings.embedding_model)
+
+
+class Engine:
+    """A module or model that is loaded once, on first use, thread-safely."""
+
+    def __init__(self, name: str, loader: Callable[[], Any]) -> None:
+        self.name = name
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self.state = "cold"
+        self.load_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def load(self) -> Any:
+        if self.state == "warm":
+            return self._value
+        with self._lock:
+            if self.state != "warm":
+                self.state = "loading"
+                start = time.perf_counter()
+                try:
+                    self._value = self._loader()
+                except Exception as exc:
+                    self.state = "failed"
+                    self.error = str(exc)
+                    logger.error("Engine failed to load", engine=self.name, error=self.error)
+                    raise
+                self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+                self.state = "warm"
+                self.error = None
+                logger.info("Engine loaded", engine=self.name, load_ms=self.load_ms)
+        return self._value
+
+    def status(self) -> dict:
+        return {"state": self.state, "load_ms": self.load_ms, "error": self.error}
+
+
+ENGINES: dict[str, Engine] = {
+    "pandas": Engine("pandas", lambda: importlib.import_module("pandas")),
+    "scipy.sparse": Engine("scipy.sparse", lambda: importlib.import_module("scipy.sparse")),
+    "scipy.stats": Engine("scipy.stats", lambda: importlib.import_module("scipy.stats")),
+    "sklearn.cluster": Engine("sklearn.cluster", lambda: importlib.import_module("sklearn.cluster")),
+    "sklearn.linear_model": Engine("sklearn.linear_model", lambda: importlib.import_module("sklearn.linear_model")),
+    "spacy": Engine("spacy", _spacy_model),
+    "sentence_transformers": Engine("sentence_transformers", _sentence_encoder),
+}
+
+
+def load(name: str) -> Any:
+    """Return the engine's module/model, importing it on first use (blocking)."""
+    return ENGINES[name].load()
+
+
+async def aload(name: str) -> Any:
+    """Like load(), but a cold import runs in a worker thread instead of on the event loop."""
+    engine = ENGINES[name]
+    if engine.state == "warm":
+        return engine.load()
+    return await asyncio.to_thread(engine.load)
+
+
+def prewarm_names() -> list[str]:
+    return [name.strip() for name in settings.prewarm_engines.split(",") if name.strip()]
+
+
+async def prewarm(names: list[str]) -> None:
+    """Load engines one by one off the event loop; failures are logged, not raised."""
+    for name in names:
+        if name not in ENGINES:
+            logger.warning("Unknown engine in PREWARM_ENGINES", engine=name)
+            continue
+        try:
+            await aload(name)
+        except Exception:
+            continue
+
+
+def preload(names: list[str]) -> None:
+    """Blocking prewarm, used by the serving master before it forks workers."""
+    for name in names:
+        if name not in ENGINES:
+            logger.warning("Unknown engine in PREWARM_ENGINES", engine=name)
+            continue
+        try:
+            load(name)
+        except Exception:
+            continue
+
+
+def status() -> dict[str, dict]:
+    return {name: engine.status() for name, engine in ENGINES.items()}
@@ -3,12 +3,42 @@ Team Management Platform - AI/ML Service Entry Point
 FastAPI application for conflict detection and analytics.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic_settings import BaseSettings
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import structlog
 
+from app import engines, memory, tracing
+from app.admission import AdmissionController, AdmissionMiddleware
+from app.backend_client import BackendClient
+from app.broadcast import Broadcaster
+from app.cache import ResultCache
+from app.config import settings
+from app.db import create_pool
+from app.redis_client import create_redis
+from app.routers import (
+    amendments,
+    anomalies,
+    conflicts,
+    embeddings,
+    escalations,
+    events,
+    features,
+    memory as memory_admin,
+    predictions,
+    thresholds,
+    trends,
+    utilization,
+)
+from app.services import conflict_risk, feature_store, reporter_behaviour
+from app.services.change_feed import create_change_feed
+from app.services import trends as trend_engine
+from app.services.embeddings import NoteEmbedder
+from app.services.escalation import create_scheduler
+from app.singleflight import SingleFlight
+
 # Configure structured logging
 structlog.configure(
     processors=[
@@ -16,6 +46,7 @@ structlog.configure(
         structlog.stdlib.add_logger_name,
         structlog.stdlib.add_log_level,
         structlog.processors.TimeStamper(fmt="iso"),
+        tracing.add_trace_context,
         structlog.processors.JSONRenderer(),
     ],
     wrapper_class=structlog.stdlib.BoundLogger,
@@ -26,38 +57,87 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
-class Settings(BaseSettings):
-    """Application settings loaded from environment."""
-
-    app_name: str = "AI-ML Service"
-    app_env: str = "development"
-    debug: bool = True
-    host: str = "0.0.0.0"
-    port: int = 8000
-
-    # Thresholds
-    variance_threshold: float = 0.15
-    confidence_threshold: float = 0.85
-    anomaly_sensitivity: float = 2.0
-
-    # CORS
-    allowed_origins: str = "http://localhost:5173,http://localhost:80"
-
-    class Config:
-        env_file = ".env"
-
-
-settings = Settings()
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     logger.info("Starting AI/ML Service", version="0.1.0")
-    # TODO: Initialize ML models, database connections, etc.
+    tracer_provider = tracing.setup_tracing()
+    memory.gc_stats.install()
+    if app.state.memory_profiler is not None:
+        app.state.memory_profiler.start()
+    # Heavy ML stacks load on first use; optionally warm some up without blocking startup
+    prewarm_task = asyncio.create_task(engines.prewarm(engines.prewarm_names()))
+    app.state.db_pool = await create_pool()
+    app.state.redis = await create_redis()
+    app.state.trend_cache = ResultCache(
+        app.state.redis,
+        trend_engine.CACHE_NAMESPACE,
+        trend_engine.cache_ttl_seconds(settings.change_feed_enabled and app.state.db_pool is not None),
+    )
+    app.state.reporter_cache = ResultCache(
+        app.state.redis, reporter_behaviour.CACHE_NAMESPACE, settings.reporter_cache_ttl_seconds
+    )
+    app.state.feature_store = feature_store.open_store()
+    app.state.conflict_risk = conflict_risk.ConflictRiskScorer(
+        app.state.db_pool, conflict_risk.load_model(), lambda: feature_store.current(app.state)
+    )
+    app.state.note_embedder = NoteEmbedder()
+    app.state.single_flight = SingleFlight(app.state.redis, "analyses")
+    app.state.broadcaster = Broadcaster(
+        app.state.redis,
+        queue_size=settings.sse_queue_size,
+        replay_size=settings.sse_replay_size,
+        max_subscribers=settings.sse_max_subscribers,
+    )
+    app.state.broadcaster.start()
+
+    app.state.backend_client = None
+    if settings.backend_callbacks_enabled:
+        app.state.backend_client = BackendClient()
+        app.state.backend_client.start()
+
+    app.state.escalation_scheduler = None
+    if settings.escalation_scheduler_enabled and app.state.db_pool is not None:
+        scheduler = create_scheduler(app.state.db_pool, app.state.redis, app.state.backend_client)
+        await scheduler.seed()
+        scheduler.start()
+        app.state.escalation_scheduler = scheduler
+
+    # Caches and the escalation queue follow report / conflict changes pushed by Postgres
+    app.state.change_feed = None
+    if settings.change_feed_enabled and app.state.db_pool is not None:
+        app.state.change_feed = create_change_feed(
+            app.state.db_pool,
+            app.state.trend_cache,
+            lambda: feature_store.current(app.state),
+            app.state.broadcaster,
+            app.state.escalation_scheduler,
+            app.state.single_flight,
+        )
+        app.state.change_feed.start()
+
     yield
     logger.info("Shutting down AI/ML Service")
-    # TODO: Cleanup resources
+    prewarm_task.cancel()
+    await app.state.conflict_risk.batcher.close()
+    await app.state.note_embedder.batcher.close()
+    # The feed feeds the scheduler, so it stops first
+    if app.state.change_feed is not None:
+        await app.state.change_feed.stop()
+    if app.state.escalation_scheduler is not None:
+        await app.state.escalation_scheduler.stop()
+    await app.state.broadcaster.stop()
+    if app.state.backend_client is not None:
+        await app.state.backend_client.close()
+    if app.state.redis is not None:
+        await app.state.redis.aclose()
+    if app.state.db_pool is not None:
+        await app.state.db_pool.close()
+    if app.state.memory_profiler is not None:
+        app.state.memory_profiler.stop()
+    memory.gc_stats.uninstall()
+    if tracer_provider is not None:
+        tracer_provider.shutdown()  # flushes spans still queued for export
 
 
 app = FastAPI(
@@ -67,6 +147,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Innermost: memory profiling only measures requests that were admitted
+app.state.memory_profiler = None
+if settings.memory_profiling_enabled:
+    app.state.memory_profiler = memory.MemoryProfiler(
+        settings.memory_profiling_frames, settings.memory_profiling_snapshots
+    )
+    app.add_middleware(memory.MemoryProfilingMiddleware, profiler=app.state.memory_profiler)
+
+# Admission control sits inside CORS so rejections still carry CORS headers
+app.state.admission = None
+if settings.admission_enabled:
+    app.state.admission = AdmissionController.from_settings()
+    app.add_middleware(AdmissionMiddleware, controller=app.state.admission)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -74,8 +168,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["traceresponse"],
 )
 
+# Outermost: the request span includes admission queueing and every other middleware
+if settings.tracing_enabled:
+    app.add_middleware(tracing.TracingMiddleware)
+
+app.include_router(amendments.router)
+app.include_router(anomalies.router)
+app.include_router(conflicts.router)
+app.include_router(embeddings.router)
+app.include_router(escalations.router)
+app.include_router(events.router)
+app.include_router(features.router)
+app.include_router(memory_admin.router)
+app.include_router(predictions.router)
+app.include_router(thresholds.router)
+app.include_router(trends.router)
+app.include_router(utilization.router)
+
 
 @app.get("/health")
 async def health_check():
@@ -87,6 +199,37 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Readiness probe: the database pool is up and every engine listed in
+    PREWARM_ENGINES is loaded. /health stays a pure liveness check.
+    """
+    engine_status = engines.status()
+    required = engines.prewarm_names()
+    database = app.state.db_pool is not None
+    ready = database and all(engine_status.get(name, {}).get("state") == "warm" for name in required)
+
+    if not ready:
+        response.status_code = 503
+    return {
+        "status": "ready" if ready else "warming",
+        "database": database,
+        "required_engines": required,
+        "engines": engine_status,
+        "change_feed": app.state.change_feed.stats() if app.state.change_feed is not None else None,
+        "admission": app.state.admission.stats() if app.state.admission is not None else None,
+    }
+
+
+if settings.metrics_enabled:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus metrics of the worker that serves the scrape."""
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with service info."""
@@ -95,6 +238,7 @@ async def root():
         "version": "0.1.0",
         "docs": "/docs",
         "health": "/health",
+        "ready": "/ready",
     }
 
 
@@ -161,11 +305,6 @@ async def forecast_predictions(data: dict):
 
 
 if __name__ == "__main__":
-    import uvicorn
+    from app.server import run
 
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug,
-    )
+    run()
@@ -0,0 +1,344 @@
+"""
+Memory profiling and process memory metrics.
+
+Profiling is opt-in (MEMORY_PROFILING_ENABLED): tracemalloc traces every Python
+allocation of the worker, which makes allocation-heavy code noticeably slower and
+costs extra memory per traced block, so enable it on a staging or canary worker.
+While it is on:
+
+- MemoryProfilingMiddleware measures each request's peak traced allocation above the
+  level at its start, logs it as "Request memory" and aggregates it per endpoint.
+  tracemalloc keeps one process-wide peak; it is reset when a request starts on an
+  idle worker, so a request that ran alone gets its exact peak. A request that
+  overlapped others gets an upper bound and is logged with overlapped=true.
+- /api/ml/admin/memory returns the top allocation sites and diffs against stored
+  snapshots (app/routers/memory.py).
+
+RSS, GC and (while tracing) traced-memory metrics are exported at /metrics either way.
+Everything here is per worker process.
+"""
+
+import gc
+import os
+import resource
+import time
+import tracemalloc
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+import structlog
+from prometheus_client import REGISTRY, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.endpoints import EndpointResolver
+
+logger = structlog.get_logger()
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+REQUEST_PEAK = Histogram(
+    "ai_request_peak_alloc_bytes",
+    "Peak Python allocation of a request above its starting level (memory profiling only)",
+    ["endpoint"],
+    buckets=(1 << 20, 4 << 20, 16 << 20, 64 << 20, 256 << 20, 1 << 30, 4 << 30),
+)
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux); falls back to the peak elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+class GCStats:
+    """Collection counts and pause times per generation, via gc.callbacks."""
+
+    def __init__(self) -> None:
+        self.collections = [0, 0, 0]
+        self.pause_seconds = [0.0, 0.0, 0.0]
+        self.max_pause_seconds = [0.0, 0.0, 0.0]
+        self._started: Optional[float] = None
+
+    def _callback(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            generation = info["generation"]
+            pause = time.perf_counter() - self._started
+            self.collections[generation] += 1
+            self.pause_seconds[generation] += pause
+            self.max_pause_seconds[generation] = max(self.max_pause_seconds[generation], pause)
+            self._started = None
+
+    def install(self) -> None:
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def uninstall(self) -> None:
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def to_dict(self) -> dict:
+        return {
+            "pending": list(gc.get_count()),
+            "thresholds": list(gc.get_threshold()),
+            "frozen": gc.get_freeze_count(),
+            "generations": [
+                {
+                    "generation": g,
+                    "collections": self.collections[g],
+                    "pause_ms_total": round(self.pause_seconds[g] * 1000, 3),
+                    "pause_ms_max": round(self.max_pause_seconds[g] * 1000, 3),
+                }
+                for g in range(3)
+            ],
+        }
+
+
+gc_stats = GCStats()
+
+
+@dataclass
+class EndpointMemory:
+    requests: int = 0
+    overlapped: int = 0
+    max_peak_bytes: int = 0
+    total_peak_bytes: int = 0
+    last_peak_bytes: int = 0
+
+    def record(self, peak_bytes: int, overlapped: bool) -> None:
+        self.requests += 1
+        self.overlapped += int(overlapped)
+        self.max_peak_bytes = max(self.max_peak_bytes, peak_bytes)
+        self.total_peak_bytes += peak_bytes
+        self.last_peak_bytes = peak_bytes
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), "mean_peak_bytes": self.total_peak_bytes // max(self.requests, 1)}
+
+
+@dataclass
+class StoredSnapshot:
+    id: int
+    label: str
+    taken_at: str
+    traced_bytes: int
+    snapshot: tracemalloc.Snapshot
+
+    def info(self) -> dict:
+        return {"id": self.id, "label": self.label, "taken_at": self.taken_at, "traced_bytes": self.traced_bytes}
+
+
+def _site(stat) -> dict:
+    frames = [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+    return {"site": frames[0] if frames else "<unknown>", "traceback": frames}
+
+
+class MemoryProfiler:
+    """tracemalloc owner for this worker: per-request peaks, snapshots and diffs."""
+
+    def __init__(self, frames: int, max_snapshots: int) -> None:
+        self.frames = frames
+        self.endpoints: dict[str, EndpointMemory] = {}
+        self.snapshots: deque[StoredSnapshot] = deque(maxlen=max_snapshots)
+        self.in_flight = 0
+        self._started_requests = 0
+        self._next_snapshot_id = 1
+        self._owns_tracing = False
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        logger.info("Memory profiling enabled", frames=tracemalloc.get_traceback_limit(), pid=os.getpid())
+
+    def stop(self) -> None:
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        self.snapshots.clear()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    # -- per request ---------------------------------------------------------------
+
+    def begin(self) -> Optional[tuple[int, int, bool]]:
+        if not self.tracing:
+            return None
+        alone = self.in_flight == 0
+        if alone:
+            tracemalloc.reset_peak()
+        self.in_flight += 1
+        self._started_requests += 1
+        current, _ = tracemalloc.get_traced_memory()
+        return current, self._started_requests, alone
+
+    def end(self, token: Optional[tuple[int, int, bool]], endpoint: str, status: int, seconds: float) -> None:
+        if token is None:
+            return
+        self.in_flight -= 1
+        if not self.tracing:
+            return
+        start_bytes, sequence, alone = token
+        current, peak = tracemalloc.get_traced_memory()
+        # Exact only if the worker was idle at the start and nothing started since
+        overlapped = not (alone and sequence == self._started_requests)
+        peak_bytes = max(0, peak - start_bytes)
+
+        self.endpoints.setdefault(endpoint, EndpointMemory()).record(peak_bytes, overlapped)
+        REQUEST_PEAK.labels(endpoint=endpoint).observe(peak_bytes)
+        logger.info(
+            "Request memory",
+            endpoint=endpoint,
+            status=status,
+            duration_ms=round(seconds * 1000, 1),
+            peak_alloc_bytes=peak_bytes,
+            net_alloc_bytes=current - start_bytes,
+            traced_bytes=current,
+            rss_bytes=rss_bytes(),
+            overlapped=overlapped,
+        )
+
+    # -- snapshots -------------------------------------------------------------------
+
+    def take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def top(self, limit: int, group_by: str = "lineno") -> dict:
+        """Largest live allocation sites right now. Blocking; call from a thread."""
+        snapshot = self.take_snapshot()
+        stats = snapshot.statistics(group_by)
+        return {
+            "group_by": group_by,
+            "traced_bytes": sum(stat.size for stat in stats),
+            "sites": [{**_site(stat), "size_bytes": stat.size, "count": stat.count} for stat in stats[:limit]],
+        }
+
+    def store_snapshot(self, label: str = "") -> dict:
+        """Keep a snapshot for later diffs (oldest dropped beyond the limit). Blocking."""
+        snapshot = self.take_snapshot()
+        stored = StoredSnapshot(
+            id=self._next_snapshot_id,
+            label=label,
+            taken_at=datetime.now(timezone.utc).isoformat(),
+            traced_bytes=tracemalloc.get_traced_memory()[0],
+            snapshot=snapshot,
+        )
+        self._next_snapshot_id += 1
+        self.snapshots.append(stored)
+        return stored.info()
+
+    def find_snapshot(self, snapshot_id: Optional[int]) -> Optional[StoredSnapshot]:
+        if snapshot_id is None:
+            return self.snapshots[-1] if self.snapshots else None
+        return next((s for s in self.snapshots if s.id == snapshot_id), None)
+
+    def diff(self, base: StoredSnapshot, limit: int, group_by: str = "lineno") -> dict:
+        """Growth since `base`, largest first. Blocking; call from a thread."""
+        stats = self.take_snapshot().compare_to(base.snapshot, group_by)
+        return {
+            "base": base.info(),
+            "group_by": group_by,
+            "size_diff_bytes": sum(stat.size_diff for stat in stats),
+            "sites": [
+                {
+                    **_site(stat),
+                    "size_diff_bytes": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                    "size_bytes": stat.size,
+                    "count": stat.count,
+                }
+                for stat in stats[:limit]
+            ],
+        }
+
+    def stats(self) -> dict:
+        traced, peak = tracemalloc.get_traced_memory() if self.tracing else (0, 0)
+        endpoints = sorted(self.endpoints.items(), key=lambda item: -item[1].max_peak_bytes)
+        return {
+            "tracing": self.tracing,
+            "frames": self.frames,
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory() if self.tracing else 0,
+            "in_flight": self.in_flight,
+            "snapshots": [s.info() for s in self.snapshots],
+            "endpoints": {endpoint: memory.to_dict() for endpoint, memory in endpoints},
+        }
+
+
+class MemoryProfilingMiddleware:
+    """Pure ASGI middleware so a streamed body counts towards its request."""
+
+    def __init__(self, app: ASGIApp, profiler: MemoryProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+        self._endpoint = EndpointResolver()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in ("/health", "/ready", "/metrics"):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        token = self.profiler.begin()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.profiler.end(token, self._endpoint(scope), status, time.perf_counter() - started)
+
+
+class MemoryCollector:
+    """Prometheus collector for RSS, GC and tracemalloc state, read at scrape time."""
+
+    def collect(self):
+        yield GaugeMetricFamily("ai_process_rss_bytes", "Resident set size of this worker", value=rss_bytes())
+        yield GaugeMetricFamily("ai_process_rss_peak_bytes", "Peak resident set size of this worker",
+                                value=peak_rss_bytes())
+
+        pending = GaugeMetricFamily("ai_gc_pending_objects", "Allocations counted towards the next collection",
+                                    labels=["generation"])
+        collections = CounterMetricFamily("ai_gc_collections", "Completed collections", labels=["generation"])
+        pauses = CounterMetricFamily("ai_gc_pause_seconds", "Time spent in collections", labels=["generation"])
+        max_pause = GaugeMetricFamily("ai_gc_max_pause_seconds", "Longest single collection", labels=["generation"])
+        for generation, count in enumerate(gc.get_count()):
+            label = [str(generation)]
+            pending.add_metric(label, count)
+            collections.add_metric(label, gc_stats.collections[generation])
+            pauses.add_metric(label, gc_stats.pause_seconds[generation])
+            max_pause.add_metric(label, gc_stats.max_pause_seconds[generation])
+        yield from (pending, collections, pauses, max_pause)
+
+        if tracemalloc.is_tracing():
+            traced, peak = tracemalloc.get_traced_memory()
+            yield GaugeMetricFamily("ai_tracemalloc_traced_bytes", "Python memory traced by tracemalloc", value=traced)
+            yield GaugeMetricFamily("ai_tracemalloc_peak_bytes", "Traced peak since the last reset", value=peak)
+
+
+REGISTRY.register(MemoryCollector())
@@ -0,0 +1,34 @@
+"""
+Redis access for the AI/ML service.
+A single client (with its own connection pool) is created in the app lifespan.
+"""
+
+from typing import Optional
+
+import structlog
+from fastapi import Request
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app.config import settings
+
+logger = structlog.get_logger()
+
+
+async def create_redis() -> Optional[aioredis.Redis]:
+    """Create the shared client, or return None if Redis is unreachable."""
+    client = aioredis.from_url(settings.redis_url, decode_responses=True)
+    try:
+        await client.ping()
+    except (OSError, RedisError) as exc:
+        logger.warning("Redis unavailable, falling back to in-process state", error=str(exc))
+        await client.aclose()
+        return None
+
+    logger.info("Redis client ready")
+    return client
+
+
+def get_redis(request: Request) -> Optional[aioredis.Redis]:
+    """FastAPI dependency returning the shared client (None when Redis is down)."""
+    return getattr(request.app.state, "redis", None)
@@ -0,0 +1,131 @@
+"""
+Content-negotiated responses for ML result sets.
+
+Endpoints that return large results build them as plain dicts/lists (NumPy arrays and
+scalars allowed) and return `await negotiated(request, payload)` instead of letting
+FastAPI walk the object with jsonable_encoder:
+
+- `Accept: application/msgpack` (or application/x-msgpack) gets MessagePack,
+  anything else gets JSON encoded by orjson, which serializes NumPy natively.
+- Bodies of at least RESPONSE_COMPRESS_MIN_BYTES are compressed with zstd or gzip,
+  whichever the client accepts (zstd preferred). Compressing big bodies runs in a
+  worker thread so it does not stall the event loop.
+"""
+
+import asyncio
+import gzip
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+import msgpack
+import numpy as np
+import orjson
+from fastapi import Request, Response
+
+from app import tracing
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: gzip only
+    zstandard = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+MSGPACK_TYPES = (MSGPACK, "application/x-msgpack")
+
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Compress off the event loop above this size
+THREAD_COMPRESS_BYTES = 1 << 20
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    # OPT_SERIALIZE_NUMPY only takes C-contiguous arrays of native dtypes; slices and
+    # object arrays end up here
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError
+
+
+def encode(content: Any, media_type: str) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(content, default=_msgpack_default)
+    return orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+
+
+def _accepts(header: str, token: str) -> bool:
+    """True if `token` is listed in an Accept-style header with a non-zero q value."""
+    for part in header.split(","):
+        name, *params = part.split(";")
+        if name.strip().lower() != token:
+            continue
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    return float(value) > 0
+                except ValueError:
+                    return False
+        return True
+    return False
+
+
+def choose_media_type(accept: str) -> str:
+    accept = accept.lower()
+    return MSGPACK if any(_accepts(accept, t) for t in MSGPACK_TYPES) else JSON
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accept_encoding = accept_encoding.lower()
+    if zstandard is not None and _accepts(accept_encoding, "zstd"):
+        return "zstd"
+    if _accepts(accept_encoding, "gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=settings.response_zstd_level).compress(body)
+    return gzip.compress(body, compresslevel=settings.response_gzip_level)
+
+
+async def negotiated(request: Request, content: Any, status_code: int = 200) -> Response:
+    """Encode `content` in the representation and compression the client asked for."""
+    media_type = choose_media_type(request.headers.get("accept", ""))
+    with tracing.span("serialize.encode", media_type=media_type) as span:
+        body = encode(content, media_type)
+        span.set_attribute("bytes", len(body))
+    headers = {"Vary": "Accept, Accept-Encoding"}
+
+    encoding = None
+    if len(body) >= settings.response_compress_min_bytes:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding is not None:
+        with tracing.span("serialize.compress", encoding=encoding, bytes_in=len(body)) as span:
+            if len(body) >= THREAD_COMPRESS_BYTES:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            span.set_attribute("bytes", len(body))
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=status_code, media_type=media_type, headers=headers)
@@ -0,0 +1,3 @@
+"""
+API routers for the AI/ML service, mounted in app.main.
+"""
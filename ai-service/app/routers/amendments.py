@@ -0,0 +1,30 @@
+"""
+Amendment impact endpoints.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+import asyncpg
+from fastapi import APIRouter, Depends, Request
+
+from app.db import get_pool
+from app.responses import negotiated
+from app.services.amendment_impact import analyze_amendments
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/amendments", tags=["amendments"])
+
+
+@router.get("/impact")
+async def amendment_impact(
+    request: Request, since: Optional[datetime] = None, pool: asyncpg.Pool = Depends(get_pool)
+):
+    """
+    Hour deltas of every amendment (optionally only those made since `since`), the
+    conflicts they created or resolved, per-amender counts and the amendments most
+    likely made to silence an open conflict.
+    """
+    key = analysis_key("amendments.impact", since)
+    result = await request.app.state.single_flight.do(key, lambda: analyze_amendments(pool, since))
+    return await negotiated(request, result)
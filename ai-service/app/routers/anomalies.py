@@ -0,0 +1,66 @@
+"""
+Anomaly analysis endpoints.
+"""
+
+from datetime import date, timedelta
+from typing import Literal, Optional
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.db import get_pool
+from app.responses import negotiated
+from app.services import reporter_behaviour
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/anomalies", tags=["anomalies"])
+
+
+class ReporterRunRequest(BaseModel):
+    """Analysis window; defaults to the last `weeks` weeks ending today."""
+
+    period_start: Optional[date] = None
+    period_end: Optional[date] = None
+    weeks: int = Field(default=26, ge=1, le=260)
+    method: Literal["kmeans", "dbscan"] = "kmeans"
+
+
+@router.post("/reporters/run")
+async def run_reporter_clustering(
+    body: ReporterRunRequest, request: Request, pool: asyncpg.Pool = Depends(get_pool)
+):
+    """Cluster reporter behaviour over the window and store the result as the latest run."""
+    period_end = body.period_end or date.today()
+    period_start = body.period_start or period_end - timedelta(weeks=body.weeks)
+    if period_end < period_start:
+        raise HTTPException(status_code=422, detail="period_end must be after or equal to period_start")
+
+    async def run() -> dict:
+        result = await reporter_behaviour.analyze_reporters(pool, period_start, period_end, body.method)
+        await request.app.state.reporter_cache.set_many({reporter_behaviour.LATEST_KEY: result})
+        await request.app.state.broadcaster.publish(
+            "analytics",
+            "analytics.updated",
+            {
+                "kind": "reporters",
+                "period_start": result["period_start"],
+                "period_end": result["period_end"],
+                "method": result["method"],
+                "reporters": result["reporters"],
+                "outliers": len(result["outliers"]),
+            },
+        )
+        return result
+
+    key = analysis_key("anomalies.reporters", period_start, period_end, body.method)
+    return await negotiated(request, await request.app.state.single_flight.do(key, run))
+
+
+@router.get("/reporters")
+async def latest_reporter_clustering(request: Request):
+    """The latest stored clustering run (outlier reporters first)."""
+    cached = await request.app.state.reporter_cache.get_many([reporter_behaviour.LATEST_KEY])
+    if reporter_behaviour.LATEST_KEY not in cached:
+        raise HTTPException(status_code=404, detail="No reporter clustering run yet")
+    return await negotiated(request, cached[reporter_behaviour.LATEST_KEY])
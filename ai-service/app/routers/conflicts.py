@@ -0,0 +1,153 @@
+"""
+Conflict detection write-back endpoints.
+"""
+
+import time
+from collections import Counter
+from datetime import date
+from typing import Optional
+
+import asyncpg
+import structlog
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from pydantic import BaseModel, Field, model_validator
+
+from app.config import settings
+from app.db import get_pool
+from app.responses import negotiated
+from app.services import conflict_store, data_quality, feature_store
+from app.services.detection import detect_period
+
+logger = structlog.get_logger()
+
+router = APIRouter(prefix="/api/ml/conflicts", tags=["conflicts"])
+
+
+class ConflictRow(BaseModel):
+    """One flagged employee; hours follow the decimal(5,2) columns of conflict_alerts."""
+
+    employee_id: int
+    source_a_hours: float = Field(ge=0, le=999.99)
+    source_b_hours: float = Field(ge=0, le=999.99)
+    discrepancy: float = Field(ge=-999.99, le=999.99)
+
+
+class PersistConflictsRequest(BaseModel):
+    """
+    Either a precomputed detection result (`conflicts` + `employees_checked`), or just
+    the period, in which case detection runs here against the report tables.
+    """
+
+    period_start: date
+    period_end: date
+    threshold: Optional[float] = None
+    employees_checked: Optional[int] = Field(default=None, ge=0)
+    conflicts: Optional[list[ConflictRow]] = None
+
+    @model_validator(mode="after")
+    def check_period(self) -> "PersistConflictsRequest":
+        if self.period_end < self.period_start:
+            raise ValueError("period_end must be after or equal to period_start")
+        if self.conflicts is not None:
+            # One conflict_alerts row per employee and period: a repeated id would make the
+            # batch upsert hit the same row twice and fail the whole request
+            counts = Counter(c.employee_id for c in self.conflicts)
+            duplicates = sorted(employee_id for employee_id, n in counts.items() if n > 1)
+            if duplicates:
+                raise ValueError(f"duplicate employee_id in conflicts: {duplicates}")
+        return self
+
+
+@router.post("/persist")
+async def persist_conflicts(
+    body: PersistConflictsRequest,
+    request: Request,
+    background: BackgroundTasks,
+    pool: asyncpg.Pool = Depends(get_pool),
+):
+    """
+    Persist a whole detection result: bulk upsert into conflict_alerts and record the
+    matching validation_runs row. The employee feature store is updated afterwards.
+    """
+    start = time.perf_counter()
+
+    async with pool.acquire() as conn:
+        run_id = await conflict_store.start_validation_run(conn, body.period_start, body.period_end)
+
+        threshold = body.threshold if body.threshold is not None else settings.conflict_threshold
+        if body.conflicts is None:
+            try:
+                result = await detect_period(conn, body.period_start, body.period_end, threshold)
+            except Exception as exc:
+                await conflict_store.fail_validation_run(conn, run_id, str(exc))
+                raise
+            records = result.conflict_records()
+            employees_checked = result.employees_checked
+            if result.quality is not None:
+                quality = result.quality.summary()
+                excluded = sum(source["excluded"] for source in quality["sources"].values())
+                if excluded:
+                    logger.warning("Entries excluded from detection", run_id=run_id, excluded=excluded, **quality["employees"])
+        else:
+            records = [
+                (c.employee_id, c.source_a_hours, c.source_b_hours, c.discrepancy)
+                for c in body.conflicts
+            ]
+            employees_checked = body.employees_checked if body.employees_checked is not None else len(records)
+            result = None  # only flagged rows were sent; the store reloads the full period
+
+        duration_ms = int((time.perf_counter() - start) * 1000)
+        merged = await conflict_store.persist_detection(
+            conn, run_id, body.period_start, body.period_end, records, employees_checked, duration_ms
+        )
+
+    scheduler = getattr(request.app.state, "escalation_scheduler", None)
+    if scheduler is not None:
+        await scheduler.schedule((row["id"], row["created_at"]) for row in merged)
+
+    background.add_task(
+        feature_store.update_period_once,
+        request.app.state.single_flight,
+        lambda: feature_store.current(request.app.state),
+        pool,
+        body.period_start,
+        body.period_end,
+        result,
+        threshold,
+    )
+
+    response = {
+        "validation_run_id": run_id,
+        "employees_checked": employees_checked,
+        "conflicts_found": len(records),
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    }
+    if result is not None and result.quality is not None:
+        response["data_quality"] = result.quality.summary()
+    await request.app.state.broadcaster.publish(
+        "analytics",
+        "validation.completed",
+        {"period_start": body.period_start.isoformat(), "period_end": body.period_end.isoformat(), **response},
+    )
+    return response
+
+
+@router.get("/data-quality")
+async def data_quality_report(
+    request: Request,
+    period_start: date,
+    period_end: date,
+    pool: asyncpg.Pool = Depends(get_pool),
+):
+    """
+    Run the pre-detection data-quality checks for a period without detecting anything:
+    counts per check, sample offending entry / employee ids and what would be excluded.
+    """
+    if period_end < period_start:
+        raise HTTPException(status_code=422, detail="period_end must be after or equal to period_start")
+
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            project, department = await data_quality.load_entries(conn, period_start, period_end)
+    _, _, report = data_quality.validate(project, department, period_start, period_end)
+    return await negotiated(request, {**report.to_dict(), "excluded_checks": sorted(data_quality.excluded_checks())})
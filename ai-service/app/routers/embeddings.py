@@ -0,0 +1,30 @@
+"""
+Embedding endpoints for report free text.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.responses import negotiated
+
+router = APIRouter(prefix="/api/ml/embeddings", tags=["embeddings"])
+
+
+class NoteRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=10000)
+
+
+@router.post("/notes")
+async def embed_note(body: NoteRequest, request: Request):
+    """Embedding of one note; concurrent calls share a batched model invocation."""
+    embedder = request.app.state.note_embedder
+    try:
+        vector = await embedder.embed(body.text)
+    except ImportError:
+        raise HTTPException(status_code=503, detail="Embedding model is not installed")
+    return await negotiated(request, {"dimensions": int(vector.size), "embedding": vector})
+
+
+@router.get("/notes/batching")
+async def note_batching_stats(request: Request):
+    return request.app.state.note_embedder.batcher.stats()
@@ -0,0 +1,29 @@
+"""
+Escalation scheduler endpoints.
+"""
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.services.escalation import EscalationScheduler
+
+router = APIRouter(prefix="/api/ml/escalations", tags=["escalations"])
+
+
+def _scheduler(request: Request) -> EscalationScheduler:
+    scheduler = getattr(request.app.state, "escalation_scheduler", None)
+    if scheduler is None:
+        raise HTTPException(status_code=503, detail="Escalation scheduler is not running")
+    return scheduler
+
+
+@router.get("/queue")
+async def escalation_queue(request: Request):
+    """Size of the due queue and the next escalation deadline."""
+    return await _scheduler(request).stats()
+
+
+@router.post("/run")
+async def run_escalations(request: Request):
+    """Escalate everything that is due now instead of waiting for the next tick."""
+    escalated = await _scheduler(request).process_due()
+    return {"escalated_count": escalated}
@@ -0,0 +1,63 @@
+"""
+Server-sent event stream for dashboards.
+"""
+
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.broadcast import TOPICS
+from app.config import settings
+
+router = APIRouter(prefix="/api/ml/events", tags=["events"])
+
+
+@router.get("/stream")
+async def event_stream(
+    request: Request,
+    topics: str = Query(",".join(TOPICS), description="Comma-separated: conflicts, analytics"),
+    last_event_id: Optional[int] = Header(default=None),
+):
+    """
+    Push conflict creations, status changes and freshly computed analytics as
+    text/event-stream. Reconnecting with Last-Event-ID replays recent missed events.
+    """
+    wanted = {t.strip() for t in topics.split(",") if t.strip()}
+    unknown = wanted - set(TOPICS)
+    if unknown or not wanted:
+        raise HTTPException(status_code=422, detail=f"topics must be a subset of {', '.join(TOPICS)}")
+
+    try:
+        subscription = request.app.state.broadcaster.subscribe(wanted, last_event_id)
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many event subscribers", headers={"Retry-After": "30"})
+
+    async def frames():
+        with subscription:
+            yield b"retry: %d\n\n" % int(settings.sse_retry_ms)
+            for frame in subscription.replay:
+                yield frame
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), settings.sse_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle stream
+                    yield b": keep-alive\n\n"
+                    continue
+                if frame is None:
+                    return
+                yield frame
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stats")
+async def event_stats(request: Request):
+    """Subscriber and delivery counters for this worker."""
+    return request.app.state.broadcaster.stats()
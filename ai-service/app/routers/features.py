@@ -0,0 +1,52 @@
+"""
+Employee risk profile endpoints backed by the per-employee feature store.
+"""
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.db import get_pool
+from app.responses import negotiated
+from app.services import feature_store
+from app.services.feature_store import EmployeeFeatureStore
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/employees", tags=["employees"])
+
+
+class RiskProfileRequest(BaseModel):
+    employee_ids: list[int] = Field(min_length=1, max_length=10000)
+
+
+def current_store(request: Request) -> EmployeeFeatureStore:
+    return feature_store.current(request.app.state)
+
+
+@router.post("/risk-profiles")
+async def risk_profiles(body: RiskProfileRequest, request: Request):
+    """Rolling discrepancy stats, conflict/amendment rates and recurrence per employee."""
+    store = current_store(request)
+    return await negotiated(
+        request, {"employees": store.features(body.employee_ids), "employees_tracked": store.size}
+    )
+
+
+@router.get("/{employee_id}/risk-profile")
+async def risk_profile(employee_id: int, request: Request):
+    profile = current_store(request).features([employee_id])[employee_id]
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No history for employee")
+    return {"employee_id": employee_id, **profile}
+
+
+@router.post("/risk-profiles/rebuild")
+async def rebuild_profiles(request: Request, pool: asyncpg.Pool = Depends(get_pool)):
+    """Replay all completed validation runs into a fresh store (after backfills or fixes)."""
+
+    async def run() -> dict:
+        store = await feature_store.rebuild(pool)
+        request.app.state.feature_store = store
+        return {"employees_tracked": store.size}
+
+    return await request.app.state.single_flight.do(analysis_key("features.rebuild"), run)
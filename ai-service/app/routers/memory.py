@@ -0,0 +1,76 @@
+"""
+Admin endpoints for the opt-in memory profiler (app/memory.py).
+
+Every response describes the worker that served it (see `pid`); repeat a call or
+pin a worker to follow one process.
+"""
+
+import asyncio
+import os
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app import memory
+
+router = APIRouter(prefix="/api/ml/admin/memory", tags=["admin"])
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+
+def _profiler(request: Request) -> memory.MemoryProfiler:
+    profiler = request.app.state.memory_profiler
+    if profiler is None or not profiler.tracing:
+        raise HTTPException(status_code=503, detail="Memory profiling is disabled (MEMORY_PROFILING_ENABLED)")
+    return profiler
+
+
+@router.get("")
+async def memory_status(request: Request):
+    """RSS, GC state and, while profiling, traced memory and per-endpoint request peaks."""
+    profiler = request.app.state.memory_profiler
+    return {
+        "pid": os.getpid(),
+        "rss_bytes": memory.rss_bytes(),
+        "rss_peak_bytes": memory.peak_rss_bytes(),
+        "gc": memory.gc_stats.to_dict(),
+        "profiling": profiler.stats() if profiler is not None else None,
+    }
+
+
+@router.get("/top")
+async def top_allocations(
+    request: Request,
+    limit: int = Query(25, ge=1, le=500),
+    group_by: GroupBy = "lineno",
+):
+    """Largest live allocation sites of this worker right now."""
+    profiler = _profiler(request)
+    return {"pid": os.getpid(), **await asyncio.to_thread(profiler.top, limit, group_by)}
+
+
+@router.post("/snapshots")
+async def store_snapshot(request: Request, label: str = Query("", max_length=100)):
+    """Keep a snapshot as the base of later diffs (the oldest is dropped past the limit)."""
+    profiler = _profiler(request)
+    return {"pid": os.getpid(), **await asyncio.to_thread(profiler.store_snapshot, label)}
+
+
+@router.get("/snapshots")
+async def list_snapshots(request: Request):
+    return {"pid": os.getpid(), "snapshots": [s.info() for s in _profiler(request).snapshots]}
+
+
+@router.get("/diff")
+async def snapshot_diff(
+    request: Request,
+    base: Optional[int] = Query(None, description="Snapshot id; defaults to the latest stored snapshot"),
+    limit: int = Query(25, ge=1, le=500),
+    group_by: GroupBy = "lineno",
+):
+    """Allocation growth per site since a stored snapshot, largest first."""
+    profiler = _profiler(request)
+    stored = profiler.find_snapshot(base)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="No such snapshot on this worker; POST /snapshots first")
+    return {"pid": os.getpid(), **await asyncio.to_thread(profiler.diff, stored, limit, group_by)}
@@ -0,0 +1,71 @@
+"""
+Predictive endpoints: conflict risk of draft report entries.
+"""
+
+from datetime import date
+from typing import Literal, Optional
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.config import settings
+from app.db import get_pool
+from app.services import conflict_risk
+from app.services.conflict_risk import ConflictRiskScorer, ScoreRequest
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/predictions", tags=["predictions"])
+
+
+class DraftEntry(BaseModel):
+    """A draft entry as saved by ProjectReportEntryController / DepartmentReportController."""
+
+    employee_id: int
+    period_start: date
+    source: Literal["project", "department"]
+    hours: float = Field(ge=0, le=999.99)
+    report_id: Optional[int] = None  # the report the entry belongs to
+
+
+def _scorer(request: Request) -> ConflictRiskScorer:
+    scorer = request.app.state.conflict_risk
+    if scorer.pool is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    if scorer.current_model() is None:
+        raise HTTPException(status_code=503, detail="Conflict risk model is not trained")
+    return scorer
+
+
+@router.post("/conflict-risk")
+async def score_draft_entry(entry: DraftEntry, request: Request):
+    """Probability that the employee's period ends up as a conflict, given this entry."""
+    probability = await _scorer(request).score(ScoreRequest(**entry.model_dump()))
+    return {
+        "employee_id": entry.employee_id,
+        "probability": round(probability, 4),
+        "likely_conflict": probability >= settings.risk_alert_probability,
+    }
+
+
+@router.get("/conflict-risk/model")
+async def conflict_risk_model(request: Request):
+    scorer = request.app.state.conflict_risk
+    if scorer.current_model() is None:
+        raise HTTPException(status_code=404, detail="Conflict risk model is not trained")
+    return {**scorer.model.info(), "batching": scorer.batcher.stats()}
+
+
+@router.post("/conflict-risk/train")
+async def train_conflict_risk(request: Request, pool: asyncpg.Pool = Depends(get_pool)):
+    """Retrain on the last RISK_TRAINING_WEEKS of report history and swap the model in."""
+
+    async def run() -> dict:
+        try:
+            model = await conflict_risk.train(pool)
+        except ValueError as exc:
+            raise HTTPException(status_code=422, detail=str(exc))
+        request.app.state.conflict_risk.model = model
+        return model.info()
+
+    return await request.app.state.single_flight.do(analysis_key("predictions.conflict_risk.train"), run)
@@ -0,0 +1,70 @@
+"""
+Threshold what-if simulation endpoints.
+"""
+
+from datetime import date
+from typing import Literal, Optional
+
+import asyncpg
+import numpy as np
+from fastapi import APIRouter, Depends, Request
+from pydantic import BaseModel, Field, model_validator
+
+from app.config import settings
+from app.db import get_pool
+from app.responses import negotiated
+from app.services.threshold_simulator import load_simulation_input, simulate
+
+router = APIRouter(prefix="/api/ml/thresholds", tags=["thresholds"])
+
+MAX_THRESHOLDS = 10000
+
+
+class ThresholdRange(BaseModel):
+    start: float = Field(ge=0)
+    stop: float = Field(ge=0)
+    step: float = Field(gt=0)
+
+
+class SimulationRequest(BaseModel):
+    """A period plus candidate thresholds, as an explicit list and/or a range."""
+
+    period_start: date
+    period_end: date
+    metric: Literal["absolute", "relative"] = "absolute"
+    thresholds: Optional[list[float]] = Field(default=None, max_length=MAX_THRESHOLDS)
+    range: Optional[ThresholdRange] = None
+
+    @model_validator(mode="after")
+    def check(self) -> "SimulationRequest":
+        if self.period_end < self.period_start:
+            raise ValueError("period_end must be after or equal to period_start")
+        if self.range is not None and (self.range.stop - self.range.start) / self.range.step > MAX_THRESHOLDS:
+            raise ValueError(f"range yields more than {MAX_THRESHOLDS} thresholds")
+        return self
+
+    def candidates(self) -> np.ndarray:
+        values = list(self.thresholds or [])
+        if self.range is not None:
+            values.extend(np.arange(self.range.start, self.range.stop + self.range.step / 2, self.range.step))
+        if not values:
+            current = settings.conflict_threshold if self.metric == "absolute" else settings.variance_threshold
+            values = [current]
+        return np.unique(np.round(np.asarray(values, dtype=np.float64), 6))
+
+
+@router.post("/simulate")
+async def simulate_thresholds(
+    body: SimulationRequest, request: Request, pool: asyncpg.Pool = Depends(get_pool)
+):
+    """
+    Conflict counts, affected departments and precision/recall against historically
+    resolved conflicts for every candidate threshold. Writes nothing.
+    """
+    async with pool.acquire() as conn:
+        data = await load_simulation_input(conn, body.period_start, body.period_end, body.metric)
+    result = simulate(data, body.candidates())
+    result["current_threshold"] = (
+        settings.conflict_threshold if body.metric == "absolute" else settings.variance_threshold
+    )
+    return await negotiated(request, result)
@@ -0,0 +1,36 @@
+"""
+Trend analytics endpoints.
+"""
+
+from datetime import date
+from typing import Optional
+
+import asyncpg
+from fastapi import APIRouter, Depends, Query, Request
+
+from app.db import get_pool
+from app.responses import negotiated
+from app.services.trends import conflict_trends
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/trends", tags=["trends"])
+
+
+@router.get("/conflicts")
+async def conflict_trend_series(
+    request: Request,
+    weeks: int = Query(52, ge=1, le=260),
+    department_id: Optional[int] = None,
+    pool: asyncpg.Pool = Depends(get_pool),
+):
+    """
+    Weekly series of conflict count, mean absolute discrepancy, mean hours to resolution
+    and escalation rate, organization-wide (plus per department) or for one department.
+    Identical concurrent requests share one computation.
+    """
+    today = date.today()
+    key = analysis_key("trends.conflicts", weeks, department_id, today)
+    result = await request.app.state.single_flight.do(
+        key, lambda: conflict_trends(pool, request.app.state.trend_cache, weeks, department_id, today)
+    )
+    return await negotiated(request, result)
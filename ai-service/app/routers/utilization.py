@@ -0,0 +1,52 @@
+"""
+Resource-utilization analytics endpoints.
+"""
+
+from datetime import date
+
+import asyncpg
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.db import get_pool
+from app.responses import negotiated
+from app.services.utilization import utilization_report
+from app.singleflight import analysis_key
+
+router = APIRouter(prefix="/api/ml/utilization", tags=["utilization"])
+
+
+@router.get("/allocation")
+async def allocation_analysis(
+    request: Request,
+    period_start: date,
+    period_end: date,
+    detail: bool = False,
+    pool: asyncpg.Pool = Depends(get_pool),
+):
+    """
+    Over/under-allocated employees, fragmentation and project staffing concentration for
+    the whole organization in one period. `detail=true` adds the per-employee and
+    per-project metric columns.
+    """
+    if period_end < period_start:
+        raise HTTPException(status_code=422, detail="period_end must be after or equal to period_start")
+
+    async def run() -> dict:
+        report = await utilization_report(pool, period_start, period_end)
+        await request.app.state.broadcaster.publish(
+            "analytics",
+            "analytics.updated",
+            {
+                "kind": "utilization",
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "summary": report["summary"],
+            },
+        )
+        return report
+
+    key = analysis_key("utilization.allocation", period_start, period_end)
+    result = await request.app.state.single_flight.do(key, run)
+    if not detail:
+        result = {k: v for k, v in result.items() if k not in ("employees", "projects")}
+    return await negotiated(request, result)
@@ -0,0 +1,118 @@
+"""
+Serving entry point: `python -m app.server`.
+
+With RELOAD=true this is the old single reloading uvicorn process. Otherwise gunicorn
+supervises WORKERS uvicorn workers (uvloop event loop, httptools parser):
+
+- WORKERS=0 sizes the pool from the CPUs actually available to the container
+  (scheduler affinity and cgroup CPU quota, not the host's core count).
+- Workers are recycled after WORKER_MAX_REQUESTS (+ jitter) requests, bounding the
+  memory creep of long-lived ML libraries.
+- With PRELOAD_APP the master imports the app and loads PREWARM_ENGINES once before
+  forking, so workers share those pages copy-on-write instead of each loading them.
+- BLAS/OpenMP pools are capped at cores / workers per worker to avoid oversubscription.
+
+Each worker opens its own database pool (DB_POOL_MAX_SIZE per worker), so size
+Postgres max_connections for WORKERS * DB_POOL_MAX_SIZE.
+"""
+
+import gc
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+from app.config import settings
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS")
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """CPU limit from cgroup v2 (cpu.max) or v1 (cfs quota/period); None if unlimited."""
+    try:
+        quota, period = (CGROUP_ROOT / "cpu.max").read_text().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int((CGROUP_ROOT / "cpu" / "cpu.cfs_quota_us").read_text())
+        period = int((CGROUP_ROOT / "cpu" / "cpu.cfs_period_us").read_text())
+        return None if quota <= 0 else quota / period
+    except (OSError, ValueError):
+        return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return max(1, cpus)
+
+
+def worker_count() -> int:
+    return settings.workers if settings.workers > 0 else available_cpus()
+
+
+def limit_compute_threads(workers: int) -> None:
+    """Cap native thread pools unless the environment already sets them."""
+    threads = settings.worker_compute_threads or max(1, available_cpus() // workers)
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(threads))
+
+
+def gunicorn_options(workers: int) -> dict:
+    return {
+        "bind": f"{settings.host}:{settings.port}",
+        "workers": workers,
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "max_requests": settings.worker_max_requests,
+        "max_requests_jitter": settings.worker_max_requests_jitter,
+        "timeout": settings.worker_timeout_seconds,
+        "graceful_timeout": settings.worker_graceful_timeout_seconds,
+        "keepalive": settings.keepalive_seconds,
+        "preload_app": settings.preload_app,
+        "accesslog": "-",
+        "errorlog": "-",
+    }
+
+
+def _run_gunicorn(workers: int) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(workers).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import engines
+            from app.main import app
+
+            if settings.preload_app:
+                engines.preload(engines.prewarm_names())
+                # Keep the preloaded heap out of the collector so workers don't dirty it
+                gc.freeze()
+            return app
+
+    Server().run()
+
+
+def run() -> None:
+    if settings.reload:
+        import uvicorn
+
+        uvicorn.run("app.main:app", host=settings.host, port=settings.port, reload=True)
+        return
+
+    workers = worker_count()
+    limit_compute_threads(workers)
+    _run_gunicorn(workers)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,3 @@
+"""
+Domain services used by the AI/ML API routers.
+"""
@@ -0,0 +1,323 @@
+"""
+Amendment impact analysis over the project/department amendment history.
+
+Amendments store full before/after report snapshots (`old_data` / `new_data` on
+project_report_amendments, `changes.old_data` / `changes.new_data` on
+department_report_amendments). The JSON diff is decoded inside Postgres: the entries
+arrays of both snapshots are expanded with jsonb_array_elements and full-joined per
+employee, so only changed (amendment, employee, old_hours, new_hours) rows leave the
+database. Those rows are streamed through a server-side cursor in chunks of
+AMENDMENT_CHUNK_ROWS; each chunk is classified with array operations against the
+conflict_alerts rows of the same (employee, period) keys and folded into running
+totals, so memory is bounded by the chunk size however long the history grows.
+
+For a change with signed effect s on the discrepancy (source_a - source_b; +delta for
+project amendments, -delta for department ones) and a matching conflict whose recorded
+discrepancy is d:
+
+    conflict detected after the amendment   created   if |d - s| <= t < |d|
+    conflict detected before the amendment  resolved  if |d| > t >= |d + s|
+
+A resolving amendment on a conflict that was still open is a silencing candidate;
+candidates whose amended side now matches the other source exactly rank first.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Optional
+
+import asyncpg
+import numpy as np
+
+from app.config import settings
+
+_DELTAS_SQL = """
+    SELECT a.id AS amendment_id,
+           a.{report_fk} AS report_id,
+           a.{amended_by} AS amended_by,
+           a.created_at AS amended_at,
+           a.{reason} AS reason,
+           coalesce(left({new_data}->>'reporting_period_start', 10)::date, r.reporting_period_start) AS period_start,
+           d.employee_id,
+           d.old_hours,
+           d.new_hours
+    FROM {amendments} a
+    JOIN {reports} r ON r.id = a.{report_fk}
+    CROSS JOIN LATERAL (
+        SELECT coalesce(o.employee_id, n.employee_id) AS employee_id,
+               coalesce(o.hours, 0)::float8 AS old_hours,
+               coalesce(n.hours, 0)::float8 AS new_hours
+        FROM (
+            SELECT (e->>'employee_id')::bigint AS employee_id, sum((e->>'hours_worked')::numeric) AS hours
+            FROM jsonb_array_elements(coalesce({old_data}->'entries', '[]'::jsonb)) e
+            GROUP BY 1
+        ) o
+        FULL JOIN (
+            SELECT (e->>'employee_id')::bigint AS employee_id, sum((e->>'hours_worked')::numeric) AS hours
+            FROM jsonb_array_elements(coalesce({new_data}->'entries', '[]'::jsonb)) e
+            GROUP BY 1
+        ) n ON n.employee_id = o.employee_id
+        WHERE o.hours IS DISTINCT FROM n.hours
+    ) d
+    WHERE a.created_at >= $1
+    ORDER BY a.id
+"""
+
+PROJECT_DELTAS_SQL = _DELTAS_SQL.format(
+    amendments="project_report_amendments",
+    reports="project_reports",
+    report_fk="project_report_id",
+    amended_by="user_id",
+    reason="reason",
+    old_data="a.old_data",
+    new_data="a.new_data",
+)
+DEPARTMENT_DELTAS_SQL = _DELTAS_SQL.format(
+    amendments="department_report_amendments",
+    reports="department_reports",
+    report_fk="department_report_id",
+    amended_by="amended_by",
+    reason="amendment_reason",
+    old_data="(a.changes->'old_data')",
+    new_data="(a.changes->'new_data')",
+)
+
+CONFLICTS_SQL = """
+    SELECT c.employee_id, c.reporting_period_start, c.discrepancy::float8, c.status,
+           c.created_at, c.resolved_at
+    FROM conflict_alerts c
+    JOIN unnest($1::bigint[], $2::date[]) AS k(employee_id, period_start)
+      ON c.employee_id = k.employee_id AND c.reporting_period_start = k.period_start
+"""
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _ts(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.inf
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH).total_seconds()
+
+
+def pair_keys(employee_ids: np.ndarray, period_ordinals: np.ndarray) -> np.ndarray:
+    """One int64 per (employee, period); date ordinals fit in 20 bits."""
+    return (employee_ids.astype(np.int64) << 20) | period_ordinals.astype(np.int64)
+
+
+@dataclass
+class DeltaChunk:
+    """Changed entries of a chunk of amendments, as parallel arrays."""
+
+    source: str
+    amendment_ids: np.ndarray
+    report_ids: np.ndarray
+    amended_by: np.ndarray
+    amended_at: np.ndarray  # epoch seconds
+    reasons: list
+    period_ordinals: np.ndarray
+    employee_ids: np.ndarray
+    old_hours: np.ndarray
+    new_hours: np.ndarray
+
+    @classmethod
+    def from_records(cls, source: str, rows) -> "DeltaChunk":
+        return cls(
+            source=source,
+            amendment_ids=np.array([r["amendment_id"] for r in rows], dtype=np.int64),
+            report_ids=np.array([r["report_id"] for r in rows], dtype=np.int64),
+            amended_by=np.array([r["amended_by"] for r in rows], dtype=np.int64),
+            amended_at=np.array([_ts(r["amended_at"]) for r in rows], dtype=np.float64),
+            reasons=[r["reason"] for r in rows],
+            period_ordinals=np.array([r["period_start"].toordinal() for r in rows], dtype=np.int64),
+            employee_ids=np.array([r["employee_id"] for r in rows], dtype=np.int64),
+            old_hours=np.array([r["old_hours"] for r in rows], dtype=np.float64),
+            new_hours=np.array([r["new_hours"] for r in rows], dtype=np.float64),
+        )
+
+    @property
+    def delta(self) -> np.ndarray:
+        return self.new_hours - self.old_hours
+
+    @property
+    def signed_effect(self) -> np.ndarray:
+        """Effect on source_a - source_b."""
+        return self.delta if self.source == "project" else -self.delta
+
+
+@dataclass
+class ConflictIndex:
+    """conflict_alerts rows sorted by (employee, period) key."""
+
+    keys: np.ndarray
+    discrepancy: np.ndarray
+    created_at: np.ndarray
+    resolved_at: np.ndarray  # inf while unresolved
+
+    @classmethod
+    def from_records(cls, rows) -> "ConflictIndex":
+        keys = pair_keys(
+            np.array([r[0] for r in rows], dtype=np.int64),
+            np.array([r[1].toordinal() for r in rows], dtype=np.int64),
+        )
+        order = np.argsort(keys, kind="stable")
+        return cls(
+            keys=keys[order],
+            discrepancy=np.array([r[2] for r in rows], dtype=np.float64)[order],
+            created_at=np.array([_ts(r[4]) for r in rows], dtype=np.float64)[order],
+            resolved_at=np.array([_ts(r[5]) for r in rows], dtype=np.float64)[order],
+        )
+
+
+def classify(chunk: DeltaChunk, conflicts: ConflictIndex, threshold: float) -> dict[str, np.ndarray]:
+    """Per changed entry: created / resolved / silencing masks and discrepancy before/after."""
+    keys = pair_keys(chunk.employee_ids, chunk.period_ordinals)
+    if conflicts.keys.size:
+        pos = np.minimum(np.searchsorted(conflicts.keys, keys), conflicts.keys.size - 1)
+        matched = conflicts.keys[pos] == keys
+        d = np.where(matched, conflicts.discrepancy[pos], np.nan)
+        created_at = np.where(matched, conflicts.created_at[pos], np.nan)
+        resolved_at = np.where(matched, conflicts.resolved_at[pos], np.nan)
+    else:
+        matched = np.zeros(keys.size, dtype=bool)
+        d = created_at = resolved_at = np.full(keys.size, np.nan)
+    s = chunk.signed_effect
+
+    detected_after = matched & (created_at > chunk.amended_at)
+    detected_before = matched & ~detected_after
+    before = np.where(detected_after, d - s, d)
+    after = np.where(detected_after, d, d + s)
+
+    with np.errstate(invalid="ignore"):
+        created = detected_after & (np.abs(before) <= threshold) & (np.abs(after) > threshold)
+        resolved = detected_before & (np.abs(before) > threshold) & (np.abs(after) <= threshold)
+        open_at_amendment = resolved_at >= chunk.amended_at
+    silencing = resolved & open_at_amendment
+    return {
+        "matched": matched,
+        "created": created,
+        "resolved": resolved,
+        "silencing": silencing,
+        "exact_match": silencing & (np.abs(np.nan_to_num(after)) < 0.005),
+        "discrepancy_before": before,
+        "discrepancy_after": after,
+    }
+
+
+class AmendmentImpact:
+    """Running totals over streamed chunks; keeps only the top silencing candidates."""
+
+    def __init__(self, threshold: float, max_candidates: int) -> None:
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.amendment_count = 0
+        self._last_amendment: dict[str, int] = {}  # rows arrive ordered by amendment id
+        self.totals = {
+            "entry_changes": 0,
+            "hours_added": 0.0,
+            "hours_removed": 0.0,
+            "linked_to_conflicts": 0,
+            "created_conflicts": 0,
+            "resolved_conflicts": 0,
+            "silencing_candidates": 0,
+        }
+        self.by_amender: dict[int, dict[str, int]] = {}
+        self._candidates: list[tuple] = []  # min-heap on rank
+        self._seq = 0
+
+    def add(self, chunk: DeltaChunk, conflicts: ConflictIndex) -> None:
+        if chunk.employee_ids.size == 0:
+            return
+        result = classify(chunk, conflicts, self.threshold)
+        delta = chunk.delta
+
+        ids = np.unique(chunk.amendment_ids)
+        self.amendment_count += int(ids.size) - int(ids[0] == self._last_amendment.get(chunk.source))
+        self._last_amendment[chunk.source] = int(ids[-1])
+        t = self.totals
+        t["entry_changes"] += int(delta.size)
+        t["hours_added"] += float(delta[delta > 0].sum())
+        t["hours_removed"] += float(-delta[delta < 0].sum())
+        t["linked_to_conflicts"] += int(result["matched"].sum())
+        t["created_conflicts"] += int(result["created"].sum())
+        t["resolved_conflicts"] += int(result["resolved"].sum())
+        t["silencing_candidates"] += int(result["silencing"].sum())
+
+        amenders, inverse = np.unique(chunk.amended_by, return_inverse=True)
+        changes = np.bincount(inverse, minlength=amenders.size)
+        silencing = np.bincount(inverse, weights=result["silencing"], minlength=amenders.size)
+        created = np.bincount(inverse, weights=result["created"], minlength=amenders.size)
+        for user_id, c, s, cr in zip(amenders.tolist(), changes.tolist(), silencing.tolist(), created.tolist()):
+            entry = self.by_amender.setdefault(user_id, {"entry_changes": 0, "silencing": 0, "created": 0})
+            entry["entry_changes"] += c
+            entry["silencing"] += int(s)
+            entry["created"] += int(cr)
+
+        for i in np.flatnonzero(result["silencing"]):
+            rank = (bool(result["exact_match"][i]), abs(float(delta[i])))
+            self._seq += 1
+            item = (rank, self._seq, self._candidate(chunk, result, i))
+            if len(self._candidates) < self.max_candidates:
+                heapq.heappush(self._candidates, item)
+            elif item[0] > self._candidates[0][0]:
+                heapq.heapreplace(self._candidates, item)
+
+    def _candidate(self, chunk: DeltaChunk, result: dict, i: int) -> dict:
+        return {
+            "source": chunk.source,
+            "amendment_id": int(chunk.amendment_ids[i]),
+            "report_id": int(chunk.report_ids[i]),
+            "amended_by": int(chunk.amended_by[i]),
+            "employee_id": int(chunk.employee_ids[i]),
+            "period_start": date.fromordinal(int(chunk.period_ordinals[i])).isoformat(),
+            "old_hours": float(chunk.old_hours[i]),
+            "new_hours": float(chunk.new_hours[i]),
+            "discrepancy_before": round(float(result["discrepancy_before"][i]), 2),
+            "discrepancy_after": round(float(result["discrepancy_after"][i]), 2),
+            "exact_match": bool(result["exact_match"][i]),
+            "reason": chunk.reasons[i],
+        }
+
+    def report(self) -> dict:
+        totals = {k: round(v, 2) if isinstance(v, float) else v for k, v in self.totals.items()}
+        amenders = sorted(
+            ({"user_id": user_id, **counts} for user_id, counts in self.by_amender.items()),
+            key=lambda a: (-a["silencing"], -a["entry_changes"]),
+        )
+        return {
+            "threshold": self.threshold,
+            "summary": {"amendments_with_hour_changes": self.amendment_count, **totals},
+            "by_amender": amenders,
+            "silencing_candidates": [c for _, _, c in sorted(self._candidates, reverse=True)],
+        }
+
+
+def naive_utc(value: datetime) -> datetime:
+    """created_at is Laravel's `timestamp without time zone` in UTC; asyncpg rejects aware values for it."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def analyze_amendments(pool: asyncpg.Pool, since: Optional[datetime] = None) -> dict:
+    """Stream the whole amendment history (or everything since `since`) in chunks."""
+    since = naive_utc(since) if since is not None else datetime(1970, 1, 1)
+    analysis = AmendmentImpact(settings.conflict_threshold, settings.amendment_max_candidates)
+    async with pool.acquire() as conn:
+        async with conn.transaction(readonly=True):
+            for source, sql in (("project", PROJECT_DELTAS_SQL), ("department", DEPARTMENT_DELTAS_SQL)):
+                cursor = await conn.cursor(sql, since)
+                while True:
+                    rows = await cursor.fetch(settings.amendment_chunk_rows)
+                    if not rows:
+                        break
+                    chunk = DeltaChunk.from_records(source, rows)
+                    conflict_rows = await conn.fetch(
+                        CONFLICTS_SQL,
+                        chunk.employee_ids.tolist(),
+                        [date.fromordinal(int(o)) for o in chunk.period_ordinals],
+                    )
+                    analysis.add(chunk, ConflictIndex.from_records(conflict_rows))
+    return analysis.report()
@@ -0,0 +1,361 @@
+"""
+Postgres change feed (LISTEN/NOTIFY).
+
+Triggers from the backend migration 2026_02_09_000001_create_change_feed_triggers
+NOTIFY a JSON payload on every insert, update and delete of the report, entry,
+amendment, conflict and validation-run tables. One connection taken from the shared
+pool LISTENs on those channels; notifications are gathered for CHANGE_FEED_DEBOUNCE_MS
+(or until CHANGE_FEED_MAX_EVENTS arrive), folded into a ChangeBatch and handed to
+every subscribed handler, so a bulk import of thousands of entries costs one cache
+invalidation instead of thousands.
+
+NOTIFY is not durable: changes made while the listener is reconnecting are lost, so
+after a reconnect handlers get a batch with `resync=True` and should catch up from
+the tables themselves.
+"""
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+import asyncpg
+import structlog
+
+from app.broadcast import Broadcaster
+from app.cache import ResultCache
+from app.config import settings
+from app.services import feature_store
+from app.services import trends as trend_engine
+from app.services.escalation import EscalationScheduler
+from app.singleflight import SingleFlight
+
+logger = structlog.get_logger()
+
+CHANNELS = ("report_changes", "entry_changes", "amendment_changes", "conflict_changes", "validation_changes")
+
+REPORT_PERIODS_SQL = {
+    "project": "SELECT id, reporting_period_start, reporting_period_end FROM project_reports WHERE id = ANY($1::bigint[])",
+    "department": "SELECT id, reporting_period_start, reporting_period_end FROM department_reports WHERE id = ANY($1::bigint[])",
+}
+
+COMPLETED_RUNS_SINCE_SQL = """
+    SELECT DISTINCT reporting_period_start, reporting_period_end
+    FROM validation_runs
+    WHERE status = 'completed' AND reporting_period_start > $1
+    ORDER BY reporting_period_start
+"""
+
+
+def _source(table: str) -> str:
+    return "project" if table.startswith("project_") else "department"
+
+
+@dataclass
+class ChangeBatch:
+    """Everything that changed during one debounce window, deduplicated."""
+
+    events: int = 0
+    resync: bool = False
+    # (source, report_id) of reports whose rows, entries or amendments changed
+    reports: set[tuple[str, int]] = field(default_factory=set)
+    # (period_start, period_end) of those reports, resolved for entries and amendments
+    periods: set[tuple[date, date]] = field(default_factory=set)
+    employee_ids: set[int] = field(default_factory=set)
+    amendments: int = 0
+    conflicts: dict[int, dict] = field(default_factory=dict)  # id -> merged payload
+    completed_runs: set[tuple[date, date]] = field(default_factory=set)
+
+    def add(self, channel: str, payload: dict) -> None:
+        self.events += 1
+        table = payload.get("table", "")
+        period = _period(payload)
+        if "employee_id" in payload and payload["employee_id"] is not None:
+            self.employee_ids.add(int(payload["employee_id"]))
+
+        if channel == "conflict_changes":
+            conflict_id = int(payload["id"])
+            previous = self.conflicts.get(conflict_id)
+            if previous is not None:
+                # Created then updated within the window is still a creation
+                payload = {
+                    **payload,
+                    "op": "INSERT" if previous["op"] == "INSERT" else payload["op"],
+                    "changed": sorted(set(previous.get("changed", ())) | set(payload.get("changed", ()))),
+                }
+            self.conflicts[conflict_id] = payload
+            if period is not None:
+                self.periods.add(period)
+        elif channel == "validation_changes":
+            if payload.get("status") == "completed" and period is not None:
+                self.completed_runs.add(period)
+        elif channel == "report_changes":
+            self.reports.add((_source(table), int(payload["id"])))
+            if period is not None:
+                self.periods.add(period)
+        else:
+            report_id = payload.get("project_report_id", payload.get("department_report_id"))
+            if report_id is not None:
+                self.reports.add((_source(table), int(report_id)))
+            if channel == "amendment_changes":
+                self.amendments += 1
+
+    @property
+    def conflict_periods(self) -> set[date]:
+        return {d for d in (_parse_date(c.get("reporting_period_start")) for c in self.conflicts.values()) if d}
+
+
+def _parse_date(value) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def _period(payload: dict) -> Optional[tuple[date, date]]:
+    start = _parse_date(payload.get("reporting_period_start"))
+    end = _parse_date(payload.get("reporting_period_end"))
+    return (start, end) if start and end else None
+
+
+Handler = Callable[[ChangeBatch], Awaitable[None]]
+
+
+class ChangeFeed:
+    """LISTENs on the change channels and dispatches debounced batches to handlers."""
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        debounce_ms: float = 500.0,
+        max_events: int = 5000,
+        reconnect_seconds: float = 5.0,
+    ) -> None:
+        self.pool = pool
+        self.debounce = debounce_ms / 1000
+        self.max_events = max_events
+        self.reconnect_seconds = reconnect_seconds
+        self._handlers: list[tuple[str, Handler]] = []
+        self._pending: Optional[ChangeBatch] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._task: Optional[asyncio.Task] = None
+        self._dispatching: set[asyncio.Task] = set()
+        self._dispatch_lock = asyncio.Lock()
+        self.connected = False
+        self.batches = 0
+        self.events = 0
+        self.reconnects = 0
+        self.last_batch_ms: Optional[float] = None
+
+    def subscribe(self, name: str, handler: Handler) -> None:
+        self._handlers.append((name, handler))
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Unreadable change notification", channel=channel)
+            return
+        if self._pending is None:
+            self._pending = ChangeBatch()
+        self._pending.add(channel, data)
+        self.events += 1
+        if self._pending.events >= self.max_events:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.debounce, self._flush)
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, None
+        if batch is None:
+            return
+        task = asyncio.create_task(self.dispatch(batch))
+        self._dispatching.add(task)
+        task.add_done_callback(self._dispatching.discard)
+
+    async def dispatch(self, batch: ChangeBatch) -> None:
+        """Resolve report periods, then run every handler; batches are handled in order."""
+        async with self._dispatch_lock:
+            start = time.perf_counter()
+            try:
+                await self._resolve_periods(batch)
+            except Exception as exc:
+                logger.warning("Change feed period lookup failed", error=str(exc))
+            for name, handler in self._handlers:
+                try:
+                    await handler(batch)
+                except Exception as exc:
+                    logger.error("Change feed handler failed", handler=name, error=str(exc))
+            self.batches += 1
+            self.last_batch_ms = round((time.perf_counter() - start) * 1000, 2)
+            logger.debug("Change batch dispatched", events=batch.events, reports=len(batch.reports), ms=self.last_batch_ms)
+
+    async def _resolve_periods(self, batch: ChangeBatch) -> None:
+        """Entries and amendments only carry their report id; fetch those reports' periods."""
+        if not batch.reports or self.pool is None:
+            return
+        async with self.pool.acquire() as conn:
+            for source, sql in REPORT_PERIODS_SQL.items():
+                ids = [report_id for s, report_id in batch.reports if s == source]
+                if ids:
+                    rows = await conn.fetch(sql, ids)
+                    batch.periods.update((r["reporting_period_start"], r["reporting_period_end"]) for r in rows)
+
+    async def _listen_once(self) -> None:
+        lost = asyncio.Event()
+        async with self.pool.acquire() as conn:
+            conn.add_termination_listener(lambda _: lost.set())
+            for channel in CHANNELS:
+                await conn.add_listener(channel, self._on_notification)
+            self.connected = True
+            logger.info("Change feed listening", channels=list(CHANNELS))
+            try:
+                await lost.wait()
+            finally:
+                self.connected = False
+                if not conn.is_closed():
+                    for channel in CHANNELS:
+                        await conn.remove_listener(channel, self._on_notification)
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            try:
+                if not first:
+                    # Notifications sent while disconnected are gone; let handlers catch up
+                    self.reconnects += 1
+                    await self.dispatch(ChangeBatch(resync=True))
+                first = False
+                await self._listen_once()
+                logger.warning("Change feed connection lost")
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Change feed unavailable", error=str(exc))
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._flush()
+        if self._dispatching:
+            await asyncio.gather(*self._dispatching, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "connected": self.connected,
+            "events": self.events,
+            "batches": self.batches,
+            "reconnects": self.reconnects,
+            "pending": self._pending.events if self._pending is not None else 0,
+            "last_batch_ms": self.last_batch_ms,
+        }
+
+
+def trend_cache_handler(cache: ResultCache) -> Handler:
+    """Drop cached trend weeks whose conflicts were created, resolved or escalated."""
+
+    async def handle(batch: ChangeBatch) -> None:
+        weeks = batch.conflict_periods
+        if weeks:
+            await trend_engine.invalidate_weeks(cache, sorted(weeks))
+
+    return handle
+
+
+def feature_store_handler(
+    pool: asyncpg.Pool,
+    store: Callable[[], feature_store.EmployeeFeatureStore],
+    flight: Optional[SingleFlight] = None,
+) -> Handler:
+    """Apply newly completed validation periods to the employee feature store (once across workers)."""
+
+    async def handle(batch: ChangeBatch) -> None:
+        current = store()
+        latest = date.fromordinal(current.latest_period) if current.latest_period else date.min
+        if batch.resync:
+            async with pool.acquire() as conn:
+                rows = await conn.fetch(COMPLETED_RUNS_SINCE_SQL, latest)
+            periods = [(r["reporting_period_start"], r["reporting_period_end"]) for r in rows]
+        else:
+            # The persist endpoint usually got there first; apply_period skips those
+            periods = sorted(p for p in batch.completed_runs if p[0] > latest)
+        for period_start, period_end in periods:
+            await feature_store.update_period_once(flight, store, pool, period_start, period_end)
+
+    return handle
+
+
+CONFLICT_EVENT_FIELDS = ("id", "employee_id", "status", "reporting_period_start", "reporting_period_end")
+
+
+def conflict_events_handler(broadcaster: Broadcaster) -> Handler:
+    """Push conflict creations and status changes to SSE subscribers."""
+
+    async def handle(batch: ChangeBatch) -> None:
+        for payload in batch.conflicts.values():
+            if payload["op"] == "INSERT":
+                event = "conflict.created"
+            elif payload["op"] == "UPDATE" and "status" in payload.get("changed", ()):
+                event = "conflict.status_changed"
+            else:
+                continue
+            data = {name: payload.get(name) for name in CONFLICT_EVENT_FIELDS}
+            # Every worker receives the NOTIFY itself, so no Redis relay
+            await broadcaster.publish("conflicts", event, data, local_only=True)
+
+    return handle
+
+
+def escalation_handler(scheduler: EscalationScheduler) -> Handler:
+    """Keep the escalation queue in step with conflicts created or closed anywhere (e.g. runDetection)."""
+
+    async def handle(batch: ChangeBatch) -> None:
+        if batch.resync:
+            await scheduler.seed()
+            return
+        opened, closed = [], []
+        for conflict_id, payload in batch.conflicts.items():
+            if payload["op"] == "DELETE":
+                closed.append(conflict_id)
+            elif payload["op"] == "INSERT" or "status" in payload.get("changed", ()):
+                (opened if payload.get("status") == "open" else closed).append(conflict_id)
+        if closed:
+            await scheduler.unschedule(closed)
+        if opened:
+            await scheduler.schedule_open(opened)
+
+    return handle
+
+
+def create_change_feed(
+    pool: asyncpg.Pool,
+    trend_cache: ResultCache,
+    store: Callable[[], feature_store.EmployeeFeatureStore],
+    broadcaster: Optional[Broadcaster] = None,
+    scheduler: Optional[EscalationScheduler] = None,
+    flight: Optional[SingleFlight] = None,
+) -> ChangeFeed:
+    feed = ChangeFeed(
+        pool,
+        debounce_ms=settings.change_feed_debounce_ms,
+        max_events=settings.change_feed_max_events,
+        reconnect_seconds=settings.change_feed_reconnect_seconds,
+    )
+    feed.subscribe("trends", trend_cache_handler(trend_cache))
+    feed.subscribe("feature_store", feature_store_handler(pool, store, flight))
+    if broadcaster is not None:
+        feed.subscribe("events", conflict_events_handler(broadcaster))
+    if scheduler is not None:
+        feed.subscribe("escalations", escalation_handler(scheduler))
+    return feed
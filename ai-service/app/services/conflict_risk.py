@@ -0,0 +1,387 @@
+"""
+Predictive conflict scoring for draft report entries.
+
+When a draft project or department report entry is saved, the backend asks how likely
+this employee's period is to end up as a conflict. The answer comes from a logistic
+regression kept in memory as plain NumPy coefficients, so inference is a dot product.
+Features combine the counterpart data known so far with the employee's history from
+the feature store:
+
+    entry_hours, project_hours, department_hours (totals including this entry),
+    has_project, has_department, abs_partial_discrepancy (when both sides exist),
+    ewma_abs_discrepancy, conflict_rate, current_streak, amendment_rate
+
+Training replays historical (employee, period) totals labelled by whether a
+conflict_alerts row exists, hiding one side at random so the model also learns the
+"counterpart not reported yet" case. History features are point-in-time: the training
+periods are replayed in order into a scratch feature store, and each example sees only
+the history of the periods before its own (never its own label).
+
+The model is saved to MODEL_PATH/conflict_risk.npz; workers that did not train it
+reload the file when it changes.
+
+Concurrent score requests are micro-batched (app/batching.py): gathered for up to
+RISK_BATCH_WAIT_MS or RISK_BATCH_SIZE requests and answered with one counterpart
+query and one vectorized prediction.
+"""
+
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+import asyncpg
+import numpy as np
+import structlog
+
+from app import engines, tracing
+from app.batching import MicroBatcher
+from app.config import settings
+from app.services.detection import DetectionResult
+from app.services.feature_store import EmployeeFeatureStore, load_amendments
+
+logger = structlog.get_logger()
+
+FEATURES = (
+    "entry_hours",
+    "project_hours",
+    "department_hours",
+    "has_project",
+    "has_department",
+    "abs_partial_discrepancy",
+    "ewma_abs_discrepancy",
+    "conflict_rate",
+    "current_streak",
+    "amendment_rate",
+)
+HISTORY_FEATURES = ("ewma_abs_discrepancy", "conflict_rate", "current_streak", "amendment_rate")
+
+# Hours each source already holds for the employee and period, excluding the report
+# the entry being scored belongs to (its hours are passed in the request instead).
+COUNTERPART_SQL = """
+    SELECT req.i,
+           (SELECT sum(e.hours_worked)::float8
+            FROM project_report_entries e
+            JOIN project_reports r ON r.id = e.project_report_id
+            WHERE e.employee_id = req.employee_id
+              AND r.reporting_period_start = req.period_start
+              AND r.id IS DISTINCT FROM req.project_report_id) AS project_hours,
+           (SELECT sum(e.hours_worked)::float8
+            FROM department_report_entries e
+            JOIN department_reports r ON r.id = e.department_report_id
+            WHERE e.employee_id = req.employee_id
+              AND r.reporting_period_start = req.period_start
+              AND r.id IS DISTINCT FROM req.department_report_id) AS department_hours
+    FROM unnest($1::bigint[], $2::date[], $3::bigint[], $4::bigint[])
+         WITH ORDINALITY AS req(employee_id, period_start, project_report_id, department_report_id, i)
+    ORDER BY req.i
+"""
+
+TRAINING_SQL = """
+    WITH a AS (
+        SELECT e.employee_id, r.reporting_period_start AS period_start, max(r.reporting_period_end) AS period_end,
+               sum(e.hours_worked)::float8 AS hours
+        FROM project_report_entries e
+        JOIN project_reports r ON r.id = e.project_report_id
+        WHERE r.status IN ('submitted', 'amended') AND r.reporting_period_start >= $1
+        GROUP BY 1, 2
+    ),
+    b AS (
+        SELECT e.employee_id, r.reporting_period_start AS period_start, max(r.reporting_period_end) AS period_end,
+               sum(e.hours_worked)::float8 AS hours
+        FROM department_report_entries e
+        JOIN department_reports r ON r.id = e.department_report_id
+        WHERE r.status IN ('submitted', 'amended') AND r.reporting_period_start >= $1
+        GROUP BY 1, 2
+    )
+    SELECT coalesce(a.employee_id, b.employee_id) AS employee_id,
+           coalesce(a.period_start, b.period_start) AS period_start,
+           greatest(a.period_end, b.period_end) AS period_end,
+           a.hours AS project_hours,
+           b.hours AS department_hours,
+           EXISTS (
+               SELECT 1 FROM conflict_alerts c
+               WHERE c.employee_id = coalesce(a.employee_id, b.employee_id)
+                 AND c.reporting_period_start = coalesce(a.period_start, b.period_start)
+           ) AS conflict
+    FROM a FULL JOIN b ON a.employee_id = b.employee_id AND a.period_start = b.period_start
+    ORDER BY period_start
+"""
+
+
+@dataclass
+class ScoreRequest:
+    employee_id: int
+    period_start: date
+    source: str  # "project" or "department"
+    hours: float
+    report_id: Optional[int] = None
+
+
+def build_features(
+    source: np.ndarray,
+    entry_hours: np.ndarray,
+    project_hours: np.ndarray,
+    department_hours: np.ndarray,
+    history: np.ndarray,
+) -> np.ndarray:
+    """
+    Feature matrix in FEATURES order. `project_hours` / `department_hours` are what the
+    sources held before this entry (NaN = nothing reported yet); `history` holds the
+    HISTORY_FEATURES columns.
+    """
+    is_project = source == "project"
+    project = np.where(is_project, np.nan_to_num(project_hours) + entry_hours, project_hours)
+    department = np.where(~is_project, np.nan_to_num(department_hours) + entry_hours, department_hours)
+    has_project = ~np.isnan(project)
+    has_department = ~np.isnan(department)
+    both = has_project & has_department
+    partial = np.where(both, np.abs(np.nan_to_num(project) - np.nan_to_num(department)), 0.0)
+    return np.column_stack(
+        [
+            entry_hours,
+            np.nan_to_num(project),
+            np.nan_to_num(department),
+            has_project,
+            has_department,
+            partial,
+            history,
+        ]
+    ).astype(np.float64)
+
+
+class ConflictRiskModel:
+    """Standardized logistic regression evaluated with NumPy only."""
+
+    def __init__(self, mean, scale, coef, intercept: float, samples: int, trained_at: str) -> None:
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.samples = samples
+        self.trained_at = trained_at
+        self._snapshot_mtime: Optional[float] = None
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        z = ((features - self.mean) / self.scale) @ self.coef + self.intercept
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer: several workers may save at once, the last rename wins
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp", delete=False) as tmp:
+            try:
+                np.savez(
+                    tmp,
+                    mean=self.mean,
+                    scale=self.scale,
+                    coef=self.coef,
+                    intercept=np.array([self.intercept]),
+                    samples=np.array([self.samples]),
+                    trained_at=np.array([self.trained_at]),
+                )
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+        self._snapshot_mtime = path.stat().st_mtime
+
+    @classmethod
+    def load(cls, path: Path) -> "ConflictRiskModel":
+        with np.load(path) as data:
+            model = cls(
+                data["mean"],
+                data["scale"],
+                data["coef"],
+                float(data["intercept"][0]),
+                int(data["samples"][0]),
+                str(data["trained_at"][0]),
+            )
+        model._snapshot_mtime = path.stat().st_mtime
+        return model
+
+    def snapshot_changed(self, path: Path) -> bool:
+        return path.exists() and path.stat().st_mtime != self._snapshot_mtime
+
+    def info(self) -> dict:
+        return {
+            "trained_at": self.trained_at,
+            "samples": self.samples,
+            "coefficients": dict(zip(FEATURES, np.round(self.coef, 4).tolist())),
+        }
+
+
+def model_path() -> Path:
+    return Path(settings.model_path) / "conflict_risk.npz"
+
+
+def fit_model(features: np.ndarray, labels: np.ndarray) -> ConflictRiskModel:
+    """Fit on standardized features. Runs in a worker thread."""
+    linear_model = engines.load("sklearn.linear_model")
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    clf = linear_model.LogisticRegression(class_weight="balanced", max_iter=1000)
+    clf.fit((features - mean) / scale, labels)
+    return ConflictRiskModel(
+        mean,
+        scale,
+        clf.coef_[0],
+        clf.intercept_[0],
+        int(labels.size),
+        datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    )
+
+
+def point_in_time_history(
+    employee_ids: np.ndarray,
+    periods: np.ndarray,
+    project: np.ndarray,
+    department: np.ndarray,
+    labels: np.ndarray,
+    amendments: dict[date, dict[int, int]],
+) -> np.ndarray:
+    """
+    HISTORY_FEATURES per example as the feature store would have held them when the
+    example's period was drafted: periods are replayed oldest first into a scratch
+    store, and each period's rows are looked up before that period is applied.
+    """
+    store = EmployeeFeatureStore(alpha=settings.feature_ewma_alpha)
+    history = np.zeros((employee_ids.size, len(HISTORY_FEATURES)), dtype=np.float64)
+    for ordinal in np.unique(periods):
+        rows = np.flatnonzero(periods == ordinal)
+        ids = employee_ids[rows]
+        history[rows] = store.lookup(ids, HISTORY_FEATURES)
+        a, b = np.nan_to_num(project[rows]), np.nan_to_num(department[rows])
+        period_start = date.fromordinal(int(ordinal))
+        store.apply_period(
+            period_start,
+            DetectionResult(employee_ids=ids, source_a_hours=a, source_b_hours=b, discrepancy=a - b, flagged=labels[rows]),
+            amendments.get(period_start, {}),
+        )
+    return history
+
+
+def training_set(
+    records, amendments: Optional[dict[date, dict[int, int]]] = None, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Turn final (project, department) totals of (employee_id, period_start, project_hours,
+    department_hours, conflict) records into draft-time examples: the scored entry is the
+    whole of one side, and the other side is hidden for half of the examples.
+    `amendments` maps period_start to amendments per employee in that period.
+    """
+    rng = np.random.default_rng(seed)
+    employee_ids = np.array([r[0] for r in records], dtype=np.int64)
+    periods = np.array([r[1].toordinal() for r in records], dtype=np.int64)
+    project = np.array([np.nan if r[2] is None else r[2] for r in records], dtype=np.float64)
+    department = np.array([np.nan if r[3] is None else r[3] for r in records], dtype=np.float64)
+    labels = np.array([bool(r[4]) for r in records])
+
+    n = employee_ids.size
+    source = np.where(np.isnan(department) | (~np.isnan(project) & (rng.random(n) < 0.5)), "project", "department")
+    is_project = source == "project"
+    entry_hours = np.where(is_project, project, department)
+    hide_other = rng.random(n) < 0.5
+    before_project = np.where(is_project, np.nan, np.where(hide_other, np.nan, project))
+    before_department = np.where(~is_project, np.nan, np.where(hide_other, np.nan, department))
+
+    history = point_in_time_history(employee_ids, periods, project, department, labels, amendments or {})
+    features = build_features(source, entry_hours, before_project, before_department, history)
+    return features, labels
+
+
+async def train(pool: asyncpg.Pool) -> ConflictRiskModel:
+    since = date.today() - timedelta(weeks=settings.risk_training_weeks)
+    with tracing.span("db.load_training_set"):
+        async with pool.acquire() as conn:
+            records = await conn.fetch(TRAINING_SQL, since)
+            periods = sorted({(r["period_start"], r["period_end"]) for r in records})
+            amendments = {start: await load_amendments(conn, start, end) for start, end in periods}
+    if not records:
+        raise ValueError("No historical report data to train on")
+
+    features, labels = training_set(
+        [(r["employee_id"], r["period_start"], r["project_hours"], r["department_hours"], r["conflict"]) for r in records],
+        amendments,
+    )
+    if labels.all() or not labels.any():
+        raise ValueError("Training data needs both conflict and non-conflict periods")
+
+    await engines.aload("sklearn.linear_model")
+    with tracing.span("compute.fit_risk_model", samples=len(labels)):
+        model = await asyncio.to_thread(fit_model, features, labels)
+    model.save(model_path())
+    logger.info("Conflict risk model trained", samples=model.samples)
+    return model
+
+
+class ConflictRiskScorer:
+    """Scores draft entries, micro-batching concurrent requests."""
+
+    def __init__(
+        self,
+        pool: Optional[asyncpg.Pool],
+        model: Optional[ConflictRiskModel],
+        store: Callable[[], EmployeeFeatureStore],
+    ) -> None:
+        self.pool = pool
+        self.model = model
+        self._store = store
+        self.batcher: MicroBatcher[ScoreRequest, float] = MicroBatcher(
+            "conflict_risk",
+            self._score_batch,
+            max_batch=settings.risk_batch_size,
+            max_wait_ms=settings.risk_batch_wait_ms,
+        )
+
+    def current_model(self) -> Optional[ConflictRiskModel]:
+        """The worker's model, reloaded if another worker trained and saved a newer one."""
+        path = model_path()
+        if self.model is None or self.model.snapshot_changed(path):
+            model = load_model()
+            if model is not None:
+                self.model = model
+        return self.model
+
+    async def score(self, item: ScoreRequest) -> float:
+        return await self.batcher.submit(item)
+
+    async def _score_batch(self, items: list[ScoreRequest]) -> list[float]:
+        return (await self.score_batch(items)).tolist()
+
+    async def score_batch(self, items: list[ScoreRequest]) -> np.ndarray:
+        """One counterpart query and one prediction for a whole batch."""
+        is_project = [i.source == "project" for i in items]
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(
+                COUNTERPART_SQL,
+                [i.employee_id for i in items],
+                [i.period_start for i in items],
+                [i.report_id if p else None for i, p in zip(items, is_project)],
+                [None if p else i.report_id for i, p in zip(items, is_project)],
+            )
+
+        employee_ids = np.array([i.employee_id for i in items], dtype=np.int64)
+        features = build_features(
+            np.array([i.source for i in items]),
+            np.array([i.hours for i in items], dtype=np.float64),
+            np.array([np.nan if r["project_hours"] is None else r["project_hours"] for r in rows]),
+            np.array([np.nan if r["department_hours"] is None else r["department_hours"] for r in rows]),
+            self._store().lookup(employee_ids, HISTORY_FEATURES),
+        )
+        return self.model.predict(features)
+
+
+def load_model() -> Optional[ConflictRiskModel]:
+    path = model_path()
+    if not path.exists():
+        return None
+    try:
+        return ConflictRiskModel.load(path)
+    except (OSError, KeyError, ValueError) as exc:
+        logger.warning("Conflict risk model unreadable", error=str(exc))
+        return None
@@ -0,0 +1,137 @@
+"""
+Bulk write-back of detection results into conflict_alerts and validation_runs.
+
+Replaces the per-employee ConflictAlert::updateOrCreate loop with one binary COPY into
+a temp staging table and a single INSERT ... ON CONFLICT merge on unique_employee_period.
+Upsert semantics match createOrUpdateConflict: a re-detected conflict is reopened and its
+resolution fields are cleared; escalated_at is left untouched.
+"""
+
+from datetime import date
+from typing import Iterable
+
+import asyncpg
+import structlog
+
+from app import tracing
+
+logger = structlog.get_logger()
+
+STAGE_TABLE = "conflict_alerts_stage"
+
+CREATE_STAGE_SQL = f"""
+    CREATE TEMP TABLE {STAGE_TABLE} (
+        employee_id bigint NOT NULL,
+        source_a_hours numeric(5, 2) NOT NULL,
+        source_b_hours numeric(5, 2) NOT NULL,
+        discrepancy numeric(5, 2) NOT NULL
+    ) ON COMMIT DROP
+"""
+
+MERGE_SQL = f"""
+    INSERT INTO conflict_alerts (
+        employee_id, reporting_period_start, reporting_period_end,
+        source_a_hours, source_b_hours, discrepancy,
+        status, resolved_by, resolution_notes, resolved_at,
+        created_at, updated_at
+    )
+    SELECT employee_id, $1, $2,
+           source_a_hours, source_b_hours, discrepancy,
+           'open', NULL, NULL, NULL,
+           now(), now()
+    FROM {STAGE_TABLE}
+    ON CONFLICT ON CONSTRAINT unique_employee_period DO UPDATE SET
+        source_a_hours = EXCLUDED.source_a_hours,
+        source_b_hours = EXCLUDED.source_b_hours,
+        discrepancy = EXCLUDED.discrepancy,
+        status = 'open',
+        resolved_by = NULL,
+        resolution_notes = NULL,
+        resolved_at = NULL,
+        updated_at = now()
+    RETURNING id, created_at
+"""
+
+CREATE_RUN_SQL = """
+    INSERT INTO validation_runs (reporting_period_start, reporting_period_end, status, created_at, updated_at)
+    VALUES ($1, $2, 'running', now(), now())
+    RETURNING id
+"""
+
+COMPLETE_RUN_SQL = """
+    UPDATE validation_runs
+    SET status = 'completed', employees_checked = $2, conflicts_found = $3,
+        run_duration_ms = $4, updated_at = now()
+    WHERE id = $1
+"""
+
+FAIL_RUN_SQL = """
+    UPDATE validation_runs
+    SET status = 'failed', error_message = $2, updated_at = now()
+    WHERE id = $1
+"""
+
+
+async def start_validation_run(conn: asyncpg.Connection, period_start: date, period_end: date) -> int:
+    """Create the 'running' validation_runs row, as ValidationRun::create does."""
+    return await conn.fetchval(CREATE_RUN_SQL, period_start, period_end)
+
+
+async def fail_validation_run(conn: asyncpg.Connection, run_id: int, error: str) -> None:
+    await conn.execute(FAIL_RUN_SQL, run_id, error)
+
+
+async def upsert_conflicts(
+    conn: asyncpg.Connection,
+    period_start: date,
+    period_end: date,
+    records: Iterable[tuple[int, float, float, float]],
+) -> list[asyncpg.Record]:
+    """
+    Stage (employee_id, source_a_hours, source_b_hours, discrepancy) rows via COPY and
+    merge them into conflict_alerts. Must run inside a transaction (the stage table is
+    dropped on commit). Returns (id, created_at) of every merged alert.
+    """
+    await conn.execute(CREATE_STAGE_SQL)
+    await conn.copy_records_to_table(
+        STAGE_TABLE,
+        records=records,
+        columns=["employee_id", "source_a_hours", "source_b_hours", "discrepancy"],
+    )
+    return await conn.fetch(MERGE_SQL, period_start, period_end)
+
+
+async def persist_detection(
+    conn: asyncpg.Connection,
+    run_id: int,
+    period_start: date,
+    period_end: date,
+    records: list[tuple[int, float, float, float]],
+    employees_checked: int,
+    duration_ms: int,
+) -> list[asyncpg.Record]:
+    """Merge all conflicts and complete the validation run in one transaction."""
+    try:
+        with tracing.span("db.persist_detection", conflicts=len(records)):
+            async with conn.transaction():
+                merged = await upsert_conflicts(conn, period_start, period_end, records)
+                await conn.execute(COMPLETE_RUN_SQL, run_id, employees_checked, len(records), duration_ms)
+    except Exception as exc:
+        await fail_validation_run(conn, run_id, str(exc))
+        logger.error(
+            "Conflict write-back failed",
+            period=f"{period_start} to {period_end}",
+            validation_run_id=run_id,
+            error=str(exc),
+        )
+        raise
+
+    logger.info(
+        "Conflict write-back completed",
+        period=f"{period_start} to {period_end}",
+        validation_run_id=run_id,
+        employees_checked=employees_checked,
+        conflicts_found=len(records),
+        duration_ms=duration_ms,
+    )
+    return merged
@@ -0,0 +1,227 @@
+"""
+Pre-detection data-quality validation.
+
+ConflictDetectionService sums whatever is in the entry tables, so bad rows become
+bogus conflicts. This stage loads the period's entries of both sources as columns
+and runs every check as an array operation (a few milliseconds per 100k entries):
+
+    hours_out_of_range       entry hours < 0 or > 168
+    duplicate_entry          same (report, employee) more than once; the first is kept
+    deleted_employee         entry for a soft-deleted (or unknown) user
+    report_outside_period    report overlaps the window without lying inside it
+    misaligned_period        report period is not a Monday-Sunday week
+    missing_from_source_a/b  employee reported by one source only
+    total_exceeds_period     an employee's total in one source exceeds 24h x days
+
+Rows failing a check listed in DATA_QUALITY_EXCLUDE are marked and left out of the
+per-employee totals that detection consumes; the other checks are reported only.
+Missing-counterpart employees are real conflicts and are never excluded.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+
+import asyncpg
+import numpy as np
+
+from app import tracing
+from app.config import settings
+from app.services.detection import SourceHours
+
+_ENTRIES_SQL = """
+    SELECT e.id, e.{report_fk}, e.employee_id, e.hours_worked::float8,
+           r.reporting_period_start, r.reporting_period_end,
+           (u.id IS NULL OR u.deleted_at IS NOT NULL) AS deleted_employee
+    FROM {entries} e
+    JOIN {reports} r ON r.id = e.{report_fk}
+    LEFT JOIN users u ON u.id = e.employee_id
+    WHERE r.status IN ('submitted', 'amended')
+      AND r.reporting_period_start <= $2
+      AND r.reporting_period_end >= $1
+"""
+
+PROJECT_ENTRIES_SQL = _ENTRIES_SQL.format(
+    entries="project_report_entries", reports="project_reports", report_fk="project_report_id"
+)
+DEPARTMENT_ENTRIES_SQL = _ENTRIES_SQL.format(
+    entries="department_report_entries", reports="department_reports", report_fk="department_report_id"
+)
+
+ROW_CHECKS = ("hours_out_of_range", "duplicate_entry", "deleted_employee", "report_outside_period", "misaligned_period")
+MAX_HOURS_PER_WEEK = 168.0
+SAMPLE_SIZE = 20
+
+
+@dataclass
+class EntryColumns:
+    """One source's entries in the window, column-wise."""
+
+    entry_ids: np.ndarray
+    report_ids: np.ndarray
+    employee_ids: np.ndarray
+    hours: np.ndarray
+    period_start: np.ndarray  # date ordinals
+    period_end: np.ndarray
+    deleted_employee: np.ndarray
+
+    @classmethod
+    def from_records(cls, rows) -> "EntryColumns":
+        n = len(rows)
+        columns = list(zip(*rows)) if n else [()] * 7
+
+        def ints(values):
+            return np.fromiter(values, dtype=np.int64, count=n)
+
+        return cls(
+            entry_ids=ints(columns[0]),
+            report_ids=ints(columns[1]),
+            employee_ids=ints(columns[2]),
+            hours=np.fromiter(columns[3], dtype=np.float64, count=n),
+            period_start=ints(d.toordinal() for d in columns[4]),
+            period_end=ints(d.toordinal() for d in columns[5]),
+            deleted_employee=np.fromiter(columns[6], dtype=bool, count=n),
+        )
+
+    @property
+    def size(self) -> int:
+        return int(self.entry_ids.size)
+
+
+@dataclass
+class SourceQuality:
+    checks: dict[str, np.ndarray]  # check -> row mask
+    excluded: np.ndarray  # row mask
+
+    def excluded_entry_ids(self, columns: EntryColumns) -> list[int]:
+        return columns.entry_ids[self.excluded].tolist()
+
+
+@dataclass
+class QualityReport:
+    window: tuple[date, date]
+    sources: dict[str, SourceQuality]
+    columns: dict[str, EntryColumns]
+    employee_checks: dict[str, np.ndarray] = field(default_factory=dict)  # check -> employee ids
+
+    def summary(self) -> dict:
+        rows = {
+            source: {
+                "entries": columns.size,
+                "excluded": int(self.sources[source].excluded.sum()),
+                **{check: int(mask.sum()) for check, mask in self.sources[source].checks.items()},
+            }
+            for source, columns in self.columns.items()
+        }
+        employees = {check: int(ids.size) for check, ids in self.employee_checks.items()}
+        return {"sources": rows, "employees": employees}
+
+    def to_dict(self) -> dict:
+        """Summary plus sample entry / employee ids per failed check."""
+        samples = {
+            source: {
+                check: self.columns[source].entry_ids[mask][:SAMPLE_SIZE].tolist()
+                for check, mask in quality.checks.items()
+                if mask.any()
+            }
+            for source, quality in self.sources.items()
+        }
+        return {
+            "period_start": self.window[0].isoformat(),
+            "period_end": self.window[1].isoformat(),
+            **self.summary(),
+            "samples": samples,
+            "employee_samples": {
+                check: ids[:SAMPLE_SIZE].tolist() for check, ids in self.employee_checks.items() if ids.size
+            },
+        }
+
+
+def excluded_checks() -> set[str]:
+    return {c.strip() for c in settings.data_quality_exclude.split(",") if c.strip()}
+
+
+def duplicate_mask(report_ids: np.ndarray, employee_ids: np.ndarray) -> np.ndarray:
+    """True for every repeat of a (report, employee) pair after its first row."""
+    # One packed int64 key sorts several times faster than lexsort over two columns
+    keys = (report_ids << 32) | employee_ids
+    order = np.argsort(keys, kind="stable")
+    ordered = keys[order]
+    mask = np.zeros(keys.size, dtype=bool)
+    mask[order[1:][ordered[1:] == ordered[:-1]]] = True
+    return mask
+
+
+def check_rows(columns: EntryColumns, window_start: int, window_end: int) -> dict[str, np.ndarray]:
+    hours = columns.hours
+    return {
+        "hours_out_of_range": (hours < 0) | (hours > MAX_HOURS_PER_WEEK),
+        "duplicate_entry": duplicate_mask(columns.report_ids, columns.employee_ids),
+        "deleted_employee": columns.deleted_employee,
+        "report_outside_period": (columns.period_start < window_start) | (columns.period_end > window_end),
+        # date.toordinal() 1 is a Monday
+        "misaligned_period": ((columns.period_start - 1) % 7 != 0) | (columns.period_end - columns.period_start != 6),
+    }
+
+
+def employee_totals(columns: EntryColumns, keep: np.ndarray) -> SourceHours:
+    """
+    Per-employee hour totals over the kept rows. hours_worked is numeric(5,2), so the
+    sum is taken in integer cents: the result is then bit-identical to SQL's exact
+    SUM(...)::float8 (float addition drifts by ~1e-14, which flips abs(d) > threshold
+    when a discrepancy is exactly the threshold).
+    """
+    ids, inverse = np.unique(columns.employee_ids[keep], return_inverse=True)
+    cents = np.bincount(inverse, weights=np.rint(columns.hours[keep] * 100), minlength=ids.size)
+    return SourceHours(ids.astype(np.int64), cents / 100.0)
+
+
+def validate(
+    project: EntryColumns, department: EntryColumns, window_start: date, window_end: date
+) -> tuple[SourceHours, SourceHours, QualityReport]:
+    """Run all checks; return the cleaned per-employee totals and the report."""
+    start, end = window_start.toordinal(), window_end.toordinal()
+    exclude = excluded_checks()
+    columns = {"project": project, "department": department}
+    sources: dict[str, SourceQuality] = {}
+    totals: dict[str, SourceHours] = {}
+
+    for source, cols in columns.items():
+        checks = check_rows(cols, start, end)
+        excluded = np.zeros(cols.size, dtype=bool)
+        for check in ROW_CHECKS:
+            if check in exclude:
+                excluded |= checks[check]
+        # Rows of reports not inside the window never count, like runDetection's filter
+        excluded |= checks["report_outside_period"]
+        sources[source] = SourceQuality(checks=checks, excluded=excluded)
+        totals[source] = employee_totals(cols, ~excluded)
+
+    a, b = totals["project"], totals["department"]
+    period_hours = 24.0 * (end - start + 1)
+    report = QualityReport(
+        window=(window_start, window_end),
+        sources=sources,
+        columns=columns,
+        employee_checks={
+            "missing_from_source_a": np.setdiff1d(b.employee_ids, a.employee_ids, assume_unique=True),
+            "missing_from_source_b": np.setdiff1d(a.employee_ids, b.employee_ids, assume_unique=True),
+            "total_exceeds_period": np.union1d(a.employee_ids[a.hours > period_hours], b.employee_ids[b.hours > period_hours]),
+        },
+    )
+    return a, b, report
+
+
+async def load_entries(conn: asyncpg.Connection, period_start: date, period_end: date) -> tuple[EntryColumns, EntryColumns]:
+    with tracing.span("db.load_entries") as span:
+        project = await conn.fetch(PROJECT_ENTRIES_SQL, period_start, period_end)
+        department = await conn.fetch(DEPARTMENT_ENTRIES_SQL, period_start, period_end)
+        span.set_attribute("db.rows", len(project) + len(department))
+    return EntryColumns.from_records(project), EntryColumns.from_records(department)
+
+
+async def load_validated_hours(
+    conn: asyncpg.Connection, period_start: date, period_end: date
+) -> tuple[SourceHours, SourceHours, QualityReport]:
+    project, department = await load_entries(conn, period_start, period_end)
+    with tracing.span("compute.data_quality", rows=project.size + department.size):
+        return validate(project, department, period_start, period_end)
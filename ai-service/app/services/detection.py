@@ -0,0 +1,148 @@
+"""
+Conflict detection between Source A (project reports) and Source B (department reports).
+
+Mirrors ConflictDetectionService::runDetection in the Laravel backend: hours are summed
+per employee across submitted/amended reports inside the period, and an employee is
+flagged when abs(source_a - source_b) > threshold.
+
+With DATA_QUALITY_ENABLED (the default) detect_period loads entry rows instead of
+Postgres totals and runs them through app/services/data_quality.py first, so rows
+failing the excluded checks never reach the discrepancy computation.
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional
+
+import asyncpg
+import numpy as np
+
+from app import tracing
+from app.config import settings
+
+SOURCE_A_SQL = """
+    SELECT e.employee_id, SUM(e.hours_worked)::float8 AS total_hours
+    FROM project_report_entries e
+    JOIN project_reports r ON r.id = e.project_report_id
+    WHERE r.status IN ('submitted', 'amended')
+      AND r.reporting_period_start >= $1
+      AND r.reporting_period_end <= $2
+    GROUP BY e.employee_id
+"""
+
+SOURCE_B_SQL = """
+    SELECT e.employee_id, SUM(e.hours_worked)::float8 AS total_hours
+    FROM department_report_entries e
+    JOIN department_reports r ON r.id = e.department_report_id
+    WHERE r.status IN ('submitted', 'amended')
+      AND r.reporting_period_start >= $1
+      AND r.reporting_period_end <= $2
+    GROUP BY e.employee_id
+"""
+
+
+@dataclass
+class SourceHours:
+    """Per-employee hour totals for one source, as parallel arrays."""
+
+    employee_ids: np.ndarray
+    hours: np.ndarray
+
+    @classmethod
+    def from_records(cls, records) -> "SourceHours":
+        if not records:
+            return cls(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64))
+        ids, hours = zip(*records)
+        return cls(np.asarray(ids, dtype=np.int64), np.asarray(hours, dtype=np.float64))
+
+
+@dataclass
+class DetectionResult:
+    """Aligned per-employee hours for both sources and the derived discrepancy."""
+
+    employee_ids: np.ndarray
+    source_a_hours: np.ndarray
+    source_b_hours: np.ndarray
+    discrepancy: np.ndarray
+    flagged: np.ndarray
+    quality: Optional[Any] = None  # data_quality.QualityReport when validation ran
+
+    @property
+    def employees_checked(self) -> int:
+        return int(self.employee_ids.size)
+
+    @property
+    def conflicts_found(self) -> int:
+        return int(np.count_nonzero(self.flagged))
+
+    def conflict_records(self) -> list[tuple[int, float, float, float]]:
+        """(employee_id, source_a_hours, source_b_hours, discrepancy) for flagged employees."""
+        mask = self.flagged
+        return list(
+            zip(
+                self.employee_ids[mask].tolist(),
+                self.source_a_hours[mask].tolist(),
+                self.source_b_hours[mask].tolist(),
+                self.discrepancy[mask].tolist(),
+            )
+        )
+
+
+def compute_discrepancies(
+    source_a: SourceHours, source_b: SourceHours, threshold: float
+) -> DetectionResult:
+    """Align both sources on employee id (missing side counts as 0h) and flag discrepancies."""
+    employee_ids = np.union1d(source_a.employee_ids, source_b.employee_ids)
+
+    a_hours = np.zeros(employee_ids.size, dtype=np.float64)
+    b_hours = np.zeros(employee_ids.size, dtype=np.float64)
+    a_hours[np.searchsorted(employee_ids, source_a.employee_ids)] = source_a.hours
+    b_hours[np.searchsorted(employee_ids, source_b.employee_ids)] = source_b.hours
+
+    discrepancy = a_hours - b_hours
+    return DetectionResult(
+        employee_ids=employee_ids,
+        source_a_hours=a_hours,
+        source_b_hours=b_hours,
+        discrepancy=discrepancy,
+        flagged=np.abs(discrepancy) > threshold,
+    )
+
+
+async def load_period_hours(
+    conn: asyncpg.Connection, period_start: date, period_end: date
+) -> tuple[SourceHours, SourceHours]:
+    """Fetch per-employee totals for both sources; aggregation happens in Postgres."""
+    with tracing.span("db.load_period_hours") as span:
+        source_a = await conn.fetch(SOURCE_A_SQL, period_start, period_end)
+        source_b = await conn.fetch(SOURCE_B_SQL, period_start, period_end)
+        span.set_attribute("db.rows", len(source_a) + len(source_b))
+    return SourceHours.from_records(source_a), SourceHours.from_records(source_b)
+
+
+async def load_detection_hours(
+    conn: asyncpg.Connection, period_start: date, period_end: date
+) -> tuple[SourceHours, SourceHours, Optional[Any]]:
+    """
+    The per-employee totals detection runs on: with DATA_QUALITY_ENABLED the validated
+    entries (excluded rows dropped) and their quality report, otherwise the SQL totals.
+    """
+    if not settings.data_quality_enabled:
+        source_a, source_b = await load_period_hours(conn, period_start, period_end)
+        return source_a, source_b, None
+
+    # data_quality builds on SourceHours, so it is imported here rather than at the top
+    from app.services.data_quality import load_validated_hours
+
+    return await load_validated_hours(conn, period_start, period_end)
+
+
+async def detect_period(
+    conn: asyncpg.Connection, period_start: date, period_end: date, threshold: float
+) -> DetectionResult:
+    """Load both sources for a period and run detection without writing anything."""
+    source_a, source_b, report = await load_detection_hours(conn, period_start, period_end)
+    with tracing.span("compute.discrepancies"):
+        result = compute_discrepancies(source_a, source_b, threshold)
+    result.quality = report
+    return result
@@ -0,0 +1,37 @@
+"""
+Sentence embeddings for free-text report fields (entry notes, work descriptions).
+
+ProjectReportEntryController::store saves one entry per request, so notes arrive one
+at a time; they are micro-batched into a single `encode()` call on the
+sentence-transformers model (loaded lazily as the `sentence_transformers` engine).
+"""
+
+import numpy as np
+
+from app import engines
+from app.batching import MicroBatcher, in_thread
+from app.config import settings
+
+
+def encode_batch(texts: list[str]) -> list[np.ndarray]:
+    """Blocking batched encode; rows are L2-normalized float32 vectors."""
+    model = engines.load("sentence_transformers")
+    vectors = model.encode(
+        texts, batch_size=settings.embedding_batch_size, normalize_embeddings=True, convert_to_numpy=True
+    )
+    return list(vectors.astype(np.float32))
+
+
+class NoteEmbedder:
+    def __init__(self) -> None:
+        self.batcher: MicroBatcher[str, np.ndarray] = MicroBatcher(
+            "note_embeddings",
+            in_thread(encode_batch),
+            max_batch=settings.embedding_batch_size,
+            max_wait_ms=settings.embedding_batch_wait_ms,
+            max_concurrent=1,
+        )
+
+    async def embed(self, text: str) -> np.ndarray:
+        await engines.aload("sentence_transformers")
+        return await self.batcher.submit(text)
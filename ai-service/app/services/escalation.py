@@ -0,0 +1,295 @@
+"""
+Escalation scheduler for open conflict alerts.
+
+Instead of scanning every open conflict (as ConflictDetectionService::escalateOldConflicts
+and EscalateConflictAlertsJob do), each open conflict is kept in a queue ordered by its
+escalation deadline (created_at + escalation_days). A tick pops only the entries that
+have come due, escalates them with one batched UPDATE and publishes an escalation event
+per batch, so the cost of a tick is proportional to what is due.
+
+The queue is a Redis sorted set (shared by all workers) when Redis is available and an
+in-process heap otherwise. It is seeded with every open conflict at startup and then kept
+current by the change feed (conflict_changes): new and reopened conflicts are scheduled,
+conflicts that leave `open` are unscheduled, and after a listener reconnect the queue is
+seeded again. Entries that slip through are harmless; the UPDATE only touches rows that
+are still open. Popped entries whose UPDATE fails are put back with their deadlines, and
+open conflicts the UPDATE's own deadline check (database clock, current ESCALATION_DAYS)
+turns down are rescheduled at their recomputed deadline, no earlier than the next tick.
+
+Escalated conflicts are posted to the backend (POST /api/v1/internal/conflicts/escalated),
+which sends the ConflictEscalatedNotification mails.
+"""
+
+import asyncio
+import heapq
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import asyncpg
+import structlog
+from redis import asyncio as aioredis
+
+from app.backend_client import BackendClient
+from app.config import settings
+
+logger = structlog.get_logger()
+
+QUEUE_KEY = "ai:escalation:due"
+EVENTS_CHANNEL = "conflicts.escalated"
+CALLBACK_PATH = "/internal/conflicts/escalated"  # relative to BACKEND_URL (.../api/v1)
+
+# Atomically take up to ARGV[2] members with score <= ARGV[1], so two workers never
+# escalate the same batch. Returns [member, score, member, score, ...].
+POP_DUE_LUA = """
+local entries = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+local ids = {}
+for i = 1, #entries, 2 do
+    ids[#ids + 1] = entries[i]
+end
+if #ids > 0 then
+    redis.call('ZREM', KEYS[1], unpack(ids))
+end
+return entries
+"""
+
+LOAD_OPEN_SQL = """
+    SELECT id, created_at FROM conflict_alerts WHERE status = 'open'
+"""
+
+LOAD_OPEN_BY_ID_SQL = """
+    SELECT id, created_at FROM conflict_alerts WHERE id = ANY($1::bigint[]) AND status = 'open'
+"""
+
+ESCALATE_SQL = """
+    UPDATE conflict_alerts
+    SET status = 'escalated', escalated_at = now(), updated_at = now()
+    WHERE id = ANY($1::bigint[])
+      AND status = 'open'
+      AND created_at < now() - make_interval(days => $2)
+    RETURNING id, employee_id, created_at
+"""
+
+
+def due_at(created_at: datetime) -> float:
+    """Escalation deadline as a UNIX timestamp; naive timestamps are treated as UTC."""
+    if created_at.tzinfo is None:
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return (created_at + timedelta(days=settings.escalation_days)).timestamp()
+
+
+class HeapDueQueue:
+    """
+    Single-process due queue backed by heapq. Like the sorted set it holds one deadline
+    per conflict: rescheduling replaces it and unscheduling removes it; superseded heap
+    entries are skipped lazily.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int]] = []
+        self._due: dict[int, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def schedule(self, entries: Iterable[tuple[int, float]]) -> None:
+        async with self._lock:
+            for conflict_id, due in entries:
+                self._due[conflict_id] = due
+                heapq.heappush(self._heap, (due, conflict_id))
+
+    async def unschedule(self, conflict_ids: Iterable[int]) -> None:
+        async with self._lock:
+            for conflict_id in conflict_ids:
+                self._due.pop(conflict_id, None)
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    async def pop_due(self, now: float, limit: int) -> list[tuple[int, float]]:
+        async with self._lock:
+            entries: list[tuple[int, float]] = []
+            self._drop_stale()
+            while self._heap and self._heap[0][0] <= now and len(entries) < limit:
+                due, conflict_id = heapq.heappop(self._heap)
+                del self._due[conflict_id]
+                entries.append((conflict_id, due))
+                self._drop_stale()
+            return entries
+
+    async def size(self) -> int:
+        return len(self._due)
+
+    async def next_due(self) -> Optional[float]:
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+
+class RedisDueQueue:
+    """Due queue shared across workers, backed by a Redis sorted set."""
+
+    def __init__(self, redis: aioredis.Redis) -> None:
+        self._redis = redis
+        self._pop_due = redis.register_script(POP_DUE_LUA)
+
+    async def schedule(self, entries: Iterable[tuple[int, float]]) -> None:
+        mapping = {str(conflict_id): due for conflict_id, due in entries}
+        if mapping:
+            await self._redis.zadd(QUEUE_KEY, mapping)
+
+    async def unschedule(self, conflict_ids: Iterable[int]) -> None:
+        members = [str(conflict_id) for conflict_id in conflict_ids]
+        if members:
+            await self._redis.zrem(QUEUE_KEY, *members)
+
+    async def pop_due(self, now: float, limit: int) -> list[tuple[int, float]]:
+        entries = await self._pop_due(keys=[QUEUE_KEY], args=[now, limit])
+        return [(int(entries[i]), float(entries[i + 1])) for i in range(0, len(entries), 2)]
+
+    async def size(self) -> int:
+        return await self._redis.zcard(QUEUE_KEY)
+
+    async def next_due(self) -> Optional[float]:
+        head = await self._redis.zrange(QUEUE_KEY, 0, 0, withscores=True)
+        return head[0][1] if head else None
+
+
+class EscalationScheduler:
+    """Pops due conflicts in batches, escalates them and publishes escalation events."""
+
+    def __init__(
+        self,
+        pool: asyncpg.Pool,
+        queue: HeapDueQueue | RedisDueQueue,
+        redis: Optional[aioredis.Redis] = None,
+        backend: Optional[BackendClient] = None,
+    ) -> None:
+        self.pool = pool
+        self.queue = queue
+        self.redis = redis
+        self.backend = backend
+        self._task: Optional[asyncio.Task] = None
+
+    async def schedule(self, rows: Iterable[tuple[int, datetime]]) -> None:
+        """Add (conflict_id, created_at) pairs; rescheduling an id is idempotent in Redis."""
+        await self.queue.schedule((conflict_id, due_at(created_at)) for conflict_id, created_at in rows)
+
+    async def schedule_open(self, conflict_ids: Iterable[int]) -> int:
+        """Schedule the given conflicts if they are open (their created_at comes from the table)."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(LOAD_OPEN_BY_ID_SQL, list(conflict_ids))
+        await self.schedule((row["id"], row["created_at"]) for row in rows)
+        return len(rows)
+
+    async def unschedule(self, conflict_ids: Iterable[int]) -> None:
+        await self.queue.unschedule(conflict_ids)
+
+    async def seed(self) -> int:
+        """Load every open conflict's deadline: at startup and after change-feed gaps, not per tick."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(LOAD_OPEN_SQL)
+        await self.schedule((row["id"], row["created_at"]) for row in rows)
+        logger.info("Escalation queue seeded", open_conflicts=len(rows))
+        return len(rows)
+
+    async def process_due(self) -> int:
+        """Escalate everything due right now, one batch at a time."""
+        escalated = 0
+        now = datetime.now(timezone.utc).timestamp()
+
+        while True:
+            entries = await self.queue.pop_due(now, settings.escalation_batch_size)
+            if not entries:
+                break
+
+            conflict_ids = [conflict_id for conflict_id, _ in entries]
+            try:
+                async with self.pool.acquire() as conn:
+                    rows = await conn.fetch(ESCALATE_SQL, conflict_ids, settings.escalation_days)
+            except Exception:
+                # Nothing was escalated; keep the batch for the next tick
+                await self.queue.schedule(entries)
+                raise
+
+            if rows:
+                await self._publish(rows)
+                escalated += len(rows)
+
+            rejected = set(conflict_ids) - {row["id"] for row in rows}
+            if rejected:
+                await self._reschedule_open(rejected, now + settings.escalation_poll_seconds)
+
+            if len(entries) < settings.escalation_batch_size:
+                break
+
+        if escalated > 0:
+            logger.info("Escalated conflict alerts to CEO/CFO", escalated_count=escalated)
+
+        return escalated
+
+    async def _reschedule_open(self, conflict_ids: set[int], not_before: float) -> None:
+        """Requeue popped conflicts that are still open (resolved and escalated ones drop out)."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(LOAD_OPEN_BY_ID_SQL, list(conflict_ids))
+        await self.queue.schedule((row["id"], max(due_at(row["created_at"]), not_before)) for row in rows)
+
+    async def _publish(self, rows: list[asyncpg.Record]) -> None:
+        event = {
+            "event": "conflicts.escalated",
+            "escalated_at": datetime.now(timezone.utc).isoformat(),
+            "conflicts": [
+                {
+                    "id": row["id"],
+                    "employee_id": row["employee_id"],
+                    "created_at": row["created_at"].isoformat(),
+                }
+                for row in rows
+            ],
+        }
+        if self.redis is not None:
+            await self.redis.publish(EVENTS_CHANNEL, json.dumps(event))
+        else:
+            logger.info("Escalation event", escalated_at=event["escalated_at"], conflicts=event["conflicts"])
+
+        # Laravel sends the ConflictEscalatedNotification mails
+        if self.backend is not None:
+            for conflict in event["conflicts"]:
+                await self.backend.enqueue(CALLBACK_PATH, conflict)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.process_due()
+            except Exception as exc:
+                logger.error("Escalation tick failed", error=str(exc))
+            await asyncio.sleep(settings.escalation_poll_seconds)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def stats(self) -> dict:
+        next_due = await self.queue.next_due()
+        return {
+            "queued": await self.queue.size(),
+            "next_due_at": (
+                datetime.fromtimestamp(next_due, timezone.utc).isoformat() if next_due is not None else None
+            ),
+            "backend": "redis" if isinstance(self.queue, RedisDueQueue) else "heap",
+        }
+
+
+def create_scheduler(
+    pool: asyncpg.Pool,
+    redis: Optional[aioredis.Redis],
+    backend: Optional[BackendClient] = None,
+) -> EscalationScheduler:
+    queue = RedisDueQueue(redis) if redis is not None else HeapDueQueue()
+    return EscalationScheduler(pool, queue, redis, backend)
@@ -0,0 +1,362 @@
+"""
+Per-employee feature store.
+
+Keeps a compact, array-backed history summary per employee so anomaly, ranking and
+forecasting code can read features in O(1) instead of re-aggregating every past period.
+Each column is a numpy array; `employee_id -> row` is a dict index. The store is
+updated incrementally, one reporting period at a time, after each validation run:
+
+    ewma_discrepancy / ewma_abs_discrepancy / ewma_variance   rolling discrepancy stats
+    max_abs_discrepancy, last_discrepancy
+    periods_seen, conflict_count, amendment_count
+    current_streak / max_streak                                consecutive flagged periods
+
+Periods must be applied in chronological order; re-applying the latest period (a
+re-run after amendments) is ignored unless the store is rebuilt. The store is saved
+as an .npz snapshot under MODEL_PATH after every update and reloaded by other workers
+when the snapshot changes.
+"""
+
+import os
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import asyncpg
+import numpy as np
+import structlog
+
+from app.config import settings
+from app.services.detection import DetectionResult, detect_period
+from app.singleflight import SingleFlight, analysis_key
+
+logger = structlog.get_logger()
+
+FLOAT_COLUMNS = (
+    "ewma_discrepancy",
+    "ewma_abs_discrepancy",
+    "ewma_variance",
+    "max_abs_discrepancy",
+    "last_discrepancy",
+)
+INT_COLUMNS = (
+    "periods_seen",
+    "conflict_count",
+    "amendment_count",
+    "current_streak",
+    "max_streak",
+    "last_period",
+)
+
+# Employees whose hours an amendment to a report inside the period changed (old_data vs
+# new_data), once per amendment; re-submitting identical entries does not count
+_AMENDED_EMPLOYEES_SQL = """
+        SELECT d.employee_id
+        FROM {amendments} a
+        JOIN {reports} r ON r.id = a.{report_fk}
+        CROSS JOIN LATERAL (
+            SELECT coalesce(o.employee_id, n.employee_id) AS employee_id
+            FROM (
+                SELECT (e->>'employee_id')::bigint AS employee_id, sum((e->>'hours_worked')::numeric) AS hours
+                FROM jsonb_array_elements(coalesce({old_data}->'entries', '[]'::jsonb)) e
+                GROUP BY 1
+            ) o
+            FULL JOIN (
+                SELECT (e->>'employee_id')::bigint AS employee_id, sum((e->>'hours_worked')::numeric) AS hours
+                FROM jsonb_array_elements(coalesce({new_data}->'entries', '[]'::jsonb)) e
+                GROUP BY 1
+            ) n ON n.employee_id = o.employee_id
+            WHERE o.hours IS DISTINCT FROM n.hours
+        ) d
+        WHERE r.reporting_period_start >= $1 AND r.reporting_period_end <= $2
+"""
+
+PROJECT_AMENDED_SQL = _AMENDED_EMPLOYEES_SQL.format(
+    amendments="project_report_amendments",
+    reports="project_reports",
+    report_fk="project_report_id",
+    old_data="a.old_data",
+    new_data="a.new_data",
+)
+DEPARTMENT_AMENDED_SQL = _AMENDED_EMPLOYEES_SQL.format(
+    amendments="department_report_amendments",
+    reports="department_reports",
+    report_fk="department_report_id",
+    old_data="(a.changes->'old_data')",
+    new_data="(a.changes->'new_data')",
+)
+
+AMENDMENTS_SQL = f"""
+    SELECT employee_id, count(*)::int AS amendments FROM (
+        {PROJECT_AMENDED_SQL}
+        UNION ALL
+        {DEPARTMENT_AMENDED_SQL}
+    ) changed
+    WHERE employee_id IS NOT NULL
+    GROUP BY employee_id
+"""
+
+COMPLETED_PERIODS_SQL = """
+    SELECT DISTINCT reporting_period_start, reporting_period_end
+    FROM validation_runs
+    WHERE status = 'completed'
+    ORDER BY reporting_period_start
+"""
+
+
+class EmployeeFeatureStore:
+    """Columnar per-employee features with a dict index on employee_id."""
+
+    def __init__(self, capacity: int = 1024, alpha: float = 0.3) -> None:
+        self.alpha = alpha
+        self.index: dict[int, int] = {}
+        self.employee_ids = np.zeros(capacity, dtype=np.int64)
+        self.columns: dict[str, np.ndarray] = {
+            **{name: np.zeros(capacity, dtype=np.float64) for name in FLOAT_COLUMNS},
+            **{name: np.zeros(capacity, dtype=np.int64) for name in INT_COLUMNS},
+        }
+        self.latest_period = 0  # date.toordinal() of the last applied period start
+        self._lock = threading.Lock()
+        self._snapshot_mtime: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.index)
+
+    def _rows_for(self, employee_ids: np.ndarray) -> np.ndarray:
+        """Row numbers for the given ids, allocating rows (and growing arrays) as needed."""
+        new_ids = [int(e) for e in employee_ids if int(e) not in self.index]
+        needed = self.size + len(new_ids)
+        if needed > self.employee_ids.size:
+            capacity = max(needed, self.employee_ids.size * 2)
+            self.employee_ids = np.resize(self.employee_ids, capacity)
+            for name, column in self.columns.items():
+                grown = np.zeros(capacity, dtype=column.dtype)
+                grown[: column.size] = column
+                self.columns[name] = grown
+        for employee_id in new_ids:
+            row = self.size
+            self.index[employee_id] = row
+            self.employee_ids[row] = employee_id
+        return np.fromiter((self.index[int(e)] for e in employee_ids), dtype=np.int64, count=len(employee_ids))
+
+    def apply_period(
+        self,
+        period_start: date,
+        result: DetectionResult,
+        amendments: dict[int, int],
+    ) -> bool:
+        """Fold one period's detection result into the store. Returns False if skipped."""
+        ordinal = period_start.toordinal()
+        with self._lock:
+            if ordinal <= self.latest_period:
+                logger.warning(
+                    "Feature store period skipped (not newer than latest)",
+                    period_start=period_start.isoformat(),
+                )
+                return False
+
+            rows = self._rows_for(result.employee_ids)
+            c = self.columns
+            disc = result.discrepancy
+            abs_disc = np.abs(disc)
+            first = c["periods_seen"][rows] == 0
+            a = self.alpha
+
+            # EWMA mean/variance (West's incremental form); first observation seeds the mean
+            prev_mean = np.where(first, disc, c["ewma_discrepancy"][rows])
+            delta = disc - prev_mean
+            c["ewma_discrepancy"][rows] = prev_mean + a * delta
+            c["ewma_variance"][rows] = np.where(first, 0.0, (1 - a) * (c["ewma_variance"][rows] + a * delta**2))
+            prev_abs = np.where(first, abs_disc, c["ewma_abs_discrepancy"][rows])
+            c["ewma_abs_discrepancy"][rows] = prev_abs + a * (abs_disc - prev_abs)
+            c["max_abs_discrepancy"][rows] = np.maximum(c["max_abs_discrepancy"][rows], abs_disc)
+            c["last_discrepancy"][rows] = disc
+
+            flagged = result.flagged
+            c["periods_seen"][rows] += 1
+            c["conflict_count"][rows] += flagged
+            c["current_streak"][rows] = np.where(flagged, c["current_streak"][rows] + 1, 0)
+            c["max_streak"][rows] = np.maximum(c["max_streak"][rows], c["current_streak"][rows])
+            c["last_period"][rows] = ordinal
+
+            if amendments:
+                amended_ids = np.fromiter(amendments.keys(), dtype=np.int64)
+                amended_rows = self._rows_for(amended_ids)
+                c = self.columns  # _rows_for may have grown the arrays
+                c["amendment_count"][amended_rows] += np.fromiter(amendments.values(), dtype=np.int64)
+
+            self.latest_period = ordinal
+        return True
+
+    def features(self, employee_ids: Iterable[int]) -> dict[int, Optional[dict]]:
+        """Batch lookup; unknown employees map to None."""
+        out: dict[int, Optional[dict]] = {}
+        for employee_id in employee_ids:
+            row = self.index.get(int(employee_id))
+            if row is None:
+                out[employee_id] = None
+                continue
+            values = {name: column[row].item() for name, column in self.columns.items()}
+            seen = values["periods_seen"] or 1
+            values["ewma_std"] = float(np.sqrt(values["ewma_variance"]))
+            values["conflict_rate"] = values["conflict_count"] / seen
+            values["amendment_rate"] = values["amendment_count"] / seen
+            values["last_period"] = date.fromordinal(values["last_period"]).isoformat() if values["last_period"] else None
+            out[employee_id] = values
+        return out
+
+    def lookup(self, employee_ids: np.ndarray, names: Iterable[str]) -> np.ndarray:
+        """
+        (len(employee_ids), len(names)) gather for model inputs; unknown employees get
+        zeros. Accepts the derived `conflict_rate` and `amendment_rate` as names too.
+        """
+        index = self.index
+        rows = np.fromiter((index.get(int(e), -1) for e in employee_ids), dtype=np.int64, count=len(employee_ids))
+        known = rows >= 0
+        safe = np.where(known, rows, 0)
+        seen = np.maximum(self.columns["periods_seen"][safe], 1)
+        out = []
+        for name in names:
+            if name == "conflict_rate":
+                values = self.columns["conflict_count"][safe] / seen
+            elif name == "amendment_rate":
+                values = self.columns["amendment_count"][safe] / seen
+            else:
+                values = self.columns[name][safe]
+            out.append(np.where(known, values, 0.0))
+        return np.column_stack(out) if out else np.empty((rows.size, 0))
+
+    def matrix(self, names: Iterable[str]) -> tuple[np.ndarray, np.ndarray]:
+        """(employee_ids, feature matrix) for all known employees, for batch models."""
+        names = list(names)
+        n = self.size
+        return self.employee_ids[:n].copy(), np.column_stack([self.columns[name][:n] for name in names])
+
+    # -- persistence -------------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        n = self.size
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer: several workers may save at once, the last rename wins
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.stem}.", suffix=".tmp", delete=False) as tmp:
+            try:
+                np.savez(
+                    tmp,
+                    employee_ids=self.employee_ids[:n],
+                    latest_period=np.array([self.latest_period]),
+                    alpha=np.array([self.alpha]),
+                    **{name: column[:n] for name, column in self.columns.items()},
+                )
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, path)
+        self._snapshot_mtime = path.stat().st_mtime
+
+    @classmethod
+    def load(cls, path: Path) -> "EmployeeFeatureStore":
+        with np.load(path) as data:
+            ids = data["employee_ids"]
+            store = cls(capacity=max(1024, ids.size), alpha=float(data["alpha"][0]))
+            store._rows_for(ids)
+            for name in store.columns:
+                store.columns[name][: ids.size] = data[name]
+            store.latest_period = int(data["latest_period"][0])
+        store._snapshot_mtime = path.stat().st_mtime
+        return store
+
+    def snapshot_changed(self, path: Path) -> bool:
+        return path.exists() and path.stat().st_mtime != self._snapshot_mtime
+
+
+def snapshot_path() -> Path:
+    return Path(settings.model_path) / "employee_features.npz"
+
+
+def open_store() -> EmployeeFeatureStore:
+    path = snapshot_path()
+    if path.exists():
+        try:
+            store = EmployeeFeatureStore.load(path)
+            logger.info("Feature store loaded", employees=store.size)
+            return store
+        except (OSError, KeyError, ValueError) as exc:
+            logger.warning("Feature store snapshot unreadable, starting empty", error=str(exc))
+    return EmployeeFeatureStore(alpha=settings.feature_ewma_alpha)
+
+
+def current(state) -> EmployeeFeatureStore:
+    """The worker's store (`state.feature_store`), reloaded if another worker saved a newer snapshot."""
+    store = state.feature_store
+    path = snapshot_path()
+    if store.snapshot_changed(path):
+        store = EmployeeFeatureStore.load(path)
+        state.feature_store = store
+    return store
+
+
+async def load_amendments(conn: asyncpg.Connection, period_start: date, period_end: date) -> dict[int, int]:
+    rows = await conn.fetch(AMENDMENTS_SQL, period_start, period_end)
+    return {row["employee_id"]: row["amendments"] for row in rows}
+
+
+async def update_from_period(
+    store: EmployeeFeatureStore,
+    pool: asyncpg.Pool,
+    period_start: date,
+    period_end: date,
+    result: Optional[DetectionResult] = None,
+    threshold: Optional[float] = None,
+) -> bool:
+    """
+    Incremental update after a validation run; reuses the detection result if given,
+    otherwise re-detects the period at `threshold` (default: CONFLICT_THRESHOLD).
+    """
+    async with pool.acquire() as conn:
+        if result is None:
+            threshold = threshold if threshold is not None else settings.conflict_threshold
+            result = await detect_period(conn, period_start, period_end, threshold)
+        amendments = await load_amendments(conn, period_start, period_end)
+
+    applied = store.apply_period(period_start, result, amendments)
+    if applied:
+        store.save(snapshot_path())
+        logger.info("Feature store updated", period_start=period_start.isoformat(), employees=store.size)
+    return applied
+
+
+async def update_period_once(
+    flight: Optional[SingleFlight],
+    store: Callable[[], EmployeeFeatureStore],
+    pool: asyncpg.Pool,
+    period_start: date,
+    period_end: date,
+    result: Optional[DetectionResult] = None,
+    threshold: Optional[float] = None,
+) -> bool:
+    """
+    update_from_period() in one worker only. Every worker's change feed sees the same
+    completed run, so the update runs under the period's single-flight lock; the other
+    workers wait for it and read the saved snapshot through current().
+    """
+
+    async def run() -> bool:
+        return await update_from_period(store(), pool, period_start, period_end, result, threshold)
+
+    if flight is None:
+        return await run()
+    return await flight.do(analysis_key("features.period", period_start, period_end), run)
+
+
+async def rebuild(pool: asyncpg.Pool) -> EmployeeFeatureStore:
+    """Replay every completed validation period in order into a fresh store."""
+    store = EmployeeFeatureStore(alpha=settings.feature_ewma_alpha)
+    async with pool.acquire() as conn:
+        periods = await conn.fetch(COMPLETED_PERIODS_SQL)
+    for period in periods:
+        await update_from_period(store, pool, period["reporting_period_start"], period["reporting_period_end"])
+    store.save(snapshot_path())
+    return store
@@ -0,0 +1,218 @@
+"""
+Behavioural clustering of reporters (SDDs and department managers).
+
+Every reporter gets one feature vector built from the reports they submitted in the
+analysis window and the conflicts on the employees they reported on:
+
+    report_count, mean/std submission lag (hours after the period ended, from the
+    report's updated_at), early_submission_rate (submitted before the period ended),
+    amendment_rate, mean_entry_hours, round_hours_share (whole-hour entries),
+    conflict_rate (conflicts per entry), mean_abs_discrepancy, signed_discrepancy
+    (positive = this reporter's side reports more hours than the other source)
+
+Features are robust-scaled (median / IQR) and clustered with MiniBatchKMeans, which
+trains in mini-batches so the full user base fits the weekly job window on CPU, or
+DBSCAN. Outlier reporters are DBSCAN noise points, or for k-means the points far from
+their centroid relative to the cluster's typical distance, or members of tiny clusters.
+Each outlier lists the features that deviate most from the population median.
+
+The weekly job calls POST /api/ml/anomalies/reporters/run; the latest result is kept
+in the result cache for dashboards.
+"""
+
+import asyncio
+import math
+from dataclasses import dataclass
+from datetime import date
+
+import asyncpg
+import numpy as np
+
+from app import engines, tracing
+from app.config import settings
+
+CACHE_NAMESPACE = "anomalies:reporters"
+LATEST_KEY = "latest"
+
+FEATURES = (
+    "report_count",
+    "mean_submit_lag_hours",
+    "std_submit_lag_hours",
+    "early_submission_rate",
+    "amendment_rate",
+    "mean_entry_hours",
+    "round_hours_share",
+    "conflict_rate",
+    "mean_abs_discrepancy",
+    "signed_discrepancy",
+)
+
+# One template for both sources; {sign} orients discrepancy (source_a - source_b)
+# from the reporter's side.
+_REPORTER_SQL = """
+    WITH reports AS (
+        SELECT r.id, r.submitted_by, r.reporting_period_start,
+               EXTRACT(EPOCH FROM r.updated_at - (r.reporting_period_end + 1)::timestamp) / 3600 AS lag_hours
+        FROM {reports} r
+        WHERE r.status IN ('submitted', 'amended')
+          AND r.reporting_period_start >= $1 AND r.reporting_period_end <= $2
+    ),
+    entries AS (
+        SELECT rep.submitted_by,
+               count(*) AS entry_count,
+               avg(e.hours_worked)::float8 AS mean_entry_hours,
+               avg((e.hours_worked = trunc(e.hours_worked))::int)::float8 AS round_hours_share,
+               count(c.id) AS conflicts,
+               coalesce(avg(abs(c.discrepancy)), 0)::float8 AS mean_abs_discrepancy,
+               coalesce(avg({sign} c.discrepancy), 0)::float8 AS signed_discrepancy
+        FROM reports rep
+        JOIN {entries} e ON e.{entry_fk} = rep.id
+        LEFT JOIN conflict_alerts c
+               ON c.employee_id = e.employee_id AND c.reporting_period_start = rep.reporting_period_start
+        GROUP BY rep.submitted_by
+    ),
+    amendments AS (
+        SELECT rep.submitted_by, count(*) AS amendment_count
+        FROM reports rep
+        JOIN {amendments} a ON a.{entry_fk} = rep.id
+        GROUP BY rep.submitted_by
+    )
+    SELECT r.submitted_by AS reporter_id,
+           count(*)::float8 AS report_count,
+           avg(r.lag_hours)::float8 AS mean_submit_lag_hours,
+           coalesce(stddev_pop(r.lag_hours), 0)::float8 AS std_submit_lag_hours,
+           avg((r.lag_hours < 0)::int)::float8 AS early_submission_rate,
+           (coalesce(max(am.amendment_count), 0) / count(*)::float8) AS amendment_rate,
+           coalesce(max(en.mean_entry_hours), 0) AS mean_entry_hours,
+           coalesce(max(en.round_hours_share), 0) AS round_hours_share,
+           coalesce(max(en.conflicts)::float8 / nullif(max(en.entry_count), 0), 0) AS conflict_rate,
+           coalesce(max(en.mean_abs_discrepancy), 0) AS mean_abs_discrepancy,
+           coalesce(max(en.signed_discrepancy), 0) AS signed_discrepancy
+    FROM reports r
+    LEFT JOIN entries en ON en.submitted_by = r.submitted_by
+    LEFT JOIN amendments am ON am.submitted_by = r.submitted_by
+    GROUP BY r.submitted_by
+"""
+
+PROJECT_REPORTERS_SQL = _REPORTER_SQL.format(
+    reports="project_reports",
+    entries="project_report_entries",
+    amendments="project_report_amendments",
+    entry_fk="project_report_id",
+    sign="",
+)
+DEPARTMENT_REPORTERS_SQL = _REPORTER_SQL.format(
+    reports="department_reports",
+    entries="department_report_entries",
+    amendments="department_report_amendments",
+    entry_fk="department_report_id",
+    sign="-",
+)
+
+
+@dataclass
+class ReporterFeatures:
+    reporter_ids: np.ndarray  # int64
+    roles: np.ndarray  # "project" / "department"
+    matrix: np.ndarray  # (n, len(FEATURES)) float64
+
+    @classmethod
+    def from_records(cls, project_rows, department_rows) -> "ReporterFeatures":
+        rows = [("project", r) for r in project_rows] + [("department", r) for r in department_rows]
+        if not rows:
+            return cls(np.empty(0, np.int64), np.empty(0, object), np.empty((0, len(FEATURES))))
+        return cls(
+            np.fromiter((r[0] for _, r in rows), dtype=np.int64, count=len(rows)),
+            np.array([role for role, _ in rows], dtype=object),
+            np.array([[r[1 + i] for i in range(len(FEATURES))] for _, r in rows], dtype=np.float64),
+        )
+
+
+def robust_scale(matrix: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(scaled, median, iqr); constant columns get an IQR of 1 so they scale to 0."""
+    median = np.median(matrix, axis=0)
+    q75, q25 = np.percentile(matrix, [75, 25], axis=0)
+    iqr = q75 - q25
+    iqr[iqr == 0] = 1.0
+    return (matrix - median) / iqr, median, iqr
+
+
+def cluster_reporters(features: ReporterFeatures, method: str = "kmeans") -> dict:
+    """Cluster the feature vectors and score outliers. Runs in a worker thread."""
+    n = features.reporter_ids.size
+    if n < 3:
+        return {"method": method, "reporters": n, "clusters": [], "outliers": []}
+
+    cluster = engines.load("sklearn.cluster")
+    scaled, median, _ = robust_scale(features.matrix)
+
+    if method == "dbscan":
+        model = cluster.DBSCAN(eps=settings.reporter_dbscan_eps, min_samples=settings.reporter_dbscan_min_samples)
+        labels = model.fit_predict(scaled)
+        outlier = labels == -1
+        score = np.where(outlier, np.abs(scaled).max(axis=1), 0.0)
+    else:
+        k = settings.reporter_clusters or max(2, min(8, int(math.sqrt(n / 2))))
+        k = min(k, n)
+        model = cluster.MiniBatchKMeans(
+            n_clusters=k, batch_size=settings.reporter_batch_size, n_init=3, random_state=0
+        )
+        labels = model.fit_predict(scaled)
+        distance = np.linalg.norm(scaled - model.cluster_centers_[labels], axis=1)
+        typical = np.zeros(k)
+        for c in range(k):
+            members = distance[labels == c]
+            typical[c] = np.median(members) if members.size else 0.0
+        # Floor tight clusters at the overall typical distance so near-duplicates don't explode
+        score = distance / np.maximum(typical[labels], max(float(np.median(distance)), 1e-9))
+        sizes = np.bincount(labels, minlength=k)
+        tiny = sizes[labels] < max(2, settings.reporter_tiny_cluster_share * n)
+        outlier = (score > settings.reporter_outlier_ratio) | tiny
+
+    clusters = []
+    for c in np.unique(labels[labels >= 0]):
+        members = labels == c
+        clusters.append(
+            {
+                "cluster": int(c),
+                "size": int(members.sum()),
+                "centroid": dict(zip(FEATURES, np.round(features.matrix[members].mean(axis=0), 3).tolist())),
+            }
+        )
+
+    outliers = []
+    for i in np.flatnonzero(outlier)[np.argsort(-score[outlier], kind="stable")]:
+        deviation = scaled[i]
+        top = np.argsort(-np.abs(deviation))[:3]
+        outliers.append(
+            {
+                "reporter_id": int(features.reporter_ids[i]),
+                "role": features.roles[i],
+                "cluster": int(labels[i]),
+                "score": round(float(score[i]), 3),
+                "features": dict(zip(FEATURES, np.round(features.matrix[i], 3).tolist())),
+                "reasons": [
+                    {
+                        "feature": FEATURES[j],
+                        "value": round(float(features.matrix[i, j]), 3),
+                        "median": round(float(median[j]), 3),
+                    }
+                    for j in top
+                    if abs(deviation[j]) > 1.0
+                ],
+            }
+        )
+
+    return {"method": method, "reporters": n, "clusters": clusters, "outliers": outliers}
+
+
+async def analyze_reporters(pool: asyncpg.Pool, period_start: date, period_end: date, method: str) -> dict:
+    with tracing.span("db.load_reporters"):
+        async with pool.acquire() as conn:
+            project_rows = await conn.fetch(PROJECT_REPORTERS_SQL, period_start, period_end)
+            department_rows = await conn.fetch(DEPARTMENT_REPORTERS_SQL, period_start, period_end)
+    features = ReporterFeatures.from_records(project_rows, department_rows)
+    await engines.aload("sklearn.cluster")
+    with tracing.span("compute.cluster_reporters", method=method):
+        result = await asyncio.to_thread(cluster_reporters, features, method)
+    return {"period_start": period_start.isoformat(), "period_end": period_end.isoformat(), **result}
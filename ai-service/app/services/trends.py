@@ -0,0 +1,159 @@
+"""
+Weekly conflict trends over reporting periods.
+
+For every week (reporting_period_start, Monday-aligned) and department the engine
+computes: number of conflicts, mean absolute discrepancy, mean time to resolution and
+escalation rate, plus an organization-wide total. Aggregation is one vectorized pandas
+groupby over the loaded conflict_alerts rows; weeks with no conflicts are filled in.
+
+Results for closed weeks (every week before the current one) are cached per week, so
+a warm 52-week request only loads and recomputes the current week. Closed weeks can
+still change when old conflicts get resolved or escalated; the change feed calls
+`invalidate_weeks()` for those, and without it the cache falls back to a short TTL
+(`cache_ttl_seconds()`).
+"""
+
+import asyncio
+import math
+from datetime import date, timedelta
+from typing import Optional
+
+import asyncpg
+
+from app import engines, tracing
+from app.cache import ResultCache
+from app.config import settings
+
+CACHE_NAMESPACE = "trends:conflicts"
+TOTAL_KEY = "all"
+UNASSIGNED_KEY = "unassigned"
+
+CONFLICTS_SQL = """
+    SELECT c.reporting_period_start, u.department_id, c.discrepancy::float8 AS discrepancy,
+           c.created_at, c.resolved_at, c.escalated_at
+    FROM conflict_alerts c
+    JOIN users u ON u.id = c.employee_id
+    WHERE c.reporting_period_start >= $1 AND c.reporting_period_start < $2
+"""
+
+METRICS = ("conflicts", "mean_abs_discrepancy", "mean_hours_to_resolution", "escalation_rate")
+
+
+def cache_ttl_seconds(change_feed: bool) -> int:
+    """Closed weeks are only safe to keep long while the change feed invalidates them."""
+    return settings.trend_cache_ttl_seconds if change_feed else settings.trend_cache_unwatched_ttl_seconds
+
+
+def week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def week_range(weeks: int, today: Optional[date] = None) -> list[date]:
+    """The last `weeks` Monday-aligned weeks, oldest first, ending with the current week."""
+    current = week_start(today or date.today())
+    return [current - timedelta(weeks=n) for n in range(weeks - 1, -1, -1)]
+
+
+def _clean(value) -> Optional[float]:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return round(float(value), 3)
+
+
+def _metrics(row) -> dict:
+    return {"conflicts": int(row["conflicts"]), **{m: _clean(row[m]) for m in METRICS[1:]}}
+
+
+def compute_weekly_metrics(records: list) -> dict[str, dict[str, dict]]:
+    """
+    {week_iso: {department_key: {metric: value}}} for the weeks present in `records`.
+    Runs in a worker thread; pandas is loaded lazily.
+    """
+    pd = engines.load("pandas")
+    if not records:
+        return {}
+
+    df = pd.DataFrame(
+        records,
+        columns=["period_start", "department_id", "discrepancy", "created_at", "resolved_at", "escalated_at"],
+    )
+    df["week"] = pd.to_datetime(df["period_start"]).dt.to_period("W-SUN").dt.start_time.dt.date
+    df["department"] = df["department_id"].astype("Int64").astype(str).replace("<NA>", UNASSIGNED_KEY)
+    df["abs_discrepancy"] = df["discrepancy"].abs()
+    # utc=True: an all-unresolved range would otherwise parse as tz-naive NaT
+    df["hours_to_resolution"] = (
+        pd.to_datetime(df["resolved_at"], utc=True) - pd.to_datetime(df["created_at"], utc=True)
+    ).dt.total_seconds() / 3600
+    df["escalated"] = df["escalated_at"].notna()
+
+    aggregations = dict(
+        conflicts=("abs_discrepancy", "size"),
+        mean_abs_discrepancy=("abs_discrepancy", "mean"),
+        mean_hours_to_resolution=("hours_to_resolution", "mean"),
+        escalation_rate=("escalated", "mean"),
+    )
+    per_department = df.groupby(["week", "department"]).agg(**aggregations)
+    totals = df.groupby("week").agg(**aggregations)
+
+    result: dict[str, dict[str, dict]] = {}
+    for (week, department), row in per_department.iterrows():
+        result.setdefault(week.isoformat(), {})[department] = _metrics(row)
+    for week, row in totals.iterrows():
+        result[week.isoformat()][TOTAL_KEY] = _metrics(row)
+    return result
+
+
+async def _load_and_compute(pool: asyncpg.Pool, start: date, end: date) -> dict[str, dict[str, dict]]:
+    with tracing.span("db.load_conflicts"):
+        async with pool.acquire() as conn:
+            records = await conn.fetch(CONFLICTS_SQL, start, end)
+    await engines.aload("pandas")
+    with tracing.span("compute.weekly_metrics", rows=len(records)):
+        return await asyncio.to_thread(compute_weekly_metrics, [tuple(r) for r in records])
+
+
+async def conflict_trends(
+    pool: asyncpg.Pool,
+    cache: ResultCache,
+    weeks: int,
+    department_id: Optional[int] = None,
+    today: Optional[date] = None,
+) -> dict:
+    week_starts = week_range(weeks, today)
+    keys = [w.isoformat() for w in week_starts]
+    closed_keys = keys[:-1]
+
+    cached = await cache.get_many(closed_keys)
+    missing = [w for w, k in zip(week_starts[:-1], closed_keys) if k not in cached]
+
+    # One query spanning the oldest uncached closed week through the current week
+    load_from = missing[0] if missing else week_starts[-1]
+    computed = await _load_and_compute(pool, load_from, week_starts[-1] + timedelta(weeks=1))
+
+    fresh_closed = {
+        k: computed.get(k, {}) for w, k in zip(week_starts[:-1], closed_keys) if w >= load_from and k not in cached
+    }
+    await cache.set_many(fresh_closed)
+
+    by_week = {**cached, **fresh_closed, keys[-1]: computed.get(keys[-1], {})}
+
+    selected = TOTAL_KEY if department_id is None else str(department_id)
+    departments = sorted({d for week in by_week.values() for d in week if d != TOTAL_KEY})
+    empty = {"conflicts": 0, "mean_abs_discrepancy": None, "mean_hours_to_resolution": None, "escalation_rate": None}
+
+    def series(key: str) -> dict[str, list]:
+        points = [by_week.get(k, {}).get(key, empty) for k in keys]
+        return {m: [p[m] for p in points] for m in METRICS}
+
+    return {
+        "weeks": keys,
+        "series": series(selected),
+        "departments": {d: series(d) for d in departments} if department_id is None else {},
+        "cached_weeks": len(cached),
+        "computed_weeks": len(fresh_closed) + 1,
+    }
+
+
+async def invalidate_weeks(cache: ResultCache, period_starts: list[date]) -> None:
+    """Drop cached weeks touched by late changes (e.g. an old conflict being resolved)."""
+    await cache.invalidate(week_start(d).isoformat() for d in period_starts)
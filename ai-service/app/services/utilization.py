@@ -0,0 +1,189 @@
+"""
+Resource-utilization analytics over concurrent projects.
+
+`getSourceAHours` sums an employee's project report entries without asking whether the
+combined load is plausible. Here the period's reported hours become one sparse
+employee x project matrix (plus the weekly allocations from project_assignments as a
+second matrix over the same axes), and every metric is a row or column reduction of
+those matrices, so the whole organization is analysed in one pass:
+
+    per employee  weekly_hours, project_count, fragmentation (1 - HHI of the hours
+                  split across projects), allocated_weekly_hours, over/under-allocation
+    per project   staff_count, total_hours, concentration (HHI of hours across staff),
+                  top_contributor_share
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import date
+
+import asyncpg
+import numpy as np
+
+from app import engines, tracing
+from app.config import settings
+
+REPORTED_SQL = """
+    SELECT pre.employee_id, pr.project_id, SUM(pre.hours_worked)::float8 AS hours
+    FROM project_report_entries pre
+    JOIN project_reports pr ON pr.id = pre.project_report_id
+    WHERE pr.status IN ('submitted', 'amended')
+      AND pr.reporting_period_start >= $1
+      AND pr.reporting_period_end <= $2
+    GROUP BY pre.employee_id, pr.project_id
+"""
+
+ALLOCATED_SQL = """
+    SELECT pa.user_id, pa.project_id, pa.allocated_hours::float8, p.status, p.start_date, p.end_date
+    FROM project_assignments pa
+    JOIN projects p ON p.id = pa.project_id
+    WHERE pa.allocated_hours IS NOT NULL AND p.deleted_at IS NULL
+"""
+
+# Only these projects' allocations count toward an employee's allocated hours
+ALLOCATING_STATUSES = frozenset({"active"})
+
+
+@dataclass
+class Triples:
+    """Sparse (employee_id, project_id, hours) entries."""
+
+    employee_ids: np.ndarray
+    project_ids: np.ndarray
+    hours: np.ndarray
+
+    @classmethod
+    def from_records(cls, records) -> "Triples":
+        if not records:
+            return cls(np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64))
+        employee_ids, project_ids, hours = zip(*records)
+        return cls(
+            np.asarray(employee_ids, dtype=np.int64),
+            np.asarray(project_ids, dtype=np.int64),
+            np.asarray(hours, dtype=np.float64),
+        )
+
+
+def allocations_in_period(records, period_start: date, period_end: date) -> Triples:
+    """
+    Allocations of active projects whose start_date..end_date (open-ended when NULL)
+    overlaps the period; completed, cancelled, on-hold and not-yet-started projects
+    would otherwise inflate allocated hours and flag people as under-allocated.
+    """
+    return Triples.from_records(
+        [
+            (user_id, project_id, hours)
+            for user_id, project_id, hours, status, start_date, end_date in records
+            if status in ALLOCATING_STATUSES
+            and (start_date is None or start_date <= period_end)
+            and (end_date is None or end_date >= period_start)
+        ]
+    )
+
+
+def _hhi(matrix, totals: np.ndarray, axis: int) -> np.ndarray:
+    """Herfindahl index of each row (axis=1) or column (axis=0); 0 where the total is 0."""
+    squares = np.asarray(matrix.multiply(matrix).sum(axis=axis)).ravel()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals > 0, squares / totals**2, 0.0)
+
+
+def compute_utilization(reported: Triples, allocated: Triples, weeks: float) -> dict:
+    sparse = engines.load("scipy.sparse")
+
+    employees = np.union1d(reported.employee_ids, allocated.employee_ids)
+    projects = np.union1d(reported.project_ids, allocated.project_ids)
+    shape = (employees.size, projects.size)
+
+    def to_matrix(t: Triples):
+        rows = np.searchsorted(employees, t.employee_ids)
+        cols = np.searchsorted(projects, t.project_ids)
+        return sparse.csr_matrix((t.hours, (rows, cols)), shape=shape)
+
+    hours = to_matrix(reported)
+    allocation = to_matrix(allocated)
+
+    # Employees
+    total_hours = np.asarray(hours.sum(axis=1)).ravel()
+    weekly_hours = total_hours / weeks
+    project_count = np.diff(hours.indptr)
+    fragmentation = np.where(total_hours > 0, 1.0 - _hhi(hours, total_hours, axis=1), 0.0)
+    allocated_weekly = np.asarray(allocation.sum(axis=1)).ravel()
+    over = weekly_hours > settings.utilization_over_weekly_hours
+    under = (allocated_weekly > 0) & (weekly_hours < settings.utilization_under_ratio * allocated_weekly)
+
+    # Projects
+    by_project = hours.tocsc()
+    project_hours = np.asarray(by_project.sum(axis=0)).ravel()
+    staff_count = np.diff(by_project.indptr)
+    concentration = _hhi(by_project, project_hours, axis=0)
+    top_hours = by_project.max(axis=0).toarray().ravel() if projects.size else np.empty(0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        top_share = np.where(project_hours > 0, top_hours / project_hours, 0.0)
+    concentrated = (staff_count >= 2) & (top_share >= settings.utilization_concentration_share)
+
+    def employee_rows(mask: np.ndarray) -> list[dict]:
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(-weekly_hours[idx], kind="stable")]
+        return [
+            {
+                "employee_id": int(employees[i]),
+                "weekly_hours": round(float(weekly_hours[i]), 2),
+                "allocated_weekly_hours": round(float(allocated_weekly[i]), 2),
+                "project_count": int(project_count[i]),
+                "fragmentation": round(float(fragmentation[i]), 3),
+            }
+            for i in idx
+        ]
+
+    active = total_hours > 0
+    return {
+        "summary": {
+            "weeks": round(weeks, 3),
+            "employees": int(active.sum()),
+            "projects": int((project_hours > 0).sum()),
+            "assignments_reported": int(hours.nnz),
+            "over_allocated": int(over.sum()),
+            "under_allocated": int(under.sum()),
+            "concentrated_projects": int(concentrated.sum()),
+            "mean_projects_per_employee": float(project_count[active].mean()) if active.any() else 0.0,
+            "mean_fragmentation": float(fragmentation[active].mean()) if active.any() else 0.0,
+        },
+        "over_allocated": employee_rows(over),
+        "under_allocated": employee_rows(under),
+        "concentrated_projects": [
+            {
+                "project_id": int(projects[j]),
+                "staff_count": int(staff_count[j]),
+                "total_hours": round(float(project_hours[j]), 2),
+                "top_contributor_share": round(float(top_share[j]), 3),
+                "concentration": round(float(concentration[j]), 3),
+            }
+            for j in np.flatnonzero(concentrated)
+        ],
+        "employees": {
+            "employee_id": employees,
+            "weekly_hours": weekly_hours,
+            "project_count": project_count,
+            "fragmentation": fragmentation,
+            "allocated_weekly_hours": allocated_weekly,
+        },
+        "projects": {
+            "project_id": projects,
+            "staff_count": staff_count,
+            "total_hours": project_hours,
+            "concentration": concentration,
+            "top_contributor_share": top_share,
+        },
+    }
+
+
+async def utilization_report(pool: asyncpg.Pool, period_start: date, period_end: date) -> dict:
+    with tracing.span("db.load_utilization"):
+        async with pool.acquire() as conn:
+            reported = Triples.from_records(await conn.fetch(REPORTED_SQL, period_start, period_end))
+            allocated = allocations_in_period(await conn.fetch(ALLOCATED_SQL), period_start, period_end)
+    weeks = ((period_end - period_start).days + 1) / 7
+    await engines.aload("scipy.sparse")
+    with tracing.span("compute.utilization"):
+        return await asyncio.to_thread(compute_utilization, reported, allocated, weeks)
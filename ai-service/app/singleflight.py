@@ -0,0 +1,115 @@
+"""
+Single-flight coalescing for expensive analyses.
+
+Concurrent requests for the same analysis key share one computation:
+
+- Within a worker, the first caller starts the computation as a task and later callers
+  await the same task.
+- Across workers, the first worker to take the Redis lock `ai:flight:<ns>:<key>:lock`
+  computes and stores the JSON result under `...:result` for a few seconds; the other
+  workers poll for that result instead of computing. If the lock holder dies (the lock
+  expires without a result) a waiter takes over.
+
+Results are only shared while a computation is in flight (plus the short result TTL);
+this is not a cache. Without Redis only in-worker coalescing applies.
+"""
+
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+import structlog
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+
+from app import tracing
+from app.config import settings
+from app.responses import JSON, encode
+
+logger = structlog.get_logger()
+
+# Delete the lock only if we still own it
+RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """Coalesces concurrent calls of the same key into one computation."""
+
+    def __init__(self, redis: Optional[aioredis.Redis], namespace: str) -> None:
+        self._redis = redis
+        self._prefix = f"ai:flight:{namespace}:"
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._release = redis.register_script(RELEASE_LUA) if redis is not None else None
+        self.stats = {"computed": 0, "coalesced_local": 0, "coalesced_remote": 0}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        """Return compute()'s result, sharing it with concurrent callers of `key`."""
+        with tracing.span("cache.single_flight", key=key) as span:
+            task = self._inflight.get(key)
+            if task is not None:
+                self.stats["coalesced_local"] += 1
+                span.set_attribute("coalesced", True)
+                return await asyncio.shield(task)
+
+            # The task copies the current context, so compute()'s spans nest under this one
+            task = asyncio.create_task(self._run(key, compute))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            # Shield so one cancelled client doesn't cancel the computation for the others
+            return await asyncio.shield(task)
+
+    async def _run(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        if self._redis is None:
+            self.stats["computed"] += 1
+            return await compute()
+        try:
+            return await self._run_shared(key, compute)
+        except RedisError as exc:
+            logger.warning("Single-flight lock unavailable, computing locally", key=key, error=str(exc))
+            self.stats["computed"] += 1
+            return await compute()
+
+    async def _run_shared(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = self._prefix + key + ":lock"
+        result_key = self._prefix + key + ":result"
+        token = uuid.uuid4().hex
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.single_flight_wait_seconds
+        delay = 0.01
+
+        while True:
+            if await self._redis.set(lock_key, token, nx=True, px=int(settings.single_flight_lock_seconds * 1000)):
+                try:
+                    self.stats["computed"] += 1
+                    result = await compute()
+                    await self._redis.set(
+                        result_key,
+                        encode(result, JSON),
+                        px=int(settings.single_flight_result_seconds * 1000),
+                    )
+                    return result
+                finally:
+                    await self._release(keys=[lock_key], args=[token])
+
+            cached = await self._redis.get(result_key)
+            if cached is not None:
+                self.stats["coalesced_remote"] += 1
+                return orjson.loads(cached)
+            if loop.time() >= deadline:
+                logger.warning("Single-flight wait timed out, computing locally", key=key)
+                self.stats["computed"] += 1
+                return await compute()
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.2)
+
+
+def analysis_key(*parts: Any) -> str:
+    """Stable key from the parameters that determine an analysis result."""
+    return ":".join("" if p is None else str(p) for p in parts)
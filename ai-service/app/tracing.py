@@ -0,0 +1,203 @@
+"""
+Request tracing (OpenTelemetry) for the AI service.
+
+TracingMiddleware continues the W3C trace context of the incoming request (the
+`traceparent` header nginx forwards unchanged) or starts a new trace, and opens one
+SERVER span per request named after the route template. Code on the request path
+adds child spans with `span()`:
+
+    db.*          Postgres round trips (load_period_hours, load_entries, persist_detection)
+    compute.*     numpy / model work, including what runs in asyncio.to_thread
+    cache.*       ResultCache and single-flight
+    serialize.*   response encoding and compression
+
+so a slow request shows which hop the time went to. Log lines written inside a span
+carry its `trace_id` / `span_id` (add_trace_context), and responses carry a
+`traceresponse` header with the request's trace id.
+
+Tracing is off unless TRACING_ENABLED; until setup_tracing() installs a provider,
+`span()` returns OpenTelemetry's non-recording span and costs next to nothing.
+Spans are exported in batches from a background thread, either over OTLP/HTTP to a
+collector or as JSON lines to a local file (one line per span; see
+tools/trace_report.py).
+"""
+
+import json
+import os
+import time
+from typing import Any, Optional, Sequence
+
+import structlog
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from opentelemetry.trace.propagation.tracecontext import TraceContextTextMapPropagator
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+from app.endpoints import EndpointResolver
+
+logger = structlog.get_logger()
+
+# Probes and scrapes would only add noise to the traces
+EXEMPT_PATHS = frozenset({"/health", "/ready", "/metrics"})
+
+PROPAGATOR = TraceContextTextMapPropagator()
+
+tracer = trace.get_tracer("app")
+
+
+def span(name: str, kind: SpanKind = SpanKind.INTERNAL, **attributes: Any):
+    """Context manager for a child span of the current one; None attributes are dropped."""
+    return tracer.start_as_current_span(
+        name, kind=kind, attributes={key: value for key, value in attributes.items() if value is not None}
+    )
+
+
+def inject_headers(headers: Optional[dict[str, str]] = None) -> dict[str, str]:
+    """Add the current trace context (`traceparent`) to outgoing request headers."""
+    headers = {} if headers is None else headers
+    PROPAGATOR.inject(headers)
+    return headers
+
+
+def add_trace_context(logger, method_name: str, event_dict: dict) -> dict:
+    """structlog processor: correlate log lines with the span they were written in."""
+    span_context = trace.get_current_span().get_span_context()
+    if span_context.is_valid:
+        event_dict.setdefault("trace_id", format(span_context.trace_id, "032x"))
+        event_dict.setdefault("span_id", format(span_context.span_id, "016x"))
+    return event_dict
+
+
+def span_record(finished: ReadableSpan) -> dict:
+    span_context = finished.get_span_context()
+    return {
+        "trace_id": format(span_context.trace_id, "032x"),
+        "span_id": format(span_context.span_id, "016x"),
+        "parent_id": format(finished.parent.span_id, "016x") if finished.parent is not None else None,
+        "name": finished.name,
+        "kind": finished.kind.name,
+        "start": finished.start_time / 1e9,
+        "duration_ms": round((finished.end_time - finished.start_time) / 1e6, 3),
+        "status": finished.status.status_code.name,
+        "attributes": dict(finished.attributes or {}),
+        "events": [{"name": event.name, **dict(event.attributes or {})} for event in finished.events],
+        "service": finished.resource.attributes.get("service.name"),
+        "pid": os.getpid(),
+    }
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """Appends one JSON object per finished span to a file shared by all workers."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        data = "".join(json.dumps(span_record(s), default=str, separators=(",", ":")) + "\n" for s in spans)
+        try:
+            # One O_APPEND write per batch keeps the lines of concurrent workers whole
+            fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                os.write(fd, data.encode())
+            finally:
+                os.close(fd)
+        except OSError as exc:
+            logger.warning("Span export failed", path=self.path, error=str(exc))
+            return SpanExportResult.FAILURE
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        pass
+
+
+def create_exporter(kind: str) -> SpanExporter:
+    if kind == "otlp":
+        # The OTLP exporter pulls in protobuf; only load it when configured
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.tracing_otlp_endpoint)
+    if kind == "file":
+        return JsonLinesSpanExporter(settings.tracing_file_path)
+    if kind == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER {kind!r} (otlp, file or console)")
+
+
+def setup_tracing() -> Optional[TracerProvider]:
+    """
+    Install the process-wide tracer provider. Runs in the lifespan of every worker,
+    so the export thread is started after gunicorn forks.
+    """
+    if not settings.tracing_enabled:
+        return None
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.tracing_service_name}),
+        # An upstream sampling decision in traceparent wins over the local ratio
+        sampler=ParentBased(TraceIdRatioBased(settings.tracing_sample_ratio)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(create_exporter(settings.tracing_exporter)))
+    trace.set_tracer_provider(provider)
+    logger.info(
+        "Tracing enabled",
+        exporter=settings.tracing_exporter,
+        sample_ratio=settings.tracing_sample_ratio,
+    )
+    return provider
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware: one SERVER span per request, covering the streamed body."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self._endpoint = EndpointResolver()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        parent = PROPAGATOR.extract(headers)
+        endpoint = self._endpoint(scope)
+        attributes = {
+            "http.method": scope["method"],
+            "http.route": endpoint.split(" ", 1)[1],
+            "http.target": scope["path"],
+        }
+        if "user-agent" in headers:
+            attributes["http.user_agent"] = headers["user-agent"]
+
+        with tracer.start_as_current_span(endpoint, context=parent, kind=SpanKind.SERVER, attributes=attributes) as server:
+            span_context = server.get_span_context()
+            traceresponse = None
+            if span_context.is_valid:
+                flags = "01" if span_context.trace_flags.sampled else "00"
+                traceresponse = f"00-{span_context.trace_id:032x}-{span_context.span_id:016x}-{flags}".encode()
+            started = time.perf_counter()
+
+            async def send_traced(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    server.set_attribute("http.status_code", status)
+                    server.add_event("response.start", {"elapsed_ms": round((time.perf_counter() - started) * 1000, 3)})
+                    if status >= 500:
+                        server.set_status(Status(StatusCode.ERROR))
+                    if traceresponse is not None:
+                        message = {**message, "headers": [*message.get("headers", []), (b"traceresponse", traceresponse)]}
+                await send(message)
+
+            await self.app(scope, receive, send_traced)
@@ -0,0 +1,31 @@
+import numpy as np
+
+from app.services import data_quality
+from app.services.detection import compute_discrepancies
+from app.services.threshold_simulator import simulate
+from benchmarks import data
+
+
+def bench_compute_discrepancies(benchmark, size):
+    source_a, source_b = data.source_hours(size)
+
+    result = benchmark(compute_discrepancies, source_a, source_b, 2.0)
+
+    assert result.employees_checked == size + size // 10
+
+
+def bench_data_quality_validate(benchmark, size):
+    project, department = data.entry_columns(size)
+    end = data.MONDAY.fromordinal(data.MONDAY.toordinal() + 6)
+
+    _, _, report = benchmark(data_quality.validate, project, department, data.MONDAY, end)
+
+    assert report.summary()["sources"]["project"]["excluded"] > 0 or size < 10_000
+
+
+def bench_threshold_simulate(benchmark, size):
+    thresholds = np.linspace(0, 15, 1000)
+
+    result = benchmark(simulate, data.simulation_input(size), thresholds)
+
+    assert len(result["conflicts"]) == thresholds.size
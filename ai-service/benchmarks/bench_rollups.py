@@ -0,0 +1,52 @@
+from datetime import timedelta
+
+from app.services.amendment_impact import AmendmentImpact
+from app.services.detection import compute_discrepancies
+from app.services.feature_store import EmployeeFeatureStore
+from app.services.trends import compute_weekly_metrics
+from app.services.utilization import compute_utilization
+from benchmarks import data
+
+
+def bench_weekly_trend_metrics(benchmark, size):
+    records = data.conflict_records(size)
+
+    result = benchmark.pedantic(compute_weekly_metrics, (records,), rounds=3, warmup_rounds=1)
+
+    assert len(result) == 12
+
+
+def bench_utilization(benchmark, size):
+    reported, allocated = data.utilization_triples(size)
+
+    result = benchmark(compute_utilization, reported, allocated, 4.0)
+
+    assert result["summary"]["employees"] > 0
+
+
+def bench_amendment_impact_rollup(benchmark, size):
+    chunk, conflicts = data.amendment_inputs(size)
+
+    def run():
+        analysis = AmendmentImpact(2.0, 100)
+        analysis.add(chunk, conflicts)
+        return analysis.report()
+
+    report = benchmark(run)
+
+    assert report["summary"]["entry_changes"] == size
+
+
+def bench_feature_store_apply_period(benchmark, size):
+    """Fold the next week into a store that already knows every employee."""
+    result = compute_discrepancies(*data.source_hours(size), 2.0)
+    next_week = data.MONDAY + timedelta(weeks=1)
+
+    def warmed_store():
+        store = EmployeeFeatureStore()
+        store.apply_period(data.MONDAY, result, {})
+        return (store, next_week, result, {}), {}
+
+    applied = benchmark.pedantic(EmployeeFeatureStore.apply_period, setup=warmed_store, rounds=5)
+
+    assert applied
@@ -0,0 +1,28 @@
+from app.services.amendment_impact import classify
+from app.services.conflict_risk import build_features
+from app.services.reporter_behaviour import cluster_reporters
+from benchmarks import data
+
+
+def bench_cluster_reporters_kmeans(benchmark, size):
+    features = data.reporter_features(size)
+
+    result = benchmark.pedantic(cluster_reporters, (features, "kmeans"), rounds=3, warmup_rounds=1)
+
+    assert result["reporters"] == size
+
+
+def bench_conflict_risk_scoring(benchmark, size):
+    model, arguments = data.risk_inputs(size)
+
+    probabilities = benchmark(lambda: model.predict(build_features(*arguments)))
+
+    assert probabilities.size == size
+
+
+def bench_amendment_classify(benchmark, size):
+    chunk, conflicts = data.amendment_inputs(size)
+
+    result = benchmark(classify, chunk, conflicts, 2.0)
+
+    assert result["matched"].any()
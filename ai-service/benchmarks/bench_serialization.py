@@ -0,0 +1,36 @@
+import pytest
+
+from app.responses import JSON, MSGPACK, compress, encode
+from app.routers.conflicts import PersistConflictsRequest
+from benchmarks import data
+
+
+@pytest.mark.parametrize("media_type", [JSON, MSGPACK], ids=["json", "msgpack"])
+def bench_encode_rows(benchmark, size, media_type):
+    body = benchmark(encode, data.conflict_rows_payload(size), media_type)
+
+    assert len(body) > size
+
+
+@pytest.mark.parametrize("media_type", [JSON, MSGPACK], ids=["json", "msgpack"])
+def bench_encode_columns(benchmark, size, media_type):
+    body = benchmark(encode, data.columnar_payload(size), media_type)
+
+    assert len(body) > size
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "gzip"])
+def bench_compress(benchmark, size, encoding):
+    body = encode(data.conflict_rows_payload(size), JSON)
+
+    compressed = benchmark(compress, body, encoding)
+
+    assert len(compressed) < len(body)
+
+
+def bench_decode_persist_request(benchmark, size):
+    body = data.persist_request_body(size)
+
+    request = benchmark(PersistConflictsRequest.model_validate_json, body)
+
+    assert len(request.conflicts) == size
@@ -0,0 +1,40 @@
+"""
+Micro-benchmarks for the AI service's compute kernels (pytest-benchmark).
+
+Every benchmark takes a `size` parametrized over SIZES input rows (1k to 1M); inputs
+come from benchmarks.data with a fixed seed, so runs on one machine are comparable.
+Run from ai-service/ (the default `pytest` run does not collect these):
+
+    pytest benchmarks                                    # print timings
+    pytest benchmarks --benchmark-save=baseline          # store a baseline
+    pytest benchmarks --benchmark-compare='*_baseline' --benchmark-compare-fail=median:15%
+    pytest benchmarks --bench-max-size=100000 -k detection
+
+(`make bench-baseline` and `make bench` run the save and compare steps in the container.)
+Baselines are stored per machine under benchmarks/.baselines, which is not committed:
+timings only compare on the hardware that recorded them. The comparison picks the
+newest baseline of the current machine and the run fails when a benchmark's median
+regressed by more than the tolerance.
+"""
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def _size_id(size: int) -> str:
+    return f"{size // 1_000_000}m" if size >= 1_000_000 else f"{size // 1_000}k"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--bench-max-size",
+        type=int,
+        default=SIZES[-1],
+        help="Skip benchmark sizes above this many input rows",
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        limit = metafunc.config.getoption("bench_max_size")
+        sizes = [size for size in SIZES if size <= limit]
+        metafunc.parametrize("size", sizes, ids=[_size_id(size) for size in sizes])
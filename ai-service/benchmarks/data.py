@@ -0,0 +1,220 @@
+"""
+Seeded inputs for the benchmarks, shaped like what the loaders hand to each kernel.
+Cached per size so generation is not part of any measurement.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+import numpy as np
+import orjson
+
+from app.services.amendment_impact import ConflictIndex, DeltaChunk
+from app.services.conflict_risk import FEATURES, ConflictRiskModel
+from app.services.data_quality import EntryColumns
+from app.services.detection import SourceHours
+from app.services.reporter_behaviour import FEATURES as REPORTER_FEATURES
+from app.services.reporter_behaviour import ReporterFeatures
+from app.services.threshold_simulator import SimulationInput
+from app.services.utilization import Triples
+
+SEED = 0
+MONDAY = date(2026, 2, 2)
+
+
+def _rng(size: int) -> np.random.Generator:
+    return np.random.default_rng((SEED, size))
+
+
+def _hours(rng: np.random.Generator, n: int, high: float = 40.0) -> np.ndarray:
+    return np.round(rng.uniform(0, high, n), 2)
+
+
+@lru_cache(maxsize=None)
+def source_hours(size: int) -> tuple[SourceHours, SourceHours]:
+    """Per-employee totals of both sources; 90% of employees are in both."""
+    rng = _rng(size)
+    a_ids = np.arange(1, size + 1, dtype=np.int64)
+    b_ids = np.sort(rng.choice(np.arange(size // 10, size + size // 10, dtype=np.int64) + 1, size, replace=False))
+    return SourceHours(a_ids, _hours(rng, size)), SourceHours(b_ids, _hours(rng, size))
+
+
+@lru_cache(maxsize=None)
+def entry_columns(size: int) -> tuple[EntryColumns, EntryColumns]:
+    """`size` entry rows per source over size // 3 employees, with a few dirty rows."""
+    rng = _rng(size)
+    employees = max(1, size // 3)
+    start, end = MONDAY.toordinal(), MONDAY.toordinal() + 6
+
+    def source() -> EntryColumns:
+        hours = _hours(rng, size, 16)
+        hours[rng.random(size) < 0.001] = -1.0
+        return EntryColumns(
+            entry_ids=np.arange(1, size + 1, dtype=np.int64),
+            report_ids=rng.integers(1, max(2, size // 20), size),
+            employee_ids=rng.integers(1, employees + 1, size),
+            hours=hours,
+            period_start=np.full(size, start, dtype=np.int64),
+            period_end=np.full(size, end, dtype=np.int64),
+            deleted_employee=rng.random(size) < 0.001,
+        )
+
+    return source(), source()
+
+
+@lru_cache(maxsize=None)
+def simulation_input(size: int) -> SimulationInput:
+    rng = _rng(size)
+    return SimulationInput(
+        values=np.round(np.abs(rng.normal(0, 4, size)), 2),
+        departments=rng.integers(-1, 50, size),
+        resolved=rng.random(size) < 0.1,
+    )
+
+
+@lru_cache(maxsize=None)
+def reporter_features(size: int) -> ReporterFeatures:
+    rng = _rng(size)
+    matrix = np.column_stack(
+        [rng.normal(10, 3, size) for _ in REPORTER_FEATURES[:-1]] + [rng.normal(0, 0.5, size)]
+    ).astype(np.float64)
+    roles = np.where(rng.random(size) < 0.7, "project", "department").astype(object)
+    return ReporterFeatures(np.arange(1, size + 1, dtype=np.int64), roles, matrix)
+
+
+@lru_cache(maxsize=None)
+def risk_inputs(size: int) -> tuple[ConflictRiskModel, tuple]:
+    """A fixed model plus build_features() arguments for `size` draft entries."""
+    rng = _rng(size)
+    project = _hours(rng, size)
+    project[rng.random(size) < 0.3] = np.nan
+    department = _hours(rng, size)
+    department[rng.random(size) < 0.3] = np.nan
+    arguments = (
+        np.where(rng.random(size) < 0.5, "project", "department"),
+        _hours(rng, size, 10),
+        project,
+        department,
+        rng.uniform(0, 1, (size, 4)),
+    )
+    width = len(FEATURES)
+    model = ConflictRiskModel(np.zeros(width), np.ones(width), rng.normal(0, 0.3, width), -1.0, size, "2026-02-02")
+    return model, arguments
+
+
+@lru_cache(maxsize=None)
+def amendment_inputs(size: int) -> tuple[DeltaChunk, ConflictIndex]:
+    """`size` changed entries over 12 weeks, a quarter of them on an employee-period with a conflict."""
+    rng = _rng(size)
+    employees = max(4, size // 4)
+    periods = MONDAY.toordinal() - 7 * rng.integers(0, 12, size)
+    employee_ids = rng.integers(1, employees + 1, size)
+    old = _hours(rng, size)
+    amended_at = 1.77e9 + rng.uniform(0, 86400 * 84, size)
+    chunk = DeltaChunk(
+        source="project",
+        amendment_ids=np.sort(rng.integers(1, max(2, size // 3), size)),
+        report_ids=rng.integers(1, max(2, size // 20), size),
+        amended_by=rng.integers(1, 200, size),
+        amended_at=amended_at,
+        reasons=["correction"] * size,
+        period_ordinals=periods,
+        employee_ids=employee_ids,
+        old_hours=old,
+        new_hours=np.clip(old + np.round(rng.normal(0, 3, size), 2), 0, None),
+    )
+
+    chosen = rng.random(size) < 0.25
+    count = int(chosen.sum())
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    conflicts = ConflictIndex.from_records(
+        [
+            (e, date.fromordinal(p), d, "open", created + timedelta(seconds=s), None)
+            for e, p, d, s in zip(
+                employee_ids[chosen].tolist(),
+                periods[chosen].tolist(),
+                rng.normal(0, 5, count).tolist(),
+                rng.uniform(0, 86400 * 84, count).tolist(),
+            )
+        ]
+    )
+    return chunk, conflicts
+
+
+@lru_cache(maxsize=None)
+def conflict_records(size: int) -> list[tuple]:
+    """Rows of trends.CONFLICTS_SQL: period, department, discrepancy, created/resolved/escalated."""
+    rng = _rng(size)
+    base = datetime(2026, 1, 5, tzinfo=timezone.utc)
+    rows = []
+    for week, department, discrepancy, resolve_hours, escalated in zip(
+        rng.integers(0, 12, size).tolist(),
+        rng.integers(0, 30, size).tolist(),
+        np.round(rng.normal(0, 6, size), 2).tolist(),
+        rng.uniform(1, 200, size).tolist(),
+        (rng.random(size) < 0.1).tolist(),
+    ):
+        created = base + timedelta(weeks=week, hours=10)
+        rows.append(
+            (
+                (base + timedelta(weeks=week)).date(),
+                department or None,
+                discrepancy,
+                created,
+                created + timedelta(hours=resolve_hours) if resolve_hours < 150 else None,
+                created + timedelta(hours=48) if escalated else None,
+            )
+        )
+    return rows
+
+
+@lru_cache(maxsize=None)
+def utilization_triples(size: int) -> tuple[Triples, Triples]:
+    """`size` reported (employee, project, hours) entries and size // 4 allocations."""
+    rng = _rng(size)
+    employees, projects = max(2, size // 3), max(2, size // 30)
+    reported = Triples(rng.integers(1, employees + 1, size), rng.integers(1, projects + 1, size), _hours(rng, size))
+    allocations = max(1, size // 4)
+    allocated = Triples(
+        rng.integers(1, employees + 1, allocations), rng.integers(1, projects + 1, allocations), _hours(rng, allocations)
+    )
+    return reported, allocated
+
+
+@lru_cache(maxsize=None)
+def conflict_rows_payload(size: int) -> dict:
+    """A detection result as row dicts, the shape the persist / alert endpoints return."""
+    a, b = source_hours(size)
+    return {
+        "period_start": MONDAY,
+        "conflicts": [
+            {"employee_id": e, "source_a_hours": x, "source_b_hours": y, "discrepancy": round(x - y, 2)}
+            for e, x, y in zip(a.employee_ids.tolist(), a.hours.tolist(), b.hours.tolist())
+        ],
+    }
+
+
+@lru_cache(maxsize=None)
+def columnar_payload(size: int) -> dict:
+    """A detail result as NumPy columns, the shape utilization / threshold endpoints return."""
+    a, b = source_hours(size)
+    return {
+        "employee_ids": a.employee_ids,
+        "source_a_hours": a.hours,
+        "source_b_hours": b.hours,
+        "flagged": np.abs(a.hours - b.hours) > 2.0,
+    }
+
+
+@lru_cache(maxsize=None)
+def persist_request_body(size: int) -> bytes:
+    """A POST /api/ml/conflicts/persist body with `size` precomputed conflicts."""
+    payload = conflict_rows_payload(size)
+    return orjson.dumps(
+        {
+            "period_start": "2026-02-02",
+            "period_end": "2026-02-08",
+            "employees_checked": size,
+            "conflicts": payload["conflicts"],
+        }
+    )
@@ -0,0 +1,110 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.admission import BATCH, INTERACTIVE, AdmissionController, AdmissionMiddleware, EndpointGate, PriorityGate, Rejected
+
+
+def test_interactive_waiters_are_served_before_batch():
+    async def run():
+        gate = PriorityGate(capacity=1, batch_capacity=1, max_queue={INTERACTIVE: 10, BATCH: 10})
+        order = []
+        await gate.acquire(INTERACTIVE, 1)
+
+        async def waiter(priority):
+            await gate.acquire(priority, 1)
+            order.append(priority)
+            gate.release(priority, 0.01)
+
+        tasks = [asyncio.create_task(waiter(BATCH)), asyncio.create_task(waiter(INTERACTIVE))]
+        await asyncio.sleep(0)
+        gate.release(INTERACTIVE, 0.01)
+        await asyncio.gather(*tasks)
+        return order, gate.stats()
+
+    order, stats = asyncio.run(run())
+
+    assert order == [INTERACTIVE, BATCH]
+    assert stats[INTERACTIVE]["active"] == 0 and stats[BATCH]["active"] == 0
+
+
+def test_batch_is_capped_and_full_queue_is_rejected():
+    async def run():
+        gate = PriorityGate(capacity=4, batch_capacity=1, max_queue={INTERACTIVE: 10, BATCH: 1})
+        await gate.acquire(BATCH, 1)
+        waiting = asyncio.create_task(gate.acquire(BATCH, 1))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as rejected:
+            await gate.acquire(BATCH, 1)
+        await gate.acquire(INTERACTIVE, 1)  # interactive still has room
+        gate.release(BATCH, 0.01)
+        await waiting
+        return rejected.value, gate.stats()
+
+    rejected, stats = asyncio.run(run())
+
+    assert rejected.status_code == 503 and rejected.retry_after >= 1
+    assert stats[BATCH]["active"] == 1 and stats[INTERACTIVE]["active"] == 1
+
+
+def test_endpoint_gate_rejects_with_429_and_survives_timeouts():
+    async def run():
+        gate = EndpointGate(limit=1, max_queue=1)
+        await gate.acquire(1)
+        with pytest.raises(Rejected) as timed_out:
+            await gate.acquire(0.01)
+        waiting = asyncio.create_task(gate.acquire(1))
+        await asyncio.sleep(0)
+        with pytest.raises(Rejected) as full:
+            await gate.acquire(1)
+        gate.release(0.01)
+        await waiting
+        gate.release(0.01)
+        return timed_out.value.status_code, full.value.status_code, gate.stats()
+
+    timed_out, full, stats = asyncio.run(run())
+
+    assert (timed_out, full) == (503, 429)
+    assert stats["active"] == 0 and stats["queued"] == 0
+
+
+def test_middleware_keeps_interactive_requests_flowing_during_batch_jobs():
+    controller = AdmissionController(
+        max_concurrent=2,
+        batch_max_concurrent=1,
+        interactive_queue=10,
+        batch_queue=0,
+        interactive_timeout=1,
+        batch_timeout=1,
+        batch_endpoints=["POST /backfill"],
+        endpoint_limits={},
+        endpoint_queue=0,
+    )
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+
+    @app.post("/backfill")
+    async def backfill():
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            running = asyncio.create_task(client.post("/backfill"))
+            await asyncio.sleep(0.05)
+            second_batch = await client.post("/backfill")
+            interactive = await asyncio.gather(*(client.get(f"/items/{i}") for i in range(5)))
+            return (await running).status_code, second_batch, [r.status_code for r in interactive]
+
+    first, second, interactive = asyncio.run(run())
+
+    assert first == 200
+    assert second.status_code == 503 and int(second.headers["retry-after"]) >= 1
+    assert interactive == [200] * 5
+    assert controller.stats()["worker"][BATCH]["rejected"] == 1
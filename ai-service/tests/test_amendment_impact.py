@@ -0,0 +1,96 @@
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.amendment_impact import AmendmentImpact, ConflictIndex, DeltaChunk, classify, naive_utc
+
+PERIOD = date(2026, 2, 2)
+
+
+def ts(day: int) -> datetime:
+    return datetime(2026, 2, day, 12, tzinfo=timezone.utc)
+
+
+def chunk(source: str, rows: list[tuple]) -> DeltaChunk:
+    """rows: (amendment_id, amended_by, amended_day, employee_id, old_hours, new_hours)"""
+    return DeltaChunk.from_records(
+        source,
+        [
+            {
+                "amendment_id": a,
+                "report_id": 1,
+                "amended_by": by,
+                "amended_at": ts(day),
+                "reason": "fix",
+                "period_start": PERIOD,
+                "employee_id": e,
+                "old_hours": old,
+                "new_hours": new,
+            }
+            for a, by, day, e, old, new in rows
+        ],
+    )
+
+
+# (employee_id, period_start, discrepancy, status, created_at, resolved_at)
+CONFLICTS = ConflictIndex.from_records(
+    [
+        (1, PERIOD, 8.0, "open", ts(10), None),  # detected before the amendments below
+        (2, PERIOD, 6.0, "open", ts(20), None),  # detected after
+        (3, PERIOD, -5.0, "resolved", ts(10), ts(11)),
+    ]
+)
+
+
+def test_classify_created_resolved_and_silencing():
+    deltas = chunk(
+        "project",
+        [
+            (1, 50, 15, 1, 48.0, 40.0),  # closes employee 1's open +8h conflict exactly
+            (2, 50, 15, 2, 38.0, 44.0),  # pushes employee 2 from 0 to +6h -> creates it
+            (3, 51, 15, 3, 35.0, 40.0),  # resolves a conflict already resolved on day 11
+            (4, 51, 15, 4, 10.0, 12.0),  # no conflict on record
+        ],
+    )
+
+    result = classify(deltas, CONFLICTS, threshold=2.0)
+
+    assert result["matched"].tolist() == [True, True, True, False]
+    assert result["created"].tolist() == [False, True, False, False]
+    assert result["resolved"].tolist() == [True, False, True, False]
+    assert result["silencing"].tolist() == [True, False, False, False]
+    assert result["exact_match"].tolist() == [True, False, False, False]
+
+
+def test_department_amendments_flip_the_sign():
+    deltas = chunk("department", [(1, 60, 15, 1, 32.0, 40.0)])  # department side catches up
+
+    result = classify(deltas, CONFLICTS, threshold=2.0)
+
+    assert result["discrepancy_after"].tolist() == [0.0]
+    assert result["silencing"].tolist() == [True]
+
+
+def test_streamed_chunks_accumulate_and_cap_candidates():
+    analysis = AmendmentImpact(threshold=2.0, max_candidates=1)
+    analysis.add(chunk("project", [(1, 50, 15, 1, 48.0, 40.0), (2, 50, 15, 2, 38.0, 44.0)]), CONFLICTS)
+    analysis.add(chunk("project", [(2, 50, 15, 4, 10.0, 12.0), (3, 51, 15, 1, 48.0, 41.0)]), CONFLICTS)
+
+    report = analysis.report()
+
+    assert report["summary"]["amendments_with_hour_changes"] == 3
+    assert report["summary"]["entry_changes"] == 4
+    assert report["summary"]["created_conflicts"] == 1
+    assert report["summary"]["silencing_candidates"] == 2
+    assert len(report["silencing_candidates"]) == 1
+    assert report["silencing_candidates"][0]["exact_match"] is True
+    assert report["by_amender"][0]["user_id"] == 50
+    assert np.isclose(report["summary"]["hours_removed"], 15.0)
+
+
+def test_since_is_compared_as_naive_utc():
+    cet = timezone(timedelta(hours=1))
+
+    assert naive_utc(datetime(2026, 2, 1, 1, 30, tzinfo=cet)) == datetime(2026, 2, 1, 0, 30)
+    assert naive_utc(datetime(2026, 2, 1, tzinfo=timezone.utc)) == datetime(2026, 2, 1)
+    assert naive_utc(datetime(2026, 2, 1, 9)) == datetime(2026, 2, 1, 9)
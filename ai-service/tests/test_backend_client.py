@@ -0,0 +1,112 @@
+import asyncio
+import json
+from typing import Optional
+
+import httpx
+import pytest
+
+from app.backend_client import BackendClient, backoff_delay
+from app.config import settings
+
+
+def recording_client(statuses=(), keys: Optional[list] = None) -> tuple[BackendClient, list]:
+    """Client whose backend answers with `statuses` in turn (then 200) and records every request."""
+    requests = []
+    answers = iter(statuses)
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append((str(request.url).removeprefix(settings.backend_url), json.loads(request.content)))
+        if keys is not None:
+            keys.append(request.headers.get("Idempotency-Key"))
+        return httpx.Response(next(answers, 200), headers={"Retry-After": "0"})
+
+    return BackendClient(transport=httpx.MockTransport(handle)), requests
+
+
+def test_retryable_statuses_are_retried_and_500_is_not(monkeypatch):
+    monkeypatch.setattr(settings, "backend_backoff_seconds", 0.001)
+
+    async def run():
+        client, requests = recording_client([503, 429, 200, 500])
+        response = await client.post("/callbacks", {"n": 1})
+        attempts = len(requests)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post("/callbacks", {"n": 2})
+        await client.close()
+        return response.status_code, attempts, len(requests) - attempts
+
+    assert asyncio.run(run()) == (200, 3, 1)
+
+
+def test_retries_of_a_request_share_its_idempotency_key(monkeypatch):
+    monkeypatch.setattr(settings, "backend_backoff_seconds", 0.001)
+    keys = []
+
+    async def run():
+        client, _ = recording_client([502, 504, 200], keys)
+        await client.post("/callbacks", {"n": 1})
+        await client.post("/callbacks", {"n": 2})
+        await client.close()
+
+    asyncio.run(run())
+
+    assert len(keys) == 4 and keys[0] == keys[1] == keys[2] != keys[3]
+    assert all(keys)
+
+
+def test_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr(settings, "backend_backoff_seconds", 0.001)
+
+    async def run():
+        client, requests = recording_client([502] * 10)
+        with pytest.raises(httpx.HTTPStatusError):
+            await client.post("/callbacks", {})
+        await client.close()
+        return len(requests)
+
+    assert asyncio.run(run()) == settings.backend_max_retries
+
+
+def test_backoff_doubles_with_jitter_and_honours_retry_after():
+    base = settings.backend_backoff_seconds
+    for attempt in (1, 2, 3):
+        delay = backoff_delay(attempt)
+        assert base * 2 ** (attempt - 1) <= delay <= 1.5 * base * 2 ** (attempt - 1)
+    assert 30 <= backoff_delay(1, "30") <= 45
+    assert backoff_delay(1, "soon") <= 1.5 * base
+
+
+def test_enqueued_items_are_batched_per_path(monkeypatch):
+    monkeypatch.setattr(settings, "backend_flush_interval_seconds", 0.05)
+
+    async def run():
+        client, requests = recording_client()
+        client.start()
+        for i in range(5):
+            await client.enqueue("/conflicts", {"id": i})
+        await client.enqueue("/escalated", {"id": 9})
+        await asyncio.sleep(0.1)
+        await client.close()
+        return requests
+
+    requests = sorted(asyncio.run(run()))
+
+    assert requests == [
+        ("/conflicts", {"items": [{"id": i} for i in range(5)]}),
+        ("/escalated", {"items": [{"id": 9}]}),
+    ]
+
+
+def test_close_sends_the_batch_being_gathered(monkeypatch):
+    monkeypatch.setattr(settings, "backend_flush_interval_seconds", 10.0)
+
+    async def run():
+        client, requests = recording_client()
+        client.start()
+        for i in range(3):
+            await client.enqueue("/conflicts", {"id": i})
+        await asyncio.sleep(0.01)  # the flusher has taken the items off the queue
+        await client.close()
+        return requests
+
+    assert asyncio.run(run()) == [("/conflicts", {"items": [{"id": 0}, {"id": 1}, {"id": 2}]})]
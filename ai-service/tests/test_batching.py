@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from app.batching import MicroBatcher, in_thread
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_submissions_share_batches():
+    sizes = []
+
+    async def double(items):
+        sizes.append(len(items))
+        return [i * 2 for i in items]
+
+    async def main():
+        batcher = MicroBatcher("test", double, max_batch=4, max_wait_ms=50)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10))), batcher.stats()
+
+    results, stats = run(main())
+
+    assert results == [i * 2 for i in range(10)]
+    assert sizes == [4, 4, 2]
+    assert stats["batches"] == 3 and stats["items"] == 10
+
+
+def test_lone_submission_flushes_after_wait():
+    async def main():
+        batcher = MicroBatcher("test", in_thread(lambda items: [len(x) for x in items]), max_wait_ms=1)
+        return await batcher.submit("abc")
+
+    assert run(main()) == 3
+
+
+def test_batch_errors_reach_every_caller():
+    async def broken(items):
+        raise ValueError("model failed")
+
+    async def main():
+        batcher = MicroBatcher("test", broken)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        return results, batcher.failed_batches
+
+    results, failed = run(main())
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert failed == 1
+
+
+def test_result_count_mismatch_is_an_error():
+    async def short(items):
+        return items[:-1]
+
+    async def main():
+        return await MicroBatcher("test", short).submit(1)
+
+    with pytest.raises(RuntimeError):
+        run(main())
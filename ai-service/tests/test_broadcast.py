@@ -0,0 +1,74 @@
+import asyncio
+
+import orjson
+
+from app.broadcast import Broadcaster, sse_frame
+from app.services.change_feed import ChangeBatch, conflict_events_handler
+
+
+def parse(frame: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in frame.decode().strip().split("\n"))
+    return {"id": int(fields["id"]), "event": fields["event"], "data": orjson.loads(fields["data"])}
+
+
+def test_fan_out_respects_topics_and_replays_after_reconnect():
+    async def run():
+        broadcaster = Broadcaster(redis=None)
+        everything = broadcaster.subscribe(["conflicts", "analytics"])
+        conflicts_only = broadcaster.subscribe(["conflicts"])
+
+        await broadcaster.publish("conflicts", "conflict.created", {"id": 1})
+        await broadcaster.publish("analytics", "analytics.updated", {"kind": "utilization"})
+
+        first = parse(everything.queue.get_nowait())
+        resumed = broadcaster.subscribe(["conflicts", "analytics"], last_event_id=first["id"])
+        return everything.queue.qsize(), conflicts_only.queue.qsize(), [parse(f)["event"] for f in resumed.replay]
+
+    remaining, conflicts_only, replayed = asyncio.run(run())
+
+    assert remaining == 1
+    assert conflicts_only == 1
+    assert replayed == ["analytics.updated"]
+
+
+def test_slow_subscriber_is_disconnected():
+    async def run():
+        broadcaster = Broadcaster(redis=None, queue_size=3)
+        slow = broadcaster.subscribe(["conflicts"])
+        for i in range(5):
+            await broadcaster.publish("conflicts", "conflict.created", {"id": i})
+        return slow.queue.get_nowait(), broadcaster.stats()
+
+    frame, stats = asyncio.run(run())
+
+    assert frame is None  # end-of-stream marker
+    assert stats["subscribers"] == 0 and stats["dropped_subscribers"] == 1
+
+
+def test_change_feed_conflicts_become_events():
+    async def run():
+        broadcaster = Broadcaster(redis=None)
+        subscription = broadcaster.subscribe(["conflicts"])
+        batch = ChangeBatch()
+        period = {"reporting_period_start": "2024-03-04", "reporting_period_end": "2024-03-10"}
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "INSERT", "id": 1, "status": "open", **period})
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "UPDATE", "id": 1, "status": "open",
+                                       "changed": ["source_a_hours"], **period})
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "UPDATE", "id": 2, "status": "resolved",
+                                       "changed": ["status"], **period})
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "UPDATE", "id": 3, "status": "open",
+                                       "changed": ["discrepancy"], **period})
+        await conflict_events_handler(broadcaster)(batch)
+        frames = []
+        while not subscription.queue.empty():
+            frames.append(parse(subscription.queue.get_nowait()))
+        return frames
+
+    frames = asyncio.run(run())
+
+    assert [(f["event"], f["data"]["id"]) for f in frames] == [("conflict.created", 1), ("conflict.status_changed", 2)]
+    assert frames[1]["data"]["status"] == "resolved"
+
+
+def test_frame_format():
+    assert sse_frame(7, "conflict.created", {"id": 1}) == b'id: 7\nevent: conflict.created\ndata: {"id":1}\n\n'
@@ -0,0 +1,72 @@
+import asyncio
+import json
+from datetime import date
+
+from app.services.change_feed import ChangeBatch, ChangeFeed
+
+
+def notify(feed: ChangeFeed, channel: str, **payload) -> None:
+    feed._on_notification(None, 1, channel, json.dumps(payload))
+
+
+def test_batch_folds_events_by_kind():
+    batch = ChangeBatch()
+    batch.add("report_changes", {"table": "project_reports", "op": "UPDATE", "id": 7, "status": "submitted",
+                                 "reporting_period_start": "2024-03-04", "reporting_period_end": "2024-03-10"})
+    batch.add("entry_changes", {"table": "department_report_entries", "op": "INSERT", "department_report_id": 9, "employee_id": 3})
+    batch.add("entry_changes", {"table": "department_report_entries", "op": "INSERT", "department_report_id": 9, "employee_id": 4})
+    batch.add("conflict_changes", {"table": "conflict_alerts", "op": "INSERT", "id": 1, "employee_id": 3, "status": "open",
+                                   "reporting_period_start": "2024-03-04", "reporting_period_end": "2024-03-10"})
+    batch.add("conflict_changes", {"table": "conflict_alerts", "op": "UPDATE", "id": 1, "employee_id": 3, "status": "resolved",
+                                   "reporting_period_start": "2024-03-04", "reporting_period_end": "2024-03-10"})
+    batch.add("validation_changes", {"table": "validation_runs", "op": "UPDATE", "id": 2, "status": "completed",
+                                     "reporting_period_start": "2024-03-04", "reporting_period_end": "2024-03-10"})
+
+    assert batch.events == 6
+    assert batch.reports == {("project", 7), ("department", 9)}
+    assert batch.employee_ids == {3, 4}
+    assert batch.conflicts[1]["status"] == "resolved"
+    assert batch.conflict_periods == {date(2024, 3, 4)}
+    assert batch.completed_runs == {(date(2024, 3, 4), date(2024, 3, 10))}
+
+
+def test_notifications_are_debounced_into_one_dispatch():
+    async def run():
+        feed = ChangeFeed(pool=None, debounce_ms=20, max_events=1000)
+        batches = []
+
+        async def handler(batch):
+            batches.append(batch)
+
+        feed.subscribe("test", handler)
+        for i in range(50):
+            notify(feed, "conflict_changes", table="conflict_alerts", op="INSERT", id=i, employee_id=i)
+        await asyncio.sleep(0.06)
+        return feed, batches
+
+    feed, batches = asyncio.run(run())
+
+    assert len(batches) == 1 and len(batches[0].conflicts) == 50
+    assert feed.stats()["batches"] == 1 and feed.stats()["pending"] == 0
+
+
+def test_max_events_flushes_early_and_handler_errors_are_isolated():
+    async def run():
+        feed = ChangeFeed(pool=None, debounce_ms=10_000, max_events=10)
+        seen = []
+
+        async def broken(batch):
+            raise RuntimeError("boom")
+
+        async def handler(batch):
+            seen.append(batch.events)
+
+        feed.subscribe("broken", broken)
+        feed.subscribe("ok", handler)
+        for i in range(25):
+            notify(feed, "entry_changes", table="project_report_entries", op="INSERT", project_report_id=1, employee_id=i)
+        await asyncio.sleep(0)
+        await feed.stop()  # flushes the remaining 5
+        return seen
+
+    assert asyncio.run(run()) == [10, 10, 5]
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.config import settings
+from app.services.conflict_risk import (
+    FEATURES,
+    ConflictRiskModel,
+    ConflictRiskScorer,
+    ScoreRequest,
+    build_features,
+    fit_model,
+    model_path,
+    training_set,
+)
+from app.services.feature_store import EmployeeFeatureStore
+
+
+def test_build_features_adds_entry_to_its_own_side():
+    features = build_features(
+        np.array(["project", "department"]),
+        np.array([10.0, 40.0]),
+        np.array([30.0, 45.0]),
+        np.array([np.nan, np.nan]),
+        np.zeros((2, 4)),
+    )
+    row = dict(zip(FEATURES, features[0]))
+    assert (row["project_hours"], row["has_department"], row["abs_partial_discrepancy"]) == (40.0, 0.0, 0.0)
+    row = dict(zip(FEATURES, features[1]))
+    assert (row["department_hours"], row["abs_partial_discrepancy"]) == (40.0, 5.0)
+
+
+def test_trained_model_ranks_large_discrepancies_higher(tmp_path):
+    rng = np.random.default_rng(1)
+    records = []
+    for employee_id in range(400):
+        project = float(rng.normal(40, 2))
+        department = project + float(rng.choice([0.0, 0.5, 8.0, -9.0]))
+        records.append((employee_id, date(2026, 1, 5), project, department, abs(project - department) > 2.0))
+
+    features, labels = training_set(records)
+    model = fit_model(features, labels)
+    model.save(tmp_path / "model.npz")
+    model = ConflictRiskModel.load(tmp_path / "model.npz")
+
+    candidates = build_features(
+        np.array(["project", "project"]),
+        np.array([40.0, 40.0]),
+        np.array([np.nan, np.nan]),
+        np.array([40.5, 52.0]),
+        np.zeros((2, 4)),
+    )
+    low, high = model.predict(candidates)
+    assert high > 0.5 > low
+
+
+class FixedScorer(ConflictRiskScorer):
+    async def score_batch(self, items):
+        return np.array([item.hours / 100 for item in items])
+
+
+def test_concurrent_scores_are_micro_batched():
+    async def main():
+        scorer = FixedScorer(None, None, EmployeeFeatureStore)
+        requests = [ScoreRequest(i, date(2026, 1, 5), "project", float(i)) for i in range(10)]
+        results = await asyncio.gather(*(scorer.score(r) for r in requests))
+        return scorer.batcher.batches, results
+
+    batches, results = asyncio.run(main())
+
+    assert batches == 1
+    assert results == [i / 100 for i in range(10)]
+
+
+def test_history_features_only_see_earlier_periods():
+    weeks = [date(2026, 1, 5) + timedelta(weeks=i) for i in range(3)]
+    # Employee 1 is a conflict every week, employee 2 never
+    records = [(e, week, 40.0, 50.0 if e == 1 else 40.0, e == 1) for week in weeks for e in (1, 2)]
+
+    features, labels = training_set(records, {weeks[0]: {2: 1}})
+    rate = features[:, FEATURES.index("conflict_rate")]
+    streak = features[:, FEATURES.index("current_streak")]
+    amendments = features[:, FEATURES.index("amendment_rate")]
+
+    assert rate.tolist() == [0.0, 0.0, 1.0, 0.0, 1.0, 0.0]  # the first week has no history at all
+    assert streak.tolist() == [0.0, 0.0, 1.0, 0.0, 2.0, 0.0]
+    assert amendments.tolist() == [0.0, 0.0, 0.0, 1.0, 0.0, 0.5]
+
+
+def test_workers_pick_up_a_model_trained_elsewhere(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "model_path", str(tmp_path))
+    scorer = ConflictRiskScorer(None, None, EmployeeFeatureStore)
+    assert scorer.current_model() is None
+
+    zeros = np.zeros(len(FEATURES))
+    ConflictRiskModel(zeros, zeros + 1, zeros, 0.0, 10, "2026-02-01T00:00:00+00:00").save(model_path())
+    assert scorer.current_model().samples == 10
+
+    # Another worker retrains; its file is newer than the one this worker loaded
+    ConflictRiskModel(zeros, zeros + 1, zeros, 0.0, 20, "2026-02-02T00:00:00+00:00").save(model_path())
+    stat = model_path().stat()
+    os.utime(model_path(), ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert scorer.current_model().samples == 20
@@ -0,0 +1,25 @@
+from datetime import date
+
+import pytest
+from pydantic import ValidationError
+
+from app.routers.conflicts import PersistConflictsRequest
+
+
+def body(*employee_ids: int) -> dict:
+    return {
+        "period_start": date(2026, 3, 2),
+        "period_end": date(2026, 3, 8),
+        "conflicts": [
+            {"employee_id": e, "source_a_hours": 45.0, "source_b_hours": 40.0, "discrepancy": 5.0}
+            for e in employee_ids
+        ],
+    }
+
+
+def test_duplicate_employee_ids_are_rejected():
+    with pytest.raises(ValidationError, match=r"duplicate employee_id in conflicts: \[7, 9\]"):
+        PersistConflictsRequest(**body(7, 8, 9, 7, 9))
+
+    assert len(PersistConflictsRequest(**body(7, 8, 9)).conflicts) == 3
+    assert PersistConflictsRequest(period_start=date(2026, 3, 2), period_end=date(2026, 3, 8)).conflicts is None
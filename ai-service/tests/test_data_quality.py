@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services.data_quality import EntryColumns, validate
+from app.services.detection import compute_discrepancies
+
+MONDAY = date(2024, 3, 4)
+SUNDAY = MONDAY + timedelta(days=6)
+
+
+def entries(rows) -> EntryColumns:
+    """rows: (entry_id, report_id, employee_id, hours[, start, end, deleted])"""
+    defaults = (MONDAY, SUNDAY, False)
+    return EntryColumns.from_records([(*r, *defaults[len(r) - 4 :]) for r in rows])
+
+
+def test_checks_mark_and_exclude_rows():
+    project = entries(
+        [
+            (1, 10, 100, 40.0),
+            (2, 10, 100, 5.0),  # duplicate of (10, 100): excluded
+            (3, 10, 101, 200.0),  # > 168: excluded
+            (4, 11, 102, 8.0, MONDAY, SUNDAY, True),  # soft-deleted user: excluded
+            (5, 12, 103, 8.0, MONDAY - timedelta(days=7), SUNDAY),  # report starts before window
+        ]
+    )
+    department = entries([(1, 20, 100, 40.0), (2, 21, 104, 10.0, MONDAY + timedelta(days=1), SUNDAY)])
+
+    a, b, report = validate(project, department, MONDAY, SUNDAY)
+
+    checks = report.sources["project"].checks
+    assert checks["duplicate_entry"].tolist() == [False, True, False, False, False]
+    assert checks["hours_out_of_range"].tolist() == [False, False, True, False, False]
+    assert checks["deleted_employee"].tolist() == [False, False, False, True, False]
+    assert checks["report_outside_period"].tolist() == [False, False, False, False, True]
+    assert report.sources["project"].excluded_entry_ids(project) == [2, 3, 4, 5]
+    assert report.sources["department"].checks["misaligned_period"].tolist() == [False, True]
+
+    # Only employee 100 survives in the project source; misaligned rows are reported only
+    assert a.employee_ids.tolist() == [100] and a.hours.tolist() == [40.0]
+    assert b.employee_ids.tolist() == [100, 104]
+    assert report.employee_checks["missing_from_source_a"].tolist() == [104]
+    assert report.summary()["sources"]["project"]["excluded"] == 4
+
+    result = compute_discrepancies(a, b, threshold=2.0)
+    assert result.conflict_records() == [(104, 0.0, 10.0, -10.0)]
+
+
+def test_clean_data_matches_sql_aggregation():
+    rng = np.random.default_rng(5)
+    n = 100_000
+    rows = [
+        (i, r, e, h, MONDAY, SUNDAY, False)
+        for i, (r, e, h) in enumerate(
+            zip(np.arange(n) // 4, rng.permutation(n), np.round(rng.uniform(0, 40, n), 2)), start=1
+        )
+    ]
+    project = EntryColumns.from_records(rows)
+    department = EntryColumns.from_records(rows[: n // 2])
+
+    a, b, report = validate(project, department, MONDAY, SUNDAY)
+
+    assert not report.sources["project"].excluded.any()
+    assert a.employee_ids.size == n and b.employee_ids.size == n // 2
+    assert report.employee_checks["missing_from_source_b"].size == n - n // 2
@@ -0,0 +1,37 @@
+import numpy as np
+
+from app.services.detection import SourceHours, compute_discrepancies
+
+
+def test_missing_source_counts_as_zero_hours():
+    source_a = SourceHours.from_records([(1, 40.0), (2, 38.0)])
+    source_b = SourceHours.from_records([(2, 38.0), (3, 10.0)])
+
+    result = compute_discrepancies(source_a, source_b, threshold=2.0)
+
+    assert result.employee_ids.tolist() == [1, 2, 3]
+    assert result.source_a_hours.tolist() == [40.0, 38.0, 0.0]
+    assert result.source_b_hours.tolist() == [0.0, 38.0, 10.0]
+    assert result.discrepancy.tolist() == [40.0, 0.0, -10.0]
+    assert result.conflict_records() == [(1, 40.0, 0.0, 40.0), (3, 0.0, 10.0, -10.0)]
+
+
+def test_threshold_is_strictly_greater_than():
+    source_a = SourceHours.from_records([(1, 42.0), (2, 42.5)])
+    source_b = SourceHours.from_records([(1, 40.0), (2, 40.0)])
+
+    result = compute_discrepancies(source_a, source_b, threshold=2.0)
+
+    assert result.flagged.tolist() == [False, True]
+    assert result.employees_checked == 2
+    assert result.conflicts_found == 1
+
+
+def test_empty_sources():
+    empty = SourceHours.from_records([])
+
+    result = compute_discrepancies(empty, empty, threshold=2.0)
+
+    assert result.employees_checked == 0
+    assert result.conflict_records() == []
+    assert result.employee_ids.dtype == np.int64
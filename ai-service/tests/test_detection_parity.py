@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from app.services.detection import SourceHours
+from tools import schema_drift
+from tools.detection_parity import (
+    PHP_SERVICE,
+    format_report,
+    generate,
+    php_column_findings,
+    php_run_detection,
+    python_outcome,
+    run,
+    run_memory,
+)
+
+
+def test_python_paths_match_run_detection_row_by_row():
+    report = run([300, 3000], seed=11, threshold=2.0)
+
+    assert report["ok"]
+    for r in report["runs"]:
+        assert r["conflicts_found"] > 0
+        assert all(d["mismatched"] == 0 and d["employees_checked"][0] == d["employees_checked"][1]
+                   for d in r["diff"].values())
+
+
+def test_threshold_boundary_follows_php_float_semantics():
+    # 10.50 - 8.50 is exactly 2.0 (not flagged); 4.03 - 2.03 is 2.0000000000000004 in
+    # float arithmetic, which runDetection flags, so the Python side must flag it too
+    source_a = [(1, "10.50"), (2, "4.03"), (3, "10.30"), (4, "2.01")]
+    source_b = [(1, "8.50"), (2, "2.03"), (3, "8.29"), (5, "2.00")]
+    php = php_run_detection(source_a, source_b, 2.0)
+    python = python_outcome(
+        SourceHours(np.array([e for e, _ in source_a]), np.array([float(h) for _, h in source_a])),
+        SourceHours(np.array([e for e, _ in source_b]), np.array([float(h) for _, h in source_b])),
+        2.0,
+    )
+
+    assert {e: row[3] for e, row in php.rows.items()} == {1: False, 2: True, 3: True, 4: True, 5: False}
+    assert python.rows == php.rows and python.employees_checked == 5
+
+
+def test_generated_data_exercises_the_boundary_and_one_sided_employees():
+    outcome = run_memory(generate(3, 2000), threshold=2.0)["port"]
+    rows = outcome.rows.values()
+
+    assert any(abs(d) == 2.0 and not flagged for _, _, d, flagged in rows)
+    assert any(a == 0 < b for a, b, _, _ in rows) and any(b == 0 < a for a, b, _, _ in rows)
+
+
+def test_report_labels_the_port_timing_as_the_port():
+    report = run([300], seed=5, threshold=2.0)
+    text = format_report(report)
+
+    assert set(report["runs"][0]["read_ms"]) == {"port", "python", "validated"}
+    assert "speedup_vs_port" in report["runs"][0]
+    assert "port ms" in text and "php ms" not in text and "PHP service is not executed" in text
+
+def test_php_service_column_references_are_reported():
+    # The backend tree is not there in the ai-service container (only ./ai-service is mounted)
+    if not PHP_SERVICE.exists() or not schema_drift.DEFAULT_MIGRATIONS.is_dir():
+        pytest.skip("backend sources not available")
+    findings = php_column_findings()
+
+    assert "project_reports.period_start" in findings
+    assert "department_report_entries.hours_allocated" in findings
+    assert "project_reports.reporting_period_start" not in findings
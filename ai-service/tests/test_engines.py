@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from app import engines
+from app.config import settings
+
+
+def counting_engine(name: str, value=None, error: Exception = None) -> tuple[engines.Engine, list]:
+    calls = []
+
+    def loader():
+        calls.append(threading.get_ident())
+        if error is not None:
+            raise error
+        return value
+
+    return engines.Engine(name, loader), calls
+
+
+def test_engine_loads_once_and_reports_its_state():
+    engine, calls = counting_engine("fake", value=object())
+    assert engine.status() == {"state": "cold", "load_ms": None, "error": None}
+
+    first = engine.load()
+
+    assert engine.load() is first and len(calls) == 1
+    assert engine.state == "warm" and engine.load_ms is not None and engine.error is None
+
+
+def test_failed_load_is_reported_and_retried():
+    engine, calls = counting_engine("broken", error=ImportError("no module named broken"))
+
+    with pytest.raises(ImportError):
+        engine.load()
+    assert engine.status() == {"state": "failed", "load_ms": None, "error": "no module named broken"}
+
+    engine._loader = lambda: "loaded"
+    assert engine.load() == "loaded"
+    assert engine.state == "warm" and engine.error is None
+
+
+def test_prewarm_skips_unknown_and_failing_engines_off_the_loop(monkeypatch):
+    good, good_calls = counting_engine("good", value=1)
+    bad, _ = counting_engine("bad", error=RuntimeError("model download failed"))
+    monkeypatch.setitem(engines.ENGINES, "good", good)
+    monkeypatch.setitem(engines.ENGINES, "bad", bad)
+    monkeypatch.setattr(settings, "prewarm_engines", " bad, missing ,good,")
+
+    names = engines.prewarm_names()
+    asyncio.run(engines.prewarm(names))
+    status = engines.status()
+
+    assert names == ["bad", "missing", "good"]
+    assert status["good"]["state"] == "warm" and status["bad"]["state"] == "failed"
+    assert good_calls and good_calls[0] != threading.get_ident()
+    assert "missing" not in status
@@ -0,0 +1,132 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.config import settings
+from app.services.change_feed import ChangeBatch, escalation_handler
+from app.services.escalation import EscalationScheduler, HeapDueQueue, due_at
+
+
+class Pool:
+    """Answers conflict_alerts queries from a dict of id -> (status, created_at)."""
+
+    def __init__(self, conflicts: dict[int, tuple[str, datetime]]) -> None:
+        self.conflicts = conflicts
+        self.failures = 0
+        self.refused: set[int] = set()  # open but not yet due by the database's clock
+        self.escalated: list[list[int]] = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, sql: str, *args):
+        if "UPDATE" in sql:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("pool exhausted")
+            ids = [i for i in args[0] if self.conflicts[i][0] == "open" and i not in self.refused]
+            self.escalated.append(ids)
+            return [{"id": i, "employee_id": i, "created_at": self.conflicts[i][1]} for i in ids]
+        ids = args[0] if args else list(self.conflicts)
+        return [{"id": i, "created_at": self.conflicts[i][1]} for i in ids if self.conflicts[i][0] == "open"]
+
+
+def days_ago(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def test_heap_queue_pops_due_entries_in_deadline_order():
+    async def run():
+        queue = HeapDueQueue()
+        await queue.schedule([(1, 30.0), (2, 10.0), (3, 20.0), (4, 99.0)])
+        await queue.schedule([(3, 5.0)])  # rescheduling replaces the deadline
+        await queue.unschedule([2])
+        return await queue.pop_due(25.0, 10), await queue.size(), await queue.next_due()
+
+    popped, size, next_due = asyncio.run(run())
+
+    assert popped == [(3, 5.0)]
+    assert size == 2 and next_due == 30.0
+
+
+def test_pop_respects_the_batch_limit():
+    async def run():
+        queue = HeapDueQueue()
+        await queue.schedule((i, float(i)) for i in range(10))
+        return await queue.pop_due(100.0, 4), await queue.size()
+
+    popped, size = asyncio.run(run())
+
+    assert [conflict_id for conflict_id, _ in popped] == [0, 1, 2, 3]
+    assert size == 6
+
+
+def test_failed_update_puts_the_batch_back():
+    pool = Pool({1: ("open", days_ago(settings.escalation_days + 1)), 2: ("open", days_ago(1))})
+    scheduler = EscalationScheduler(pool, HeapDueQueue())
+
+    async def run():
+        await scheduler.seed()
+        pool.failures = 1
+        with pytest.raises(ConnectionError):
+            await scheduler.process_due()
+        assert await scheduler.queue.size() == 2
+        assert await scheduler.process_due() == 1
+        return await scheduler.queue.size(), await scheduler.queue.next_due()
+
+    size, next_due = asyncio.run(run())
+
+    assert pool.escalated == [[1]]
+    assert size == 1 and next_due == due_at(pool.conflicts[2][1])
+
+
+def test_change_feed_schedules_new_and_drops_closed_conflicts():
+    overdue = days_ago(settings.escalation_days + 1)
+    pool = Pool({1: ("open", overdue), 2: ("open", overdue), 3: ("resolved", overdue)})
+    scheduler = EscalationScheduler(pool, HeapDueQueue())
+    handle = escalation_handler(scheduler)
+
+    async def run():
+        await scheduler.seed()  # 1 and 2
+        pool.conflicts[4] = ("open", overdue)  # created by runDetection after startup
+        pool.conflicts[2] = ("resolved", overdue)
+        batch = ChangeBatch()
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "INSERT", "id": 4, "status": "open"})
+        batch.add("conflict_changes", {"table": "conflict_alerts", "op": "UPDATE", "id": 2, "status": "resolved",
+                                       "changed": ["status"]})
+        await handle(batch)
+        queued = await scheduler.queue.size()
+
+        pool.conflicts[5] = ("open", overdue)  # missed while the listener reconnected
+        await handle(ChangeBatch(resync=True))
+        return queued, await scheduler.process_due()
+
+    queued, escalated = asyncio.run(run())
+
+    assert queued == 2
+    assert escalated == 3 and sorted(pool.escalated[0]) == [1, 4, 5]
+
+
+def test_conflicts_the_database_refuses_stay_queued():
+    overdue = days_ago(settings.escalation_days + 1)
+    pool = Pool({1: ("open", overdue), 2: ("open", overdue), 3: ("resolved", overdue)})
+    scheduler = EscalationScheduler(pool, HeapDueQueue())
+
+    async def run():
+        await scheduler.queue.schedule([(1, due_at(overdue)), (2, due_at(overdue)), (3, due_at(overdue))])
+        pool.refused = {2, 3}
+        started = datetime.now(timezone.utc).timestamp()
+        assert await scheduler.process_due() == 1
+        size, next_due = await scheduler.queue.size(), await scheduler.queue.next_due()
+
+        pool.refused.clear()
+        await scheduler.queue.schedule([(2, started)])  # the next tick
+        return started, size, next_due, await scheduler.process_due()
+
+    started, size, next_due, escalated = asyncio.run(run())
+
+    assert size == 1 and next_due >= started + settings.escalation_poll_seconds
+    assert escalated == 1 and pool.escalated[-1] == [2]
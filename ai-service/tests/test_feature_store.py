@@ -0,0 +1,129 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+
+from app.config import settings
+from app.services import feature_store
+from app.services.detection import SourceHours, compute_discrepancies
+from app.services.feature_store import EmployeeFeatureStore
+from app.singleflight import SingleFlight
+
+
+def period(rows_a, rows_b):
+    return compute_discrepancies(SourceHours.from_records(rows_a), SourceHours.from_records(rows_b), threshold=2.0)
+
+
+def test_incremental_updates_track_streaks_and_rates():
+    store = EmployeeFeatureStore(capacity=2, alpha=0.5)
+    store.apply_period(date(2026, 1, 5), period([(1, 45.0), (2, 40.0)], [(1, 40.0), (2, 40.0)]), {1: 2})
+    store.apply_period(date(2026, 1, 12), period([(1, 44.0), (3, 8.0)], [(1, 40.0)]), {})
+
+    features = store.features([1, 2, 3, 99])
+
+    assert features[99] is None
+    assert features[1]["periods_seen"] == 2
+    assert features[1]["conflict_count"] == 2
+    assert features[1]["current_streak"] == 2
+    assert features[1]["ewma_discrepancy"] == 4.5
+    assert features[1]["amendment_rate"] == 1.0
+    assert features[2]["current_streak"] == 0
+    assert features[3]["last_period"] == "2026-01-12"
+    assert store.size == 3
+
+
+def test_older_period_is_skipped():
+    store = EmployeeFeatureStore()
+    assert store.apply_period(date(2026, 1, 12), period([(1, 45.0)], [(1, 40.0)]), {})
+    assert not store.apply_period(date(2026, 1, 5), period([(1, 45.0)], [(1, 40.0)]), {})
+    assert store.features([1])[1]["periods_seen"] == 1
+
+
+def test_snapshot_round_trip(tmp_path):
+    store = EmployeeFeatureStore()
+    store.apply_period(date(2026, 1, 5), period([(7, 50.0)], [(7, 40.0)]), {7: 1})
+    path = tmp_path / "features.npz"
+    store.save(path)
+
+    loaded = EmployeeFeatureStore.load(path)
+
+    assert loaded.features([7]) == store.features([7])
+    assert loaded.latest_period == store.latest_period
+    assert not loaded.snapshot_changed(path)
+
+
+class Pool:
+    """Answers the amendments query with a fixed employee -> count mapping."""
+
+    def __init__(self, amendments: dict[int, int]) -> None:
+        self.amendments = amendments
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, sql: str, *args):
+        return [{"employee_id": e, "amendments": n} for e, n in self.amendments.items()]
+
+
+def test_workers_pick_up_each_others_updates(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "model_path", str(tmp_path))
+    thresholds = []
+
+    async def detect(conn, period_start, period_end, threshold):
+        thresholds.append(threshold)
+        return period([(1, 45.0), (2, 41.0)], [(1, 40.0), (2, 40.0)])
+
+    monkeypatch.setattr(feature_store, "detect_period", detect)
+    worker_a = SimpleNamespace(feature_store=EmployeeFeatureStore())
+    worker_b = SimpleNamespace(feature_store=EmployeeFeatureStore())
+
+    applied = asyncio.run(feature_store.update_from_period(
+        feature_store.current(worker_a), Pool({1: 1}), date(2026, 1, 5), date(2026, 1, 11), threshold=0.5
+    ))
+    store = feature_store.current(worker_b)
+
+    assert applied and thresholds == [0.5]
+    assert store is worker_b.feature_store and store.size == 2
+    assert store.features([1])[1]["conflict_count"] == 1
+    assert store.features([1])[1]["amendment_count"] == 1
+    assert feature_store.current(worker_b) is store
+
+
+def test_concurrent_saves_never_share_a_temp_file(tmp_path):
+    store = EmployeeFeatureStore()
+    store.apply_period(date(2026, 1, 5), period([(7, 50.0)], [(7, 40.0)]), {})
+    path = tmp_path / "features.npz"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.save(path), range(32)))
+
+    assert EmployeeFeatureStore.load(path).features([7]) == store.features([7])
+    assert [p.name for p in tmp_path.iterdir()] == ["features.npz"]
+
+
+def test_a_period_is_applied_once_for_concurrent_updates(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "model_path", str(tmp_path))
+    detections = []
+
+    async def detect(conn, period_start, period_end, threshold):
+        detections.append(period_start)
+        await asyncio.sleep(0.01)
+        return period([(1, 45.0)], [(1, 40.0)])
+
+    monkeypatch.setattr(feature_store, "detect_period", detect)
+    state = SimpleNamespace(feature_store=EmployeeFeatureStore())
+    flight = SingleFlight(None, "test")
+
+    def update():
+        return feature_store.update_period_once(
+            flight, lambda: feature_store.current(state), Pool({}), date(2026, 1, 5), date(2026, 1, 11)
+        )
+
+    async def run():
+        return await asyncio.gather(update(), update())
+
+    assert asyncio.run(run()) == [True, True]
+    assert detections == [date(2026, 1, 5)]
+    assert feature_store.current(state).features([1])[1]["periods_seen"] == 1
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, Response
+from prometheus_client import generate_latest
+
+from app import memory
+from app.routers import memory as memory_admin
+
+retained = []
+
+
+def profiled_app() -> tuple[FastAPI, memory.MemoryProfiler]:
+    profiler = memory.MemoryProfiler(frames=5, max_snapshots=2)
+    app = FastAPI()
+    app.state.memory_profiler = profiler
+    app.add_middleware(memory.MemoryProfilingMiddleware, profiler=profiler)
+    app.include_router(memory_admin.router)
+
+    @app.get("/reports/{report_id}")
+    async def report(report_id: int):
+        scratch = [bytes(1024) for _ in range(8 * 1024)]  # ~8.5 MB, freed before returning
+        return {"id": report_id, "blocks": len(scratch)}
+
+    @app.post("/retain")
+    async def retain():
+        retained.append([bytes(512) for _ in range(4 * 1024)])
+        return Response(status_code=204)
+
+    return app, profiler
+
+
+def run(app: FastAPI, calls):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return [await call(client) for call in calls]
+
+    return asyncio.run(go())
+
+
+def test_per_endpoint_peak_is_recorded():
+    app, profiler = profiled_app()
+    profiler.start()
+    try:
+        responses = run(app, [lambda c: c.get("/reports/1"), lambda c: c.get("/reports/2"),
+                              lambda c: c.get("/api/ml/admin/memory")])
+    finally:
+        profiler.stop()
+
+    stats = responses[-1].json()["profiling"]["endpoints"]["GET /reports/{report_id}"]
+    assert stats["requests"] == 2 and stats["overlapped"] == 0
+    assert stats["max_peak_bytes"] > 8 * 1024 * 1024
+    assert responses[-1].json()["rss_bytes"] > 0
+
+
+def test_snapshot_diff_points_at_the_retaining_line():
+    app, profiler = profiled_app()
+    profiler.start()
+    try:
+        stored, _, diff, top = run(
+            app,
+            [
+                lambda c: c.post("/api/ml/admin/memory/snapshots", params={"label": "before"}),
+                lambda c: c.post("/retain"),
+                lambda c: c.get("/api/ml/admin/memory/diff", params={"limit": 3}),
+                lambda c: c.get("/api/ml/admin/memory/top", params={"limit": 5, "group_by": "filename"}),
+            ],
+        )
+    finally:
+        profiler.stop()
+        retained.clear()
+
+    assert stored.json()["label"] == "before"
+    growth = diff.json()["sites"][0]
+    assert growth["site"].startswith(__file__) and growth["size_diff_bytes"] > 2 * 1024 * 1024
+    assert top.json()["sites"][0]["size_bytes"] > 0
+
+
+def test_admin_endpoints_need_profiling_and_metrics_are_exported():
+    app, _ = profiled_app()
+
+    top, diff = run(app, [lambda c: c.get("/api/ml/admin/memory/top"), lambda c: c.get("/api/ml/admin/memory/diff")])
+    exposition = generate_latest().decode()
+
+    assert top.status_code == diff.status_code == 503
+    assert "ai_process_rss_bytes" in exposition
+    assert 'ai_gc_collections_total{generation="0"}' in exposition
@@ -0,0 +1,50 @@
+from tools.perf_log_report import aggregate, build_report, diff_reports, normalize_path, parse_line
+
+
+def perf_line(path: str, duration: float, queries: int, ts: str = "2026-02-03 10:15:02") -> str:
+    return (
+        f"[{ts}] local.INFO: [PERF] GET {path} "
+        f'{{"duration_ms":{duration},"memory_mb":1.5,"query_count":{queries},'
+        f'"query_time_ms":2.0,"non_query_time_ms":{duration - 2.0}}} \n'
+    )
+
+
+def test_normalize_path_collapses_ids():
+    assert normalize_path("api/v1/conflicts/42/resolve") == "/api/v1/conflicts/{id}/resolve"
+    assert normalize_path("api/v1/conflicts?page=2") == "/api/v1/conflicts"
+
+
+def test_parse_line_reads_context():
+    record = parse_line(perf_line("api/v1/project-reports/7/entries", 31.5, 4))
+
+    assert record.method == "GET"
+    assert record.route == "/api/v1/project-reports/{id}/entries"
+    assert record.duration_ms == 31.5
+    assert record.query_count == 4
+
+
+def test_parse_line_ignores_other_log_lines():
+    assert parse_line("[2026-02-03 10:15:02] local.INFO: Conflict detection completed {}") is None
+
+
+def test_report_percentiles_and_histogram():
+    lines = [perf_line(f"api/v1/conflicts/{i}", float(i), i % 3) for i in range(1, 101)]
+    report = build_report(aggregate(filter(None, map(parse_line, lines))))
+
+    stats = report["GET /api/v1/conflicts/{id}"]
+    assert stats["count"] == 100
+    assert stats["p50"] == 51.0
+    assert stats["p99"] == 99.0
+    assert stats["query_histogram"]["0"] == 33
+    assert stats["query_histogram"]["1"] == 34
+
+
+def test_diff_flags_regressions():
+    before = build_report(aggregate(parse_line(perf_line("api/v1/conflicts", 10.0, 2)) for _ in range(30)))
+    after = build_report(aggregate(parse_line(perf_line("api/v1/conflicts", 15.0, 2)) for _ in range(30)))
+
+    rows = diff_reports(before, after, threshold=0.2, min_count=20)
+
+    assert rows[0]["route"] == "GET /api/v1/conflicts"
+    assert rows[0]["p95_change"] == 0.5
+    assert rows[0]["regression"] is True
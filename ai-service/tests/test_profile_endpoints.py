@@ -0,0 +1,104 @@
+import argparse
+import asyncio
+import json
+
+import asyncpg
+import httpx
+
+from tools import profile_endpoints
+
+SEQ_SCAN_PLAN = [{"Plan": {
+    "Node Type": "Seq Scan",
+    "Relation Name": "conflict_alerts",
+    "Filter": "((status)::text = 'open'::text)",
+}}]
+
+
+class Transaction:
+    async def start(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+class Conn:
+    """Stands in for Postgres: one table, one hot statement, a seq-scan plan, a live schema."""
+
+    async def fetch(self, sql: str, *args):
+        if sql is profile_endpoints.TABLE_SIZES_SQL:
+            return [{"relname": "conflict_alerts", "est_rows": 50_000}]
+        if sql is profile_endpoints.INDEXED_COLUMNS_SQL:
+            return [{"table_name": "conflict_alerts", "column_name": "id"}]
+        if sql is profile_endpoints.STATEMENTS_SQL:
+            return [{
+                "query": "SELECT * FROM conflict_alerts WHERE status = $1", "calls": 14, "total_exec_time": 9.5,
+                "rows": 14, "shared_blks_hit": 3, "shared_blks_read": 0,
+            }]
+        return [{"table_name": "conflict_alerts", "column_name": c} for c in ("id", "status")]
+
+    async def execute(self, sql: str, *args) -> str:
+        return "OK"
+
+    async def fetchval(self, sql: str, *args):
+        return json.dumps(SEQ_SCAN_PLAN)
+
+    def transaction(self) -> Transaction:
+        return Transaction()
+
+    async def close(self) -> None:
+        pass
+
+
+def backend(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/auth/login"):
+        return httpx.Response(200, json={"token": "t"})
+    return httpx.Response(200, json={}, headers={"X-Query-Count": "14"})
+
+
+def test_profile_reports_findings_and_schema_drift(tmp_path, monkeypatch):
+    (tmp_path / "2026_01_01_000001_create_conflict_alerts_table.php").write_text("""
+        public function up(): void {
+            Schema::create('conflict_alerts', function (Blueprint $table) {
+                $table->id();
+                $table->string('status');
+                $table->date('reporting_period_start');
+            });
+        }
+    """)
+
+    async def connect(dsn):
+        return Conn()
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+    monkeypatch.setattr(profile_endpoints, "ENDPOINTS", [("/conflicts", "ceo@example.com")])
+    args = argparse.Namespace(
+        dsn="postgresql://test", base_url="http://backend/api/v1", password="password", repeat=2,
+        n_plus_one=5, seq_scan_rows=1000, pg_log=None, migrations=tmp_path,
+    )
+
+    profiles, drift = asyncio.run(profile_endpoints.profile(args, transport=httpx.MockTransport(backend)))
+    report = profile_endpoints.format_report(profiles, drift)
+
+    (conflicts,) = profiles
+    assert conflicts.status == 200 and conflicts.header_query_count == "14"
+    assert conflicts.statements[0].plan_mode == "generic"
+    assert len(conflicts.findings) == 2
+    assert conflicts.findings[0].startswith("[N+1] 7.0 calls/request")
+    assert "[MISSING INDEX] conflict_alerts(status)" in conflicts.findings[1]
+    assert [(f.kind, f.table) for f in drift.findings] == [("live_missing_column", "conflict_alerts")]
+    assert "reporting_period_start" in report
+
+
+def test_pg_log_samples_substitute_parameters(tmp_path):
+    log = tmp_path / "postgresql.log"
+    log.write_text(
+        "2026-02-03 10:15:02 UTC LOG:  execute <unnamed>: select * from conflict_alerts\n"
+        "\twhere employee_id = $1 and status = $2\n"
+        "2026-02-03 10:15:02 UTC DETAIL:  parameters: $1 = '42', $2 = 'open'\n"
+    )
+
+    samples = profile_endpoints.parse_pg_log(log)
+
+    assert list(samples.values()) == ["select * from conflict_alerts where employee_id = '42' and status = 'open'"]
+    assert profile_endpoints.normalize("SELECT * FROM conflict_alerts WHERE employee_id = $1 AND status = $2") in samples
@@ -0,0 +1,44 @@
+import numpy as np
+
+from app.services.reporter_behaviour import FEATURES, ReporterFeatures, cluster_reporters
+
+
+def reporters(n: int, seed: int = 0) -> ReporterFeatures:
+    rng = np.random.default_rng(seed)
+    matrix = np.column_stack(
+        [
+            rng.integers(20, 26, n),  # report_count
+            rng.normal(30, 5, n),  # mean_submit_lag_hours
+            rng.normal(8, 2, n),
+            rng.uniform(0, 0.1, n),
+            rng.uniform(0, 0.2, n),  # amendment_rate
+            rng.normal(35, 3, n),
+            rng.uniform(0.3, 0.5, n),  # round_hours_share
+            rng.uniform(0, 0.05, n),
+            rng.uniform(0, 3, n),
+            rng.normal(0, 0.5, n),
+        ]
+    ).astype(np.float64)
+    roles = np.array(["project"] * n, dtype=object)
+    return ReporterFeatures(np.arange(1, n + 1, dtype=np.int64), roles, matrix)
+
+
+def test_planted_outlier_is_surfaced():
+    features = reporters(200)
+    # Reporter 7: always amends, only whole hours, inflates hours against department reports
+    features.matrix[6, FEATURES.index("amendment_rate")] = 3.0
+    features.matrix[6, FEATURES.index("round_hours_share")] = 1.0
+    features.matrix[6, FEATURES.index("signed_discrepancy")] = 12.0
+
+    for method in ("kmeans", "dbscan"):
+        result = cluster_reporters(features, method)
+        assert result["reporters"] == 200
+        assert result["outliers"][0]["reporter_id"] == 7
+        reasons = {r["feature"] for r in result["outliers"][0]["reasons"]}
+        assert {"amendment_rate", "signed_discrepancy"} <= reasons
+
+
+def test_too_few_reporters():
+    result = cluster_reporters(reporters(2))
+
+    assert result["outliers"] == []
@@ -0,0 +1,54 @@
+import asyncio
+import gzip
+
+import msgpack
+import numpy as np
+import orjson
+from starlette.requests import Request
+
+from app.responses import choose_encoding, choose_media_type, negotiated
+
+
+def request_with(**headers) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_json_serializes_numpy_and_int_keys():
+    payload = {"scores": np.array([1.5, 2.0]), "by_employee": {7: np.float64(0.25)}}
+
+    response = asyncio.run(negotiated(request_with(accept="application/json"), payload))
+
+    assert response.media_type == "application/json"
+    assert orjson.loads(response.body) == {"scores": [1.5, 2.0], "by_employee": {"7": 0.25}}
+
+
+def test_json_serializes_non_contiguous_and_object_arrays():
+    matrix = np.arange(6, dtype=np.float64).reshape(3, 2)
+    payload = {"column": matrix[:, 0], "labels": np.array(["a", None], dtype=object)}
+
+    response = asyncio.run(negotiated(request_with(accept="application/json"), payload))
+
+    assert orjson.loads(response.body) == {"column": [0.0, 2.0, 4.0], "labels": ["a", None]}
+
+
+def test_msgpack_negotiation():
+    response = asyncio.run(negotiated(request_with(accept="application/msgpack"), {"ids": np.arange(3)}))
+
+    assert response.media_type == "application/msgpack"
+    assert msgpack.unpackb(response.body) == {"ids": [0, 1, 2]}
+
+
+def test_large_bodies_are_compressed():
+    payload = {"values": np.zeros(20000)}
+
+    response = asyncio.run(negotiated(request_with(accept_encoding="gzip"), payload))
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(orjson.loads(gzip.decompress(response.body))["values"]) == 20000
+
+
+def test_header_parsing_honours_q_zero():
+    assert choose_media_type("application/json, application/msgpack;q=0") == "application/json"
+    assert choose_encoding("gzip;q=0.5, zstd") == "zstd"
+    assert choose_encoding("gzip;q=0") is None
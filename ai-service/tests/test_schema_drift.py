@@ -0,0 +1,96 @@
+import asyncio
+
+import asyncpg
+
+from tools import schema_drift
+
+MIGRATIONS = {
+    "2026_01_01_000001_create_users_table.php": """
+        public function up(): void {
+            Schema::create('users', function (Blueprint $table) {
+                $table->id();
+                $table->string('email');
+                $table->timestamps();
+                $table->index('email');
+            });
+        }
+        public function down(): void { Schema::dropIfExists('users'); }
+    """,
+    "2026_01_01_000002_add_conflict_indexes.php": """
+        public function up(): void {
+            Schema::table('conflict_alerts', function (Blueprint $table) {
+                $table->index(['employee_id', 'status']);
+            });
+        }
+    """,
+    "2026_01_01_000003_create_conflict_alerts_table.php": """
+        public function up(): void {
+            Schema::create('conflict_alerts', function (Blueprint $table) {
+                $table->id();
+                $table->foreignId('employee_id');
+                $table->date('reporting_period_start');
+                $table->string('status');
+                $table->string('legacy');
+                $table->dropColumn('legacy');
+                $table->index('reporting_period', 'idx_period');
+                $table->index(['employee_id', 'status']);
+                $table->index(['employee_id', 'status']);
+            });
+        }
+    """,
+}
+
+
+def migrations(tmp_path):
+    for name, source in MIGRATIONS.items():
+        (tmp_path / name).write_text(source)
+    return tmp_path
+
+
+def test_replay_flags_missing_columns_tables_and_duplicate_indexes(tmp_path):
+    report = schema_drift.replay_migrations(migrations(tmp_path))
+
+    assert report.tables == {
+        "conflict_alerts": ["employee_id", "id", "reporting_period_start", "status"],
+        "users": ["created_at", "email", "id", "updated_at"],
+    }
+    # The premature Schema::table() index is checked once the table exists, and duplicates it
+    assert sorted((f.kind, f.table) for f in report.findings) == [
+        ("duplicate_index", "conflict_alerts"),
+        ("duplicate_index", "conflict_alerts"),
+        ("missing_column", "conflict_alerts"),
+        ("missing_table", "conflict_alerts"),
+    ]
+    assert "idx_period" in next(f.detail for f in report.findings if f.kind == "missing_column")
+
+
+class Conn:
+    def __init__(self, columns: dict[str, list[str]]) -> None:
+        self.columns = columns
+
+    async def fetch(self, sql: str, *args):
+        return [{"table_name": t, "column_name": c} for t, cols in self.columns.items() for c in cols]
+
+    async def close(self) -> None:
+        pass
+
+
+def test_live_comparison_runs_inside_a_running_loop(tmp_path, monkeypatch):
+    async def connect(dsn):
+        return Conn({"users": ["id", "email", "created_at", "updated_at", "phone"]})
+
+    monkeypatch.setattr(asyncpg, "connect", connect)
+
+    async def run():
+        report = schema_drift.replay_migrations(migrations(tmp_path))
+        report.findings.clear()
+        await schema_drift.compare_live(report, "postgresql://test")
+        return report
+
+    report = asyncio.run(run())
+
+    assert sorted((f.kind, f.table) for f in report.findings) == [
+        ("live_extra_column", "users"),
+        ("live_missing_table", "conflict_alerts"),
+    ]
+    assert "phone" in report.findings[-1].detail
@@ -0,0 +1,68 @@
+import os
+
+from app import server
+from app.config import settings
+
+
+def cgroup(tmp_path, monkeypatch, cpus: int, files: dict[str, str]) -> None:
+    for name, content in files.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    monkeypatch.setattr(server, "CGROUP_ROOT", tmp_path)
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(cpus)), raising=False)
+
+
+def test_cgroup_v2_quota_caps_the_affinity_mask(tmp_path, monkeypatch):
+    cgroup(tmp_path, monkeypatch, 16, {"cpu.max": "250000 100000\n"})
+    assert server.available_cpus() == 3
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert server.available_cpus() == 16
+
+    (tmp_path / "cpu.max").write_text("50000 100000\n")
+    assert server.available_cpus() == 1
+
+
+def test_cgroup_v1_quota_and_no_cgroup(tmp_path, monkeypatch):
+    cgroup(tmp_path, monkeypatch, 8, {"cpu/cpu.cfs_quota_us": "200000", "cpu/cpu.cfs_period_us": "100000"})
+    assert server.available_cpus() == 2
+
+    (tmp_path / "cpu" / "cpu.cfs_quota_us").write_text("-1")
+    assert server.available_cpus() == 8
+
+    monkeypatch.setattr(server, "CGROUP_ROOT", tmp_path / "missing")
+    assert server.available_cpus() == 8
+
+
+def test_worker_count_and_thread_caps_follow_overrides(tmp_path, monkeypatch):
+    cgroup(tmp_path, monkeypatch, 8, {"cpu.max": "400000 100000"})
+    for var in server.THREAD_ENV_VARS:
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("MKL_NUM_THREADS", "3")
+    monkeypatch.setattr(settings, "worker_compute_threads", 0)
+
+    monkeypatch.setattr(settings, "workers", 0)
+    assert server.worker_count() == 4
+    monkeypatch.setattr(settings, "workers", 2)
+    assert server.worker_count() == 2
+
+    server.limit_compute_threads(2)
+    assert os.environ["OMP_NUM_THREADS"] == os.environ["OPENBLAS_NUM_THREADS"] == "2"
+    assert os.environ["MKL_NUM_THREADS"] == "3"
+
+
+def test_gunicorn_options_come_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "host", "127.0.0.1")
+    monkeypatch.setattr(settings, "port", 9000)
+    monkeypatch.setattr(settings, "worker_max_requests", 123)
+    monkeypatch.setattr(settings, "preload_app", True)
+
+    options = server.gunicorn_options(5)
+
+    assert options["bind"] == "127.0.0.1:9000"
+    assert options["workers"] == 5
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["max_requests"] == 123
+    assert options["max_requests_jitter"] == settings.worker_max_requests_jitter
+    assert options["preload_app"] is True
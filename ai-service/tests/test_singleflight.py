@@ -0,0 +1,48 @@
+import asyncio
+
+from app.singleflight import SingleFlight, analysis_key
+
+
+def test_concurrent_calls_share_one_computation():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def main():
+        flight = SingleFlight(None, "test")
+        results = await asyncio.gather(*(flight.do("k", compute) for _ in range(10)))
+        return flight, results
+
+    flight, results = asyncio.run(main())
+
+    assert calls == 1
+    assert results == [{"value": 42}] * 10
+    assert flight.stats == {"computed": 1, "coalesced_local": 9, "coalesced_remote": 0}
+
+
+def test_sequential_calls_recompute_and_errors_propagate():
+    async def fail():
+        raise ValueError("boom")
+
+    async def main():
+        flight = SingleFlight(None, "test")
+        first = await flight.do("k", lambda: asyncio.sleep(0, result=1))
+        second = await flight.do("k", lambda: asyncio.sleep(0, result=2))
+        try:
+            await flight.do("bad", fail)
+        except ValueError:
+            failed = True
+        return first, second, failed, flight._inflight
+
+    first, second, failed, inflight = asyncio.run(main())
+
+    assert (first, second, failed) == (1, 2, True)
+    assert inflight == {}
+
+
+def test_analysis_key():
+    assert analysis_key("trends", 52, None) == "trends:52:"
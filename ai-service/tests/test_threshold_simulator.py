@@ -0,0 +1,82 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.services import data_quality, threshold_simulator
+from app.services.threshold_simulator import SimulationInput, relative_discrepancy, simulate
+
+
+def brute_force(data: SimulationInput, t: float) -> tuple[int, int, int]:
+    flagged = data.values > t
+    departments = {d for d, f in zip(data.departments, flagged) if f and d >= 0}
+    return int(flagged.sum()), len(departments), int((flagged & data.resolved).sum())
+
+
+def test_matches_per_threshold_detection():
+    rng = np.random.default_rng(3)
+    n = 5000
+    data = SimulationInput(
+        values=np.round(np.abs(rng.normal(0, 4, n)), 2),
+        departments=rng.integers(-1, 12, n),
+        resolved=rng.random(n) < 0.1,
+    )
+    thresholds = np.linspace(0, 15, 1000)
+
+    result = simulate(data, thresholds)
+
+    for i in (0, 133, 500, 999):
+        conflicts, affected, tp = brute_force(data, thresholds[i])
+        assert result["conflicts"][i] == conflicts
+        assert result["affected_departments"][i] == affected
+        assert result["precision"][i] == (round(tp / conflicts, 4) if conflicts else None)
+
+
+def test_strictly_greater_and_no_history():
+    data = SimulationInput(np.array([2.0, 2.5]), np.array([1, 2]), np.array([False, False]))
+
+    result = simulate(data, np.array([2.0]))
+
+    assert result["conflicts"].tolist() == [1]
+    assert result["affected_departments"].tolist() == [1]
+    assert result["precision"] == [0.0]
+    assert result["recall"] == [None]
+
+
+def test_relative_discrepancy():
+    assert relative_discrepancy(np.array([40.0, 0.0]), np.array([30.0, 0.0])).tolist() == [0.25, 0.0]
+
+
+MONDAY = date(2024, 3, 4)
+SUNDAY = MONDAY + timedelta(days=6)
+
+
+class Conn:
+    """Answers the entry, department and resolved-conflict queries of one period."""
+
+    def __init__(self, project: list, department: list) -> None:
+        self.answers = {data_quality.PROJECT_ENTRIES_SQL: project, data_quality.DEPARTMENT_ENTRIES_SQL: department}
+
+    @asynccontextmanager
+    async def transaction(self, readonly: bool = False):
+        yield
+
+    async def fetch(self, sql: str, *args):
+        if sql is threshold_simulator.DEPARTMENTS_SQL:
+            return [{"id": employee_id, "department_id": 1} for employee_id in args[0]]
+        return self.answers.get(sql, [])
+
+
+def test_simulation_input_excludes_what_detection_excludes():
+    rows = [
+        (1, 10, 100, 40.0, MONDAY, SUNDAY, False),
+        (2, 10, 100, 30.0, MONDAY, SUNDAY, False),  # duplicate entry: excluded by detection
+        (3, 11, 101, 200.0, MONDAY, SUNDAY, False),  # > 168 hours: excluded by detection
+    ]
+    conn = Conn(rows, [(1, 20, 100, 40.0, MONDAY, SUNDAY, False), (2, 20, 101, 40.0, MONDAY, SUNDAY, False)])
+
+    data = asyncio.run(threshold_simulator.load_simulation_input(conn, MONDAY, SUNDAY, "absolute"))
+
+    # 100: 40 vs 40; 101 has no project hours left: 0 vs 40
+    assert sorted(data.values.tolist()) == [0.0, 40.0]
@@ -0,0 +1,103 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI
+from opentelemetry import trace
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+from app import tracing
+from tools import trace_report
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+exporter = InMemorySpanExporter()
+provider = TracerProvider()
+provider.add_span_processor(SimpleSpanProcessor(exporter))
+trace.set_tracer_provider(provider)
+
+
+def traced_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware)
+
+    @app.get("/reports/{report_id}")
+    async def report(report_id: int):
+        with tracing.span("db.load_report", report_id=report_id):
+            await asyncio.sleep(0)
+        with tracing.span("compute.score"):
+            await asyncio.to_thread(sum, range(1000))
+        return {"id": report_id}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+
+def run(app: FastAPI, *requests):
+    async def go():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return [await client.get(path, headers=headers) for path, headers in requests]
+
+    return asyncio.run(go())
+
+
+def test_incoming_traceparent_is_continued():
+    exporter.clear()
+    response, _ = run(
+        traced_app(),
+        ("/reports/7", {"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}),
+        ("/health", {}),
+    )
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {"GET /reports/{report_id}", "db.load_report", "compute.score"}
+
+    server = spans["GET /reports/{report_id}"]
+    assert format(server.context.trace_id, "032x") == TRACE_ID
+    assert format(server.parent.span_id, "016x") == PARENT_ID
+    assert server.attributes["http.status_code"] == 200
+    for name in ("db.load_report", "compute.score"):
+        assert spans[name].parent.span_id == server.context.span_id
+    assert spans["db.load_report"].attributes["report_id"] == 7
+
+    assert response.headers["traceresponse"] == f"00-{TRACE_ID}-{server.context.span_id:016x}-01"
+
+
+def test_log_lines_carry_the_current_span():
+    assert tracing.add_trace_context(None, "info", {"event": "outside"}) == {"event": "outside"}
+
+    with tracing.span("compute.score") as span:
+        event = tracing.add_trace_context(None, "info", {"event": "inside"})
+        headers = tracing.inject_headers()
+
+    assert event["trace_id"] == format(span.get_span_context().trace_id, "032x")
+    assert event["span_id"] == format(span.get_span_context().span_id, "016x")
+    assert headers["traceparent"] == f"00-{event['trace_id']}-{event['span_id']}-01"
+
+
+def test_span_file_breaks_requests_down_by_hop(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    file_provider = TracerProvider()
+    file_provider.add_span_processor(SimpleSpanProcessor(tracing.JsonLinesSpanExporter(str(path))))
+    tracer = file_provider.get_tracer("test")
+
+    for _ in range(3):
+        with tracer.start_as_current_span("POST /api/ml/conflicts/persist", kind=trace.SpanKind.SERVER):
+            with tracer.start_as_current_span("db.load_entries"):
+                pass
+            with tracer.start_as_current_span("db.persist_detection"):
+                pass
+
+    roots = trace_report.build_trees(trace_report.read_spans([str(path)]))
+    report = trace_report.build_report(roots, "persist")["POST /api/ml/conflicts/persist"]
+
+    assert len(path.read_text().splitlines()) == 9
+    assert report["count"] == 3
+    assert set(report["hops"]) == {"db.load_entries", "db.persist_detection", trace_report.SELF}
+    assert abs(sum(hop["share"] for hop in report["hops"].values()) - 1.0) < 0.01
+    assert trace_report.format_tree(roots[0]).splitlines()[1].split()[-1] == "db.load_entries"
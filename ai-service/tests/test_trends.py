@@ -0,0 +1,81 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+
+from app.cache import ResultCache
+from app.config import settings
+from app.services import trends
+
+MONDAY = date(2026, 3, 2)
+CREATED = datetime(2026, 3, 9, 9, 0, tzinfo=timezone.utc)
+
+
+def conflict(period_start, department_id, discrepancy, resolved_hours=None, escalated=False):
+    resolved_at = CREATED + timedelta(hours=resolved_hours) if resolved_hours is not None else None
+    escalated_at = CREATED + timedelta(days=7) if escalated else None
+    return (period_start, department_id, discrepancy, CREATED, resolved_at, escalated_at)
+
+
+def test_weekly_metrics_per_department_and_total():
+    records = [
+        conflict(MONDAY, 1, -4.0, resolved_hours=2),
+        conflict(MONDAY + timedelta(days=3), 1, 6.0, resolved_hours=4, escalated=True),
+        conflict(MONDAY, None, 3.0),
+        conflict(MONDAY + timedelta(weeks=1), 2, 5.0),
+    ]
+
+    result = trends.compute_weekly_metrics(records)
+
+    first, second = MONDAY.isoformat(), (MONDAY + timedelta(weeks=1)).isoformat()
+    assert set(result) == {first, second}
+    assert result[first]["1"] == {
+        "conflicts": 2, "mean_abs_discrepancy": 5.0, "mean_hours_to_resolution": 3.0, "escalation_rate": 0.5,
+    }
+    assert result[first][trends.UNASSIGNED_KEY]["mean_hours_to_resolution"] is None
+    assert result[first][trends.TOTAL_KEY]["conflicts"] == 3
+    assert result[first][trends.TOTAL_KEY]["escalation_rate"] == 0.333
+    assert set(result[second]) == {"2", trends.TOTAL_KEY}
+    assert trends.compute_weekly_metrics([]) == {}
+
+
+class Pool:
+    """Answers CONFLICTS_SQL from a list of records, honouring the week range."""
+
+    def __init__(self, records: list) -> None:
+        self.records = records
+        self.queries: list[tuple[date, date]] = []
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    async def fetch(self, sql: str, start: date, end: date):
+        self.queries.append((start, end))
+        return [r for r in self.records if start <= r[0] < end]
+
+
+def test_closed_weeks_are_served_from_cache_until_invalidated():
+    today = MONDAY + timedelta(weeks=2)
+    pool = Pool([conflict(MONDAY, 1, 4.0), conflict(today, 1, 2.0)])
+    cache = ResultCache(None, trends.CACHE_NAMESPACE, 60)
+
+    async def run():
+        cold = await trends.conflict_trends(pool, cache, 3, today=today)
+        pool.records[0] = conflict(MONDAY, 1, 4.0, resolved_hours=6)
+        warm = await trends.conflict_trends(pool, cache, 3, today=today)
+        await trends.invalidate_weeks(cache, [MONDAY + timedelta(days=2)])
+        return cold, warm, await trends.conflict_trends(pool, cache, 3, today=today)
+
+    cold, warm, invalidated = asyncio.run(run())
+
+    assert cold["series"]["conflicts"] == [1, 0, 1]
+    assert (cold["cached_weeks"], warm["cached_weeks"], invalidated["cached_weeks"]) == (0, 2, 1)
+    assert pool.queries[1] == (today, today + timedelta(weeks=1))
+    assert warm["series"]["mean_hours_to_resolution"][0] is None
+    assert invalidated["series"]["mean_hours_to_resolution"][0] == 6.0
+
+
+def test_short_ttl_without_the_change_feed():
+    assert trends.cache_ttl_seconds(True) == settings.trend_cache_ttl_seconds
+    assert trends.cache_ttl_seconds(False) == settings.trend_cache_unwatched_ttl_seconds
+    assert settings.trend_cache_unwatched_ttl_seconds < settings.trend_cache_ttl_seconds
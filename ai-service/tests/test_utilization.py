@@ -0,0 +1,56 @@
+from datetime import date
+
+import numpy as np
+
+from app.services.utilization import Triples, allocations_in_period, compute_utilization
+
+
+def test_allocation_metrics():
+    reported = Triples.from_records(
+        [
+            (1, 10, 50.0),  # employee 1: 70h on two projects in one week
+            (1, 20, 20.0),
+            (2, 20, 5.0),
+            (3, 30, 8.0),
+        ]
+    )
+    allocated = Triples.from_records([(3, 30, 40.0), (4, 10, 10.0)])
+
+    result = compute_utilization(reported, allocated, weeks=1.0)
+
+    assert [e["employee_id"] for e in result["over_allocated"]] == [1]
+    assert result["over_allocated"][0]["project_count"] == 2
+    assert result["over_allocated"][0]["fragmentation"] == round(1 - (50 / 70) ** 2 - (20 / 70) ** 2, 3)
+    # 3 reports 8h against 40h allocated; 4 reports nothing against 10h
+    assert [e["employee_id"] for e in result["under_allocated"]] == [3, 4]
+    assert result["concentrated_projects"][0]["project_id"] == 20
+    assert result["concentrated_projects"][0]["top_contributor_share"] == 0.8
+    assert result["summary"]["employees"] == 3
+    assert np.allclose(result["employees"]["weekly_hours"], [70.0, 5.0, 8.0, 0.0])
+
+
+def test_empty_period():
+    empty = Triples.from_records([])
+
+    result = compute_utilization(empty, empty, weeks=2.0)
+
+    assert result["summary"]["employees"] == 0
+    assert result["over_allocated"] == []
+
+
+def test_only_active_projects_overlapping_the_period_are_allocated():
+    start, end = date(2026, 3, 2), date(2026, 3, 8)
+    rows = [
+        (1, 10, 40.0, "active", date(2026, 1, 1), None),
+        (1, 11, 20.0, "completed", date(2025, 6, 1), date(2026, 2, 27)),
+        (1, 12, 20.0, "cancelled", None, None),
+        (2, 13, 30.0, "active", date(2026, 4, 1), None),  # not started yet
+        (2, 14, 10.0, "active", None, date(2026, 3, 2)),  # ends on the first day
+        (3, 15, 25.0, "on_hold", date(2026, 1, 1), date(2026, 6, 30)),
+    ]
+
+    allocated = allocations_in_period(rows, start, end)
+    result = compute_utilization(Triples.from_records([(1, 10, 40.0), (2, 14, 10.0)]), allocated, weeks=1.0)
+
+    assert list(zip(allocated.employee_ids.tolist(), allocated.project_ids.tolist())) == [(1, 10), (2, 14)]
+    assert result["under_allocated"] == []
@@ -0,0 +1,3 @@
+"""
+Developer tooling for profiling and validating the platform (run with `python -m tools.<name>`).
+"""
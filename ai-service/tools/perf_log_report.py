@@ -0,0 +1,303 @@
+"""
+Per-route latency reports from the backend's PerformanceMonitor log lines.
+
+PerformanceMonitor writes one line per request to the Laravel log:
+
+    [2026-02-03 10:15:02] local.INFO: [PERF] GET api/v1/conflicts/42 {"duration_ms":31.4,"memory_mb":1.2,"query_count":4,"query_time_ms":6.8,"non_query_time_ms":24.6}
+
+Lines are parsed as a stream (plain or .gz files, stdin, or a followed file), paths are
+normalized into routes (ids collapsed to {id}), and each route gets duration percentiles,
+query-count histograms and query/memory averages. `diff` compares two log windows and
+flags routes whose latency or query count regressed.
+
+Usage:
+    python -m tools.perf_log_report report storage/logs/laravel.log [--since ...] [--until ...] [--json]
+    python -m tools.perf_log_report report --follow storage/logs/laravel.log [--interval 30]
+    python -m tools.perf_log_report diff --baseline old.log --candidate new.log [--threshold 0.2]
+    python -m tools.perf_log_report diff --baseline app.log --baseline-until "2026-02-03 12:00:00" \\
+        --candidate app.log --candidate-since "2026-02-03 12:00:00"
+"""
+
+import argparse
+import gzip
+import json
+import re
+import sys
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+PERF_LINE = re.compile(
+    r"^\[(?P<ts>[^\]]+)\]\s+\S+\.\w+:\s+\[PERF\]\s+(?P<method>[A-Z]+)\s+(?P<path>\S+)\s+(?P<ctx>\{.*?\})"
+)
+
+NUMERIC = re.compile(r"^\d+$")
+UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+TOKEN = re.compile(r"^[0-9a-zA-Z_-]{24,}$")
+
+QUERY_BUCKETS = [(0, 0), (1, 1), (2, 5), (6, 10), (11, 20), (21, 50), (51, None)]
+PERCENTILES = (50, 90, 95, 99)
+
+
+@dataclass
+class PerfRecord:
+    timestamp: datetime
+    method: str
+    route: str
+    duration_ms: float
+    query_count: int
+    query_time_ms: float
+    memory_mb: float
+
+
+@dataclass
+class RouteStats:
+    """Per-route samples in compact typed arrays (8 bytes per sample)."""
+
+    durations: array = field(default_factory=lambda: array("d"))
+    query_counts: array = field(default_factory=lambda: array("l"))
+    query_time_ms: float = 0.0
+    memory_mb: float = 0.0
+
+    def add(self, record: PerfRecord) -> None:
+        self.durations.append(record.duration_ms)
+        self.query_counts.append(record.query_count)
+        self.query_time_ms += record.query_time_ms
+        self.memory_mb += record.memory_mb
+
+    @property
+    def count(self) -> int:
+        return len(self.durations)
+
+    def percentiles(self) -> dict[str, float]:
+        ordered = sorted(self.durations)
+        last = len(ordered) - 1
+        return {f"p{p}": round(ordered[round(last * p / 100)], 2) for p in PERCENTILES}
+
+    def query_histogram(self) -> dict[str, int]:
+        histogram = {}
+        for low, high in QUERY_BUCKETS:
+            label = str(low) if low == high else (f"{low}+" if high is None else f"{low}-{high}")
+            histogram[label] = sum(1 for q in self.query_counts if q >= low and (high is None or q <= high))
+        return histogram
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            **self.percentiles(),
+            "mean_ms": round(sum(self.durations) / self.count, 2),
+            "mean_queries": round(sum(self.query_counts) / self.count, 2),
+            "max_queries": max(self.query_counts),
+            "mean_query_time_ms": round(self.query_time_ms / self.count, 2),
+            "mean_memory_mb": round(self.memory_mb / self.count, 2),
+            "query_histogram": self.query_histogram(),
+        }
+
+
+def normalize_path(path: str) -> str:
+    """api/v1/conflicts/42/resolve -> /api/v1/conflicts/{id}/resolve"""
+    segments = []
+    for segment in path.split("?", 1)[0].strip("/").split("/"):
+        if NUMERIC.match(segment):
+            segments.append("{id}")
+        elif UUID.match(segment):
+            segments.append("{uuid}")
+        elif TOKEN.match(segment):
+            segments.append("{token}")
+        else:
+            segments.append(segment)
+    return "/" + "/".join(segments)
+
+
+def parse_line(line: str) -> Optional[PerfRecord]:
+    match = PERF_LINE.match(line)
+    if match is None:
+        return None
+    try:
+        ctx = json.loads(match.group("ctx"))
+        timestamp = datetime.fromisoformat(match.group("ts"))
+    except ValueError:
+        return None
+    return PerfRecord(
+        timestamp=timestamp.replace(tzinfo=None),
+        method=match.group("method"),
+        route=normalize_path(match.group("path")),
+        duration_ms=float(ctx.get("duration_ms", 0.0)),
+        query_count=int(ctx.get("query_count", 0)),
+        query_time_ms=float(ctx.get("query_time_ms", 0.0)),
+        memory_mb=float(ctx.get("memory_mb", 0.0)),
+    )
+
+
+def open_log(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, encoding="utf-8", errors="replace")
+
+
+def read_records(
+    paths: Iterable[str], since: Optional[datetime] = None, until: Optional[datetime] = None
+) -> Iterator[PerfRecord]:
+    """Stream [PERF] records from the given files, restricted to [since, until)."""
+    for path in paths:
+        handle = open_log(path)
+        try:
+            for line in handle:
+                if "[PERF]" not in line:
+                    continue
+                record = parse_line(line)
+                if record is None:
+                    continue
+                if since is not None and record.timestamp < since:
+                    continue
+                if until is not None and record.timestamp >= until:
+                    continue
+                yield record
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+def aggregate(records: Iterable[PerfRecord]) -> dict[str, RouteStats]:
+    routes: dict[str, RouteStats] = {}
+    for record in records:
+        routes.setdefault(f"{record.method} {record.route}", RouteStats()).add(record)
+    return routes
+
+
+def build_report(routes: dict[str, RouteStats], min_count: int = 1) -> dict[str, dict]:
+    summaries = {key: stats.summary() for key, stats in routes.items() if stats.count >= min_count}
+    return dict(sorted(summaries.items(), key=lambda item: item[1]["p95"], reverse=True))
+
+
+def diff_reports(
+    baseline: dict[str, dict], candidate: dict[str, dict], threshold: float, min_count: int
+) -> list[dict]:
+    """Routes present in both windows, with relative change; regressions first."""
+    rows = []
+    for route in baseline.keys() & candidate.keys():
+        before, after = baseline[route], candidate[route]
+        if before["count"] < min_count or after["count"] < min_count:
+            continue
+
+        def change(key: str) -> float:
+            return round((after[key] - before[key]) / before[key], 3) if before[key] else 0.0
+
+        row = {
+            "route": route,
+            "baseline_p95": before["p95"],
+            "candidate_p95": after["p95"],
+            "p50_change": change("p50"),
+            "p95_change": change("p95"),
+            "queries_change": change("mean_queries"),
+        }
+        row["regression"] = row["p95_change"] > threshold or row["queries_change"] > threshold
+        rows.append(row)
+
+    rows.sort(key=lambda r: (not r["regression"], -r["p95_change"]))
+    return rows
+
+
+def format_report(report: dict[str, dict]) -> str:
+    header = f"{'route':<55} {'n':>7} {'p50':>9} {'p90':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'max q':>6}"
+    lines = [header, "-" * len(header)]
+    for route, s in report.items():
+        lines.append(
+            f"{route[:55]:<55} {s['count']:>7} {s['p50']:>9} {s['p90']:>9} {s['p95']:>9} {s['p99']:>9} "
+            f"{s['mean_queries']:>8} {s['max_queries']:>6}"
+        )
+        histogram = "  ".join(f"{bucket}:{n}" for bucket, n in s["query_histogram"].items() if n)
+        lines.append(f"{'':<8}queries/request  {histogram}")
+    return "\n".join(lines)
+
+
+def format_diff(rows: list[dict]) -> str:
+    header = f"{'route':<55} {'p95 before':>11} {'p95 after':>10} {'p95 Δ':>8} {'p50 Δ':>8} {'queries Δ':>10}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        lines.append(
+            f"{r['route'][:55]:<55} {r['baseline_p95']:>11} {r['candidate_p95']:>10} "
+            f"{r['p95_change']:>+8.1%} {r['p50_change']:>+8.1%} {r['queries_change']:>+10.1%}{flag}"
+        )
+    return "\n".join(lines)
+
+
+def follow(path: str, interval: float, min_count: int) -> None:
+    """Tail a growing log and print a cumulative report every `interval` seconds."""
+    routes: dict[str, RouteStats] = {}
+    next_report = time.monotonic() + interval
+    with open(path, encoding="utf-8", errors="replace") as handle:
+        handle.seek(0, 2)
+        while True:
+            line = handle.readline()
+            if line:
+                record = parse_line(line) if "[PERF]" in line else None
+                if record is not None:
+                    routes.setdefault(f"{record.method} {record.route}", RouteStats()).add(record)
+            else:
+                time.sleep(0.5)
+            if time.monotonic() >= next_report:
+                print(f"\n[{datetime.now().isoformat(timespec='seconds')}]")
+                print(format_report(build_report(routes, min_count)))
+                next_report = time.monotonic() + interval
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    report = sub.add_parser("report", help="Per-route latency report")
+    report.add_argument("logs", nargs="+", help="Laravel log files (.gz ok, - for stdin)")
+    report.add_argument("--since")
+    report.add_argument("--until")
+    report.add_argument("--min-count", type=int, default=1)
+    report.add_argument("--follow", action="store_true", help="Tail the (single) log file")
+    report.add_argument("--interval", type=float, default=30.0)
+    report.add_argument("--json", action="store_true")
+
+    diff = sub.add_parser("diff", help="Compare two log windows")
+    diff.add_argument("--baseline", nargs="+", required=True)
+    diff.add_argument("--baseline-since")
+    diff.add_argument("--baseline-until")
+    diff.add_argument("--candidate", nargs="+", required=True)
+    diff.add_argument("--candidate-since")
+    diff.add_argument("--candidate-until")
+    diff.add_argument("--threshold", type=float, default=0.2, help="Relative increase that counts as a regression")
+    diff.add_argument("--min-count", type=int, default=20)
+    diff.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "report":
+        if args.follow:
+            follow(args.logs[0], args.interval, args.min_count)
+            return 0
+        result = build_report(
+            aggregate(read_records(args.logs, _timestamp(args.since), _timestamp(args.until))), args.min_count
+        )
+        print(json.dumps(result, indent=2) if args.json else format_report(result))
+        return 0
+
+    baseline = build_report(
+        aggregate(read_records(args.baseline, _timestamp(args.baseline_since), _timestamp(args.baseline_until)))
+    )
+    candidate = build_report(
+        aggregate(read_records(args.candidate, _timestamp(args.candidate_since), _timestamp(args.candidate_until)))
+    )
+    rows = diff_reports(baseline, candidate, args.threshold, args.min_count)
+    print(json.dumps(rows, indent=2) if args.json else format_diff(rows))
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
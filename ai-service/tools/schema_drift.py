@@ -0,0 +1,207 @@
+"""
+Schema drift checker for the Laravel migrations.
+
+Replays backend/database/migrations statically (in filename order) to build the column
+set of every table, then checks every declared index against it. Catches indexes on
+columns that do not exist (e.g. conflict_alerts.reporting_period), indexes on tables that
+have not been created yet at that point in the migration order, and duplicate indexes.
+With --dsn the replayed schema is also compared against the live database.
+
+Usage:
+    python -m tools.schema_drift [--migrations ../backend/database/migrations] [--dsn postgresql://...]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_MIGRATIONS = Path(__file__).resolve().parents[2] / "backend" / "database" / "migrations"
+
+SCHEMA_CALL = re.compile(r"Schema::(create|table)\(\s*'(\w+)'")
+COLUMN_CALL = re.compile(r"\$table->(\w+)\(\s*'(\w+)'")
+INDEX_CALL = re.compile(r"\$table->(index|unique|primary)\(\s*(\[[^\]]*\]|'\w+')(?:\s*,\s*'(\w+)')?")
+DROP_COLUMN_CALL = re.compile(r"\$table->dropColumn\(\s*(\[[^\]]*\]|'\w+')")
+
+# Blueprint methods that take a column name but do not add a column
+NON_COLUMN_METHODS = {
+    "index", "unique", "primary", "foreign", "fullText", "spatialIndex",
+    "dropIndex", "dropUnique", "dropPrimary", "dropForeign", "dropColumn",
+    "renameColumn", "renameIndex", "dropConstrainedForeignId", "comment",
+}
+
+# Blueprint helpers that add fixed columns
+IMPLICIT_COLUMNS = {
+    "id": ["id"],
+    "timestamps": ["created_at", "updated_at"],
+    "timestampsTz": ["created_at", "updated_at"],
+    "nullableTimestamps": ["created_at", "updated_at"],
+    "softDeletes": ["deleted_at"],
+    "softDeletesTz": ["deleted_at"],
+    "rememberToken": ["remember_token"],
+}
+IMPLICIT_CALL = re.compile(r"\$table->(" + "|".join(IMPLICIT_COLUMNS) + r")\(\s*\)")
+MORPHS_CALL = re.compile(r"\$table->(?:nullableMorphs|morphs|uuidMorphs|nullableUuidMorphs)\(\s*'(\w+)'")
+
+
+@dataclass
+class Finding:
+    kind: str
+    migration: str
+    table: str
+    detail: str
+
+
+@dataclass
+class DriftReport:
+    tables: dict[str, list[str]] = field(default_factory=dict)
+    findings: list[Finding] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings
+
+
+def _names(arg: str) -> list[str]:
+    return re.findall(r"'(\w+)'", arg)
+
+
+def _up_body(source: str) -> str:
+    """Only the up() method matters; down() drops what up() created."""
+    start = source.find("function up()")
+    end = source.find("function down()")
+    if start == -1:
+        return source
+    return source[start:end if end != -1 else None]
+
+
+def _check_indexes(
+    report: DriftReport, migration: str, table: str, block: str,
+    columns: set[str], existing: set[tuple[str, ...]],
+) -> None:
+    for kind, arg, index_name in INDEX_CALL.findall(block):
+        cols = tuple(_names(arg))
+        missing = [c for c in cols if c not in columns]
+        label = index_name or f"{kind}({', '.join(cols)})"
+        if missing:
+            report.findings.append(
+                Finding("missing_column", migration, table, f"{label} references unknown column(s): {', '.join(missing)}")
+            )
+        elif cols in existing:
+            report.findings.append(
+                Finding("duplicate_index", migration, table, f"{label} duplicates an existing index on ({', '.join(cols)})")
+            )
+        existing.add(cols)
+
+
+def replay_migrations(migrations_dir: Path) -> DriftReport:
+    """Replay the up() side of every migration and collect findings."""
+    report = DriftReport()
+    tables: dict[str, set[str]] = {}
+    indexes: dict[str, set[tuple[str, ...]]] = {}
+    # Schema::table() blocks that ran before their table existed; their indexes are
+    # still checked against the table's final columns once the replay is complete.
+    premature: list[tuple[str, str, str]] = []
+
+    for path in sorted(migrations_dir.glob("*.php")):
+        body = _up_body(path.read_text(encoding="utf-8"))
+        calls = list(SCHEMA_CALL.finditer(body))
+
+        for i, call in enumerate(calls):
+            verb, table = call.group(1), call.group(2)
+            block = body[call.end(): calls[i + 1].start() if i + 1 < len(calls) else len(body)]
+
+            if verb == "create":
+                tables[table] = set()
+                indexes[table] = set()
+            elif table not in tables:
+                report.findings.append(
+                    Finding("missing_table", path.name, table, "Schema::table() runs before the table is created")
+                )
+                premature.append((path.name, table, block))
+                continue
+
+            columns = tables[table]
+            for method, name in COLUMN_CALL.findall(block):
+                if method not in NON_COLUMN_METHODS:
+                    columns.add(name)
+            for method in IMPLICIT_CALL.findall(block):
+                columns.update(IMPLICIT_COLUMNS[method])
+            for name in MORPHS_CALL.findall(block):
+                columns.update({f"{name}_type", f"{name}_id"})
+            for arg in DROP_COLUMN_CALL.findall(block):
+                columns.difference_update(_names(arg))
+
+            _check_indexes(report, path.name, table, block, columns, indexes[table])
+
+    for migration, table, block in premature:
+        if table in tables:
+            _check_indexes(report, migration, table, block, tables[table], set(indexes[table]))
+
+    report.tables = {name: sorted(cols) for name, cols in sorted(tables.items())}
+    return report
+
+
+async def compare_live(report: DriftReport, dsn: str) -> None:
+    """Compare the replayed schema with information_schema of a live database."""
+    import asyncpg
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        rows = await conn.fetch(
+            "SELECT table_name, column_name FROM information_schema.columns WHERE table_schema = current_schema()"
+        )
+    finally:
+        await conn.close()
+
+    live: dict[str, set[str]] = {}
+    for row in rows:
+        live.setdefault(row["table_name"], set()).add(row["column_name"])
+
+    for table, columns in report.tables.items():
+        if table not in live:
+            report.findings.append(Finding("live_missing_table", "-", table, "declared in migrations but absent in the database"))
+            continue
+        for column in sorted(set(columns) - live[table]):
+            report.findings.append(Finding("live_missing_column", "-", table, f"column {column} absent in the database"))
+        for column in sorted(live[table] - set(columns)):
+            report.findings.append(Finding("live_extra_column", "-", table, f"column {column} exists but no migration declares it"))
+
+
+def format_report(report: DriftReport) -> str:
+    if report.ok:
+        return f"Schema drift: none ({len(report.tables)} tables replayed)"
+    lines = [f"Schema drift: {len(report.findings)} finding(s)"]
+    for f in report.findings:
+        lines.append(f"  [{f.kind}] {f.table}: {f.detail} ({f.migration})")
+    return "\n".join(lines)
+
+
+def check(migrations_dir: Path = DEFAULT_MIGRATIONS, dsn: Optional[str] = None) -> DriftReport:
+    report = replay_migrations(migrations_dir)
+    if dsn:
+        asyncio.run(compare_live(report, dsn))
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--migrations", type=Path, default=DEFAULT_MIGRATIONS)
+    parser.add_argument("--dsn", help="Compare against a live database as well")
+    parser.add_argument("--json", action="store_true", help="Emit JSON instead of text")
+    args = parser.parse_args()
+
+    report = check(args.migrations, args.dsn)
+    if args.json:
+        print(json.dumps({"findings": [asdict(f) for f in report.findings], "tables": report.tables}, indent=2))
+    else:
+        print(format_report(report))
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
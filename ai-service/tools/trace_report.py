@@ -0,0 +1,206 @@
+"""
+Where the time goes in traced requests, from the JSON-lines span file.
+
+With TRACING_ENABLED and TRACING_EXPORTER=file every worker appends one line per
+finished span (app/tracing.py) to TRACING_FILE_PATH:
+
+    {"trace_id":"4bf9...","span_id":"00f0...","parent_id":"a3ce...","name":"db.load_entries",
+     "kind":"INTERNAL","start":1770113702.41,"duration_ms":812.4,"status":"UNSET",...}
+
+`report` groups requests by their server span (e.g. "POST /api/ml/conflicts/persist")
+and breaks each down by hop: per child span name the share of the request time and the
+p50/p95 it took per request (nested spans also count toward the spans they are in),
+plus the request's self time (time not covered by any child span: body decoding,
+validation, awaiting the pool). `show` prints one trace as
+a tree; the trace id is in the `traceresponse` response header, in the service's log
+lines and in the nginx access log.
+
+Usage:
+    python -m tools.trace_report report traces/spans.jsonl [--root persist] [--json]
+    python -m tools.trace_report show traces/spans.jsonl 4bf92f3577b34da6a3ce929d0e0e4736
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+PERCENTILES = (50, 95)
+SELF = "(self)"
+
+
+@dataclass
+class Span:
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    kind: str
+    start: float
+    duration_ms: float
+    status: str
+    attributes: dict
+    children: list["Span"] = field(default_factory=list)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration_ms / 1000
+
+
+def read_spans(paths: Iterable[str]) -> Iterator[Span]:
+    for path in paths:
+        handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in handle:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crashed worker
+                yield Span(
+                    trace_id=record["trace_id"],
+                    span_id=record["span_id"],
+                    parent_id=record.get("parent_id"),
+                    name=record["name"],
+                    kind=record.get("kind", "INTERNAL"),
+                    start=record["start"],
+                    duration_ms=record["duration_ms"],
+                    status=record.get("status", "UNSET"),
+                    attributes=record.get("attributes", {}),
+                )
+        finally:
+            if handle is not sys.stdin:
+                handle.close()
+
+
+def build_trees(spans: Iterable[Span]) -> list[Span]:
+    """Link spans to their parents; returns the roots (spans whose parent is not in the file)."""
+    by_id = {s.span_id: s for s in spans}
+    roots = []
+    for s in by_id.values():
+        parent = by_id.get(s.parent_id) if s.parent_id else None
+        if parent is None:
+            roots.append(s)
+        else:
+            parent.children.append(s)
+    for s in by_id.values():
+        s.children.sort(key=lambda child: child.start)
+    roots.sort(key=lambda root: root.start)
+    return roots
+
+
+def self_time_ms(span: Span) -> float:
+    """Duration not covered by any direct child (overlapping children count once)."""
+    covered = 0.0
+    cursor = span.start
+    for child in span.children:
+        start, end = max(child.start, cursor), min(child.end, span.end)
+        if end > start:
+            covered += end - start
+            cursor = end
+    return max(span.duration_ms - covered * 1000, 0.0)
+
+
+def _descendants(span: Span) -> Iterator[Span]:
+    for child in span.children:
+        yield child
+        yield from _descendants(child)
+
+
+def _percentiles(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    return {f"p{p}": round(ordered[round(last * p / 100)], 2) for p in PERCENTILES}
+
+
+def build_report(roots: Iterable[Span], name_filter: str = "") -> dict[str, dict]:
+    """Per root span name: request percentiles and, per hop, share and per-request percentiles."""
+    requests: dict[str, list[Span]] = defaultdict(list)
+    for root in roots:
+        if name_filter in root.name:
+            requests[root.name].append(root)
+
+    report = {}
+    for name, spans in sorted(requests.items()):
+        total_ms = sum(s.duration_ms for s in spans)
+        # Hop time per request: repeated spans of one name (retries, per-key lookups) add up
+        hops: dict[str, list[float]] = defaultdict(list)
+        for root in spans:
+            per_request: dict[str, float] = defaultdict(float)
+            per_request[SELF] = self_time_ms(root)
+            for child in _descendants(root):
+                per_request[child.name] += child.duration_ms
+            for hop, ms in per_request.items():
+                hops[hop].append(ms)
+
+        report[name] = {
+            "count": len(spans),
+            "errors": sum(1 for s in spans if s.status == "ERROR"),
+            **_percentiles([s.duration_ms for s in spans]),
+            "hops": {
+                hop: {"requests": len(values), "share": round(sum(values) / total_ms, 4) if total_ms else 0.0,
+                      **_percentiles(values)}
+                for hop, values in sorted(hops.items(), key=lambda item: -sum(item[1]))
+            },
+        }
+    return report
+
+
+def format_report(report: dict[str, dict]) -> str:
+    lines = []
+    for name, r in report.items():
+        lines.append(f"{name}  n={r['count']} errors={r['errors']} p50={r['p50']}ms p95={r['p95']}ms")
+        header = f"    {'hop':<40} {'share':>7} {'n':>7} {'p50 ms':>10} {'p95 ms':>10}"
+        lines += [header, "    " + "-" * (len(header) - 4)]
+        for hop, h in r["hops"].items():
+            lines.append(f"    {hop[:40]:<40} {h['share']:>7.1%} {h['requests']:>7} {h['p50']:>10} {h['p95']:>10}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def format_tree(root: Span) -> str:
+    lines = []
+
+    def visit(span: Span, depth: int) -> None:
+        offset = (span.start - root.start) * 1000
+        status = "  ERROR" if span.status == "ERROR" else ""
+        attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items() if k != "http.user_agent")
+        lines.append(f"{offset:>9.1f}ms {span.duration_ms:>9.1f}ms  {'  ' * depth}{span.name}{status}  {attributes}".rstrip())
+        for child in span.children:
+            visit(child, depth + 1)
+
+    visit(root, 0)
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    report = sub.add_parser("report", help="Per-request breakdown by hop")
+    report.add_argument("spans", nargs="+", help="Span files (- for stdin)")
+    report.add_argument("--root", default="", help="Only requests whose span name contains this")
+    report.add_argument("--json", action="store_true")
+
+    show = sub.add_parser("show", help="Print one trace as a tree")
+    show.add_argument("spans", nargs="+", help="Span files (- for stdin)")
+    show.add_argument("trace_id")
+
+    args = parser.parse_args()
+
+    if args.command == "report":
+        result = build_report(build_trees(read_spans(args.spans)), args.root)
+        print(json.dumps(result, indent=2) if args.json else format_report(result))
+        return 0
+
+    roots = build_trees(s for s in read_spans(args.spans) if s.trace_id == args.trace_id)
+    if not roots:
+        print(f"No spans of trace {args.trace_id}", file=sys.stderr)
+        return 1
+    print("\n\n".join(format_tree(root) for root in roots))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
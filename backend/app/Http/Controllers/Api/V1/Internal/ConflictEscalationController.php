@@ -0,0 +1,52 @@
+<?php
+
+namespace App\Http\Controllers\Api\V1\Internal;
+
+use App\Http\Controllers\Controller;
+use App\Models\ConflictAlert;
+use App\Models\User;
+use App\Notifications\ConflictEscalatedNotification;
+use Illuminate\Http\JsonResponse;
+use Illuminate\Http\Request;
+use Illuminate\Support\Facades\Log;
+
+class ConflictEscalationController extends Controller
+{
+    /**
+     * Notify CEO/CFO about conflicts the AI service's escalation scheduler escalated.
+     * The AI service batches its callbacks: {"items": [{"id": ..., "employee_id": ..., "created_at": ...}]}.
+     */
+    public function store(Request $request): JsonResponse
+    {
+        $validated = $request->validate([
+            'items' => 'required|array|min:1',
+            'items.*.id' => 'required|integer',
+        ]);
+
+        // Only conflicts that are still escalated (not resolved in the meantime)
+        $conflicts = ConflictAlert::with('employee')
+            ->whereIn('id', collect($validated['items'])->pluck('id')->unique())
+            ->where('status', 'escalated')
+            ->get();
+
+        $executives = User::whereHas('roles', function ($query) {
+            $query->whereIn('name', ['ceo', 'cfo']);
+        })->get();
+
+        foreach ($conflicts as $conflict) {
+            foreach ($executives as $executive) {
+                $executive->notify(new ConflictEscalatedNotification($conflict));
+            }
+        }
+
+        Log::info('Escalation callback processed', [
+            'received' => count($validated['items']),
+            'notified_conflicts' => $conflicts->count(),
+            'executives_notified' => $executives->count(),
+        ]);
+
+        return response()->json([
+            'notified_conflicts' => $conflicts->count(),
+        ], 202);
+    }
+}
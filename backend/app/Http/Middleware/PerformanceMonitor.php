@@ -31,14 +31,21 @@ class PerformanceMonitor
         $queryCount = count($queries);
         $queryTime = collect($queries)->sum('time');
 
-        // Log performance metrics
-        Log::info('[PERF] ' . $request->method() . ' ' . $request->path(), [
+        $context = [
             'duration_ms' => round($duration, 2),
             'memory_mb' => round($memoryUsed, 2),
             'query_count' => $queryCount,
             'query_time_ms' => round($queryTime, 2),
             'non_query_time_ms' => round($duration - $queryTime, 2),
-        ]);
+        ];
+
+        // W3C trace context (version-traceid-parentid-flags), e.g. on AI service callbacks
+        if (preg_match('/^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$/', (string) $request->header('traceparent'), $match)) {
+            $context['trace_id'] = $match[1];
+        }
+
+        // Log performance metrics
+        Log::info('[PERF] ' . $request->method() . ' ' . $request->path(), $context);
 
         // Add performance headers in development
         if (config('app.debug')) {
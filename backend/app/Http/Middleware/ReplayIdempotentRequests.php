@@ -0,0 +1,56 @@
+<?php
+
+namespace App\Http\Middleware;
+
+use Closure;
+use Illuminate\Http\Request;
+use Illuminate\Support\Facades\Cache;
+use Symfony\Component\HttpFoundation\Response;
+
+/**
+ * Makes retried service callbacks safe: a request whose Idempotency-Key was already
+ * processed successfully gets the stored response back instead of being applied again.
+ * The AI service retries 502/504 and dropped connections, which can follow a request
+ * the backend already handled (e.g. escalation notifications already sent).
+ */
+class ReplayIdempotentRequests
+{
+    /**
+     * How long a processed key is remembered (seconds).
+     */
+    protected const TTL = 86400;
+
+    /**
+     * Handle an incoming request.
+     *
+     * @param  \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response)  $next
+     */
+    public function handle(Request $request, Closure $next): Response
+    {
+        $key = $request->header('Idempotency-Key');
+
+        if (!$key) {
+            return $next($request);
+        }
+
+        $cacheKey = 'idempotency:' . sha1($request->method() . ' ' . $request->path() . ' ' . $key);
+
+        if ($stored = Cache::get($cacheKey)) {
+            return response($stored['content'], $stored['status'])
+                ->header('Content-Type', $stored['content_type'])
+                ->header('Idempotent-Replayed', 'true');
+        }
+
+        $response = $next($request);
+
+        if ($response->isSuccessful()) {
+            Cache::put($cacheKey, [
+                'status' => $response->getStatusCode(),
+                'content' => $response->getContent(),
+                'content_type' => $response->headers->get('Content-Type', 'application/json'),
+            ], self::TTL);
+        }
+
+        return $response;
+    }
+}
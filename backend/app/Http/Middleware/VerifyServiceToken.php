@@ -0,0 +1,32 @@
+<?php
+
+namespace App\Http\Middleware;
+
+use Closure;
+use Illuminate\Http\Request;
+use Symfony\Component\HttpFoundation\Response;
+
+/**
+ * Authenticates service-to-service callbacks (the AI service) by a shared bearer token
+ * instead of a user session. Refuses every request while no token is configured.
+ */
+class VerifyServiceToken
+{
+    /**
+     * Handle an incoming request.
+     *
+     * @param  \Closure(\Illuminate\Http\Request): (\Symfony\Component\HttpFoundation\Response)  $next
+     */
+    public function handle(Request $request, Closure $next): Response
+    {
+        $token = (string) config('services.ai_service.token');
+
+        if ($token === '' || !hash_equals($token, (string) $request->bearerToken())) {
+            return response()->json([
+                'message' => 'Unauthenticated.',
+            ], 401);
+        }
+
+        return $next($request);
+    }
+}
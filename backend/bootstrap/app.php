@@ -22,6 +22,8 @@ return Application::configure(basePath: dirname(__DIR__))
             'source.a' => \App\Http\Middleware\SourceAIsolation::class,
             'source.b' => \App\Http\Middleware\SourceBIsolation::class,
             'log.access' => \App\Http\Middleware\LogAccessAttempt::class,
+            'service.token' => \App\Http\Middleware\VerifyServiceToken::class,
+            'idempotent' => \App\Http\Middleware\ReplayIdempotentRequests::class,
         ]);
     })
     ->withExceptions(function (Exceptions $exceptions) {
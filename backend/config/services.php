@@ -0,0 +1,20 @@
+<?php
+
+return [
+
+    /*
+    |--------------------------------------------------------------------------
+    | AI Service
+    |--------------------------------------------------------------------------
+    |
+    | Shared secret the AI service sends as a bearer token on its callbacks
+    | (BACKEND_SERVICE_TOKEN on the AI service side). Callbacks are refused
+    | while it is empty.
+    |
+    */
+
+    'ai_service' => [
+        'token' => env('AI_SERVICE_TOKEN'),
+    ],
+
+];
@@ -0,0 +1,84 @@
+<?php
+
+use Illuminate\Database\Migrations\Migration;
+use Illuminate\Support\Facades\DB;
+
+return new class extends Migration {
+    /**
+     * Tables that publish row changes, with their NOTIFY channel and the columns
+     * carried in the payload. The AI service LISTENs on these channels instead of
+     * polling (ai-service/app/services/change_feed.py).
+     */
+    private array $feeds = [
+        'project_reports' => ['report_changes', ['id', 'status', 'reporting_period_start', 'reporting_period_end']],
+        'department_reports' => ['report_changes', ['id', 'status', 'reporting_period_start', 'reporting_period_end']],
+        'project_report_entries' => ['entry_changes', ['project_report_id', 'employee_id']],
+        'department_report_entries' => ['entry_changes', ['department_report_id', 'employee_id']],
+        'project_report_amendments' => ['amendment_changes', ['id', 'project_report_id']],
+        'department_report_amendments' => ['amendment_changes', ['id', 'department_report_id']],
+        'conflict_alerts' => ['conflict_changes', ['id', 'employee_id', 'status', 'reporting_period_start', 'reporting_period_end']],
+        'validation_runs' => ['validation_changes', ['id', 'status', 'reporting_period_start', 'reporting_period_end']],
+    ];
+
+    /**
+     * Run the migrations.
+     */
+    public function up(): void
+    {
+        // LISTEN/NOTIFY is Postgres-only; the sqlite test database has no feed
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        // Payload: {"table", "op"} plus the selected columns of the new (or deleted) row;
+        // updates also list which of those columns changed ("changed").
+        // Identical payloads within one transaction are delivered once by Postgres.
+        DB::unprepared("
+            CREATE OR REPLACE FUNCTION notify_change_feed() RETURNS trigger AS \$\$
+            DECLARE
+                current_row jsonb := CASE WHEN TG_OP = 'DELETE' THEN to_jsonb(OLD) ELSE to_jsonb(NEW) END;
+                previous_row jsonb := CASE WHEN TG_OP = 'UPDATE' THEN to_jsonb(OLD) END;
+                payload jsonb;
+            BEGIN
+                SELECT jsonb_build_object('table', TG_TABLE_NAME, 'op', TG_OP)
+                       || COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+                       || CASE WHEN previous_row IS NULL THEN '{}'::jsonb ELSE jsonb_build_object(
+                              'changed',
+                              COALESCE(jsonb_agg(key) FILTER (WHERE value IS DISTINCT FROM previous_row -> key), '[]'::jsonb)
+                          ) END
+                INTO payload
+                FROM jsonb_each(current_row)
+                WHERE key = ANY(TG_ARGV[1:TG_NARGS - 1]);
+
+                PERFORM pg_notify(TG_ARGV[0], payload::text);
+                RETURN NULL;
+            END;
+            \$\$ LANGUAGE plpgsql
+        ");
+
+        foreach ($this->feeds as $table => [$channel, $columns]) {
+            $arguments = implode(', ', array_map(fn ($value) => "'{$value}'", [$channel, ...$columns]));
+            DB::statement("DROP TRIGGER IF EXISTS {$table}_change_feed ON {$table}");
+            DB::statement("
+                CREATE TRIGGER {$table}_change_feed
+                AFTER INSERT OR UPDATE OR DELETE ON {$table}
+                FOR EACH ROW EXECUTE FUNCTION notify_change_feed({$arguments})
+            ");
+        }
+    }
+
+    /**
+     * Reverse the migrations.
+     */
+    public function down(): void
+    {
+        if (DB::getDriverName() !== 'pgsql') {
+            return;
+        }
+
+        foreach (array_keys($this->feeds) as $table) {
+            DB::statement("DROP TRIGGER IF EXISTS {$table}_change_feed ON {$table}");
+        }
+        DB::statement('DROP FUNCTION IF EXISTS notify_change_feed()');
+    }
+};
@@ -28,6 +28,12 @@ Route::prefix('v1')->group(function () {
         });
     });
 
+    // Callbacks from the AI service (shared service token, no user session); retries
+    // carry the same Idempotency-Key and get the first response replayed
+    Route::middleware(['service.token', 'idempotent'])->prefix('internal')->group(function () {
+        Route::post('conflicts/escalated', [App\Http\Controllers\Api\V1\Internal\ConflictEscalationController::class, 'store']);
+    });
+
     // Protected API Routes
     Route::middleware('auth:sanctum')->group(function () {
         // User routes will go here
@@ -81,6 +87,13 @@ Route::prefix('v1')->group(function () {
             Route::post('/run-detection', [ConflictAlertController::class, 'runDetection']);
         });
 
+        // ================================================================
+        // AI SERVICE ACCESS CHECK - nginx auth_request for the public /api/ml/* routes
+        // (per-employee conflict analytics, so the same roles as conflict alerts)
+        // ================================================================
+        Route::middleware('role:ceo,cfo,gm,ops_manager')
+            ->get('ml/authorize', fn () => response()->noContent());
+
         // ================================================================
         // AUDIT LOGS - CEO AND CFO ONLY
         // ================================================================
@@ -49,4 +49,5 @@ for header in ['X-Query-Count', 'X-Query-Time', 'X-Total-Time']:
         print(f"     {header}: {response.headers[header]}")
 
 print("\n" + "=" * 60)
-print("Check Laravel logs for [PERF] entries with detailed metrics")
+print("Check Laravel logs for [PERF] entries with detailed metrics:")
+print("  cd ai-service && python -m tools.perf_log_report report ../backend/storage/logs/laravel.log")
@@ -0,0 +1,103 @@
+<?php
+
+namespace Tests\Feature;
+
+use App\Models\ConflictAlert;
+use App\Models\User;
+use App\Notifications\ConflictEscalatedNotification;
+use Illuminate\Foundation\Testing\RefreshDatabase;
+use Illuminate\Support\Facades\Notification;
+use Spatie\Permission\Models\Role;
+use Tests\TestCase;
+
+class ConflictEscalationCallbackTest extends TestCase
+{
+    use RefreshDatabase;
+
+    protected function setUp(): void
+    {
+        parent::setUp();
+
+        $this->artisan('db:seed', ['--class' => 'RoleSeeder']);
+        $this->artisan('db:seed', ['--class' => 'DepartmentSeeder']);
+        config(['services.ai_service.token' => 'service-secret']);
+    }
+
+    protected function conflict(User $employee, string $status): ConflictAlert
+    {
+        return ConflictAlert::create([
+            'employee_id' => $employee->id,
+            'reporting_period_start' => '2026-01-05',
+            'reporting_period_end' => '2026-01-11',
+            'source_a_hours' => 45,
+            'source_b_hours' => 40,
+            'discrepancy' => 5,
+            'status' => $status,
+            'escalated_at' => $status === 'escalated' ? now() : null,
+        ]);
+    }
+
+    /**
+     * Test that callbacks without the AI service token are refused.
+     */
+    public function test_callback_requires_the_service_token(): void
+    {
+        $this->postJson('/api/v1/internal/conflicts/escalated', ['items' => [['id' => 1]]])
+            ->assertStatus(401);
+
+        $this->withToken('wrong')
+            ->postJson('/api/v1/internal/conflicts/escalated', ['items' => [['id' => 1]]])
+            ->assertStatus(401);
+    }
+
+    /**
+     * Test that executives are notified about escalated conflicts only.
+     */
+    public function test_escalated_conflicts_notify_ceo_and_cfo(): void
+    {
+        Notification::fake();
+
+        $ceo = User::factory()->create();
+        $ceo->assignRole(Role::findByName('ceo'));
+        $gm = User::factory()->create();
+        $gm->assignRole(Role::findByName('gm'));
+
+        $employee = User::factory()->create();
+        $escalated = $this->conflict($employee, 'escalated');
+        $resolved = $this->conflict(User::factory()->create(), 'resolved');
+
+        $this->withToken('service-secret')
+            ->postJson('/api/v1/internal/conflicts/escalated', [
+                'items' => [['id' => $escalated->id], ['id' => $resolved->id]],
+            ])
+            ->assertStatus(202)
+            ->assertJson(['notified_conflicts' => 1]);
+
+        Notification::assertSentTo($ceo, ConflictEscalatedNotification::class);
+        Notification::assertNotSentTo($gm, ConflictEscalatedNotification::class);
+        Notification::assertCount(1);
+    }
+
+    /**
+     * Test that a retried callback (same Idempotency-Key) does not notify twice.
+     */
+    public function test_retried_callback_is_replayed_not_reapplied(): void
+    {
+        Notification::fake();
+
+        $ceo = User::factory()->create();
+        $ceo->assignRole(Role::findByName('ceo'));
+        $escalated = $this->conflict(User::factory()->create(), 'escalated');
+
+        for ($attempt = 0; $attempt < 2; $attempt++) {
+            $response = $this->withToken('service-secret')
+                ->withHeader('Idempotency-Key', 'batch-1')
+                ->postJson('/api/v1/internal/conflicts/escalated', ['items' => [['id' => $escalated->id]]])
+                ->assertStatus(202)
+                ->assertJson(['notified_conflicts' => 1]);
+        }
+
+        $response->assertHeader('Idempotent-Replayed', 'true');
+        Notification::assertSentToTimes($ceo, ConflictEscalatedNotification::class, 1);
+    }
+}
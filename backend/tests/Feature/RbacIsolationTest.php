@@ -60,4 +60,20 @@ class RbacIsolationTest extends TestCase
         // Assert that the request is forbidden
         $response->assertStatus(403);
     }
-}
\ No newline at end of file
+
+    /**
+     * Test the check nginx runs (auth_request) before proxying /api/ml/* to the AI service.
+     */
+    public function test_ml_access_is_limited_to_conflict_roles(): void
+    {
+        $this->getJson('/api/v1/ml/authorize')->assertStatus(401);
+
+        $sdd = User::factory()->create();
+        $sdd->assignRole(Role::findByName('sdd'));
+        $this->actingAs($sdd)->getJson('/api/v1/ml/authorize')->assertStatus(403);
+
+        $gm = User::factory()->create();
+        $gm->assignRole(Role::findByName('gm'));
+        $this->actingAs($gm)->getJson('/api/v1/ml/authorize')->assertStatus(204);
+    }
+}
@@ -80,6 +80,10 @@ check_ai_service() {
     check_http "http://localhost:8000/health" 5
 }
 
+check_ai_service_ready() {
+    check_http "http://localhost:8000/ready" 5
+}
+
 check_nginx() {
     check_http "http://localhost:80/health" 5
 }
@@ -108,6 +112,9 @@ case "$SERVICE" in
     ai-service)
         check_ai_service
         ;;
+    ai-service-ready)
+        check_ai_service_ready
+        ;;
     nginx)
         check_nginx
         ;;
@@ -136,7 +143,7 @@ case "$SERVICE" in
         ;;
     *)
         echo "Unknown service: $SERVICE"
-        echo "Usage: $0 [postgres|redis|backend|frontend|ai-service|nginx|meilisearch|minio|all]"
+        echo "Usage: $0 [postgres|redis|backend|frontend|ai-service|ai-service-ready|nginx|meilisearch|minio|all]"
         exit 1
         ;;
 esac